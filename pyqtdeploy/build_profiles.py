@@ -0,0 +1,143 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+from .user_exception import UserException
+
+
+# The names of the build profiles in the order they are presented to the user.
+BUILD_PROFILES = ('size', 'speed', 'debug')
+
+
+# The qmake configuration that implements each build profile.  This is used
+# for both the application's .pro file and Python's python.pro file so that
+# the two are built consistently.  Note that python.pro explicitly sets -O3.
+_BUILD_PROFILE_QMAKE = {
+    'size': '''CONFIG += optimize_size ltcg gc_binaries
+QMAKE_CFLAGS_RELEASE -= -O3
+
+!msvc {
+    macx|ios {
+        QMAKE_LFLAGS_RELEASE += -Wl,-S -Wl,-x
+    } else {
+        QMAKE_LFLAGS_RELEASE += -s
+    }
+}
+''',
+
+    'speed': '''CONFIG += optimize_full ltcg
+''',
+
+    'debug': '''CONFIG += force_debug_info
+QMAKE_CFLAGS_RELEASE -= -O3 $$QMAKE_CFLAGS_OPTIMIZE
+QMAKE_CXXFLAGS_RELEASE -= $$QMAKE_CFLAGS_OPTIMIZE
+
+msvc {
+    QMAKE_CFLAGS_RELEASE += -Od
+    QMAKE_CXXFLAGS_RELEASE += -Od
+} else {
+    QMAKE_CFLAGS_RELEASE += -O0
+    QMAKE_CXXFLAGS_RELEASE += -O0
+}
+''',
+}
+
+
+# The CMake configuration that implements each build profile.  The build type
+# is only a default and any specified on the command line takes precedence.
+_BUILD_PROFILE_CMAKE = {
+    'size': '''if(NOT CMAKE_BUILD_TYPE)
+    set(CMAKE_BUILD_TYPE MinSizeRel)
+endif()
+
+set_property(TARGET ${PROJECT_NAME} PROPERTY INTERPROCEDURAL_OPTIMIZATION ON)
+
+if(MSVC)
+    target_link_options(${PROJECT_NAME} PRIVATE /OPT:REF /OPT:ICF)
+else()
+    target_compile_options(${PROJECT_NAME} PRIVATE -ffunction-sections
+            -fdata-sections)
+
+    if(APPLE)
+        target_link_options(${PROJECT_NAME} PRIVATE -Wl,-dead_strip -Wl,-S
+                -Wl,-x)
+    else()
+        target_link_options(${PROJECT_NAME} PRIVATE -Wl,--gc-sections -s)
+    endif()
+endif()
+''',
+
+    'speed': '''if(NOT CMAKE_BUILD_TYPE)
+    set(CMAKE_BUILD_TYPE Release)
+endif()
+
+set_property(TARGET ${PROJECT_NAME} PROPERTY INTERPROCEDURAL_OPTIMIZATION ON)
+''',
+
+    'debug': '''if(NOT CMAKE_BUILD_TYPE)
+    set(CMAKE_BUILD_TYPE RelWithDebInfo)
+endif()
+
+if(MSVC)
+    target_compile_options(${PROJECT_NAME} PRIVATE /Od)
+else()
+    target_compile_options(${PROJECT_NAME} PRIVATE -O0)
+endif()
+''',
+}
+
+
+def get_build_profile_cmake(profile):
+    """ Return the CMake configuration that implements a build profile.  An
+    empty string is returned if no profile is specified.
+    """
+
+    return _get_build_profile(profile, _BUILD_PROFILE_CMAKE)
+
+
+def get_build_profile_qmake(profile):
+    """ Return the qmake configuration that implements a build profile.  An
+    empty string is returned if no profile is specified.
+    """
+
+    return _get_build_profile(profile, _BUILD_PROFILE_QMAKE)
+
+
+def _get_build_profile(profile, configurations):
+    """ Return the configuration that implements a build profile taken from a
+    map of configurations.
+    """
+
+    if profile == '':
+        return ''
+
+    try:
+        configuration = configurations[profile]
+    except KeyError:
+        raise UserException(
+                "'{0}' is not a valid build profile, it must be one of "
+                "{1}".format(profile, ', '.join(BUILD_PROFILES)))
+
+    return "# The '{0}' build profile.\n{1}".format(profile, configuration)
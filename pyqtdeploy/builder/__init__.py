@@ -26,3 +26,4 @@
 
 # Publish the sub-package's API.
 from .builder import Builder
+from .generators import GENERATORS
@@ -0,0 +1,111 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+
+
+class BuildConfiguration:
+    """ The generator independent configuration of an application.  It is
+    created by the builder and consumed by the generator of the build system's
+    project file.
+    """
+
+    def __init__(self, application_name, target, python_version):
+        """ Initialise the configuration. """
+
+        self.application_name = application_name
+        self.target = target
+        self.python_version = python_version
+
+        # The qmake names of the Qt modules used.
+        self.qt = set()
+
+        # The qmake CONFIG features required by extension modules.
+        self.qmake_config = set()
+
+        # Set if an extension module requires C++11.
+        self.cpp11 = False
+
+        # Set if the application is a console application (Windows only).
+        self.is_console = False
+
+        # Set if the application is an application bundle (macOS only).
+        self.is_bundle = True
+
+        # The C standard required by Python or None if the compiler's default
+        # should be used.
+        self.c_standard = None
+
+        # The names of the .qrc files relative to the resources directory.
+        self.resource_names = []
+        self.compress_resources = True
+        self.external_resources = False
+
+        # The defines specific to pyqtdeploy and those used by parts.
+        self.defines = []
+        self.used_defines = set()
+
+        # The include directories used by parts.
+        self.used_includepath = set()
+
+        # The pyqtdeploy sources and those used by parts.
+        self.sources = []
+        self.used_sources = set()
+
+        # The generated header files.
+        self.headers = []
+
+        # The name of any precompiled header and the sources that must not use
+        # it.
+        self.precompiled_header = None
+        self.no_pch_sources = []
+
+        # The libraries used by parts in the form of linker flags.
+        self.used_libs = set()
+
+        # The shared libraries to bundle with an Android application.
+        self.android_extra_libs = set()
+
+        # The full pathnames of the DLLs to copy next to a Windows executable.
+        self.dlls = []
+
+        # The name of the build profile.
+        self.build_profile = ''
+
+        # The project's additional qmake configuration.
+        self.qmake_configuration = ''
+
+    @property
+    def rcc_names(self):
+        """ The names of any external .rcc files. """
+
+        return [os.path.splitext(n)[0] + '.rcc' for n in self.resource_names]
+
+    @property
+    def target_platform(self):
+        """ The name of the target platform. """
+
+        return self.target.platform.name
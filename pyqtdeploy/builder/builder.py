@@ -28,21 +28,29 @@ import csv
 import glob
 from importlib import resources
 import os
+import re
 import shlex
 import shutil
 import tempfile
 
 from ..file_utilities import create_file, get_versioned_file, open_file
+from ..module_index import (create_module_index, to_c_string,
+        write_module_index)
 from ..parts import (ComponentLibrary, DataFile, ExtensionModule, Part,
         PythonModule, PythonPackage)
 from ..project import Project
+from ..qt_modules import APPLICATION_QT_MODULES
 from ..platforms import Architecture, Platform
+from ..source_utilities import (get_file_scope_names, has_preamble_defines,
+        has_undefs)
 from ..sysroot import Sysroot
 from ..user_exception import UserException
 from ..version import PYQTDEPLOY_HEXVERSION
 from ..version_number import VersionNumber
 
 from . import lib as lib_package
+from .build_configuration import BuildConfiguration
+from .generators import get_generator
 from .lib import bootstrap as bootstrap_package
 from .lib import bootstrap_external as bootstrap_external_package
 
@@ -51,8 +59,11 @@ class Builder:
     """ The builder for a project. """
 
     def __init__(self, project_name, target_arch_name, message_handler, python,
-            qmake):
-        """ Initialise the builder for a project. """
+            qmake, reprobe=False):
+        """ Initialise the builder for a project.  If reprobe is set then
+        the results of probing the host saved by earlier invocations are
+        ignored.
+        """
 
         self._message_handler = message_handler
 
@@ -63,41 +74,55 @@ class Builder:
         self._sysroot = Sysroot(self._project.sysroot_specification,
                 self._host, self._target, self._project.absolute_sysroots_dir,
                 message_handler=self._message_handler, python=python,
-                qmake=qmake)
-
-    def build(self, opt, nr_resources, clean, build_dir):
-        """ Build the project in a given directory.  Raise a UserException if
-        there is an error.
+                qmake=qmake, reprobe=reprobe)
+
+    def build(self, opt, nr_resources, clean, build_dir, nr_unity_units=0,
+            precompiled_header=False, build_profile=None,
+            compress_resources=True, external_resources=False,
+            deep_freeze=False, warmup_trace=None, generator='qmake'):
+        """ Build the project in a given directory.  nr_unity_units is the
+        number of unity source files that the extension module sources are
+        amalgamated into (0 disables unity builds).  precompiled_header is set
+        if a precompiled header should be used where the compiler supports it.
+        build_profile is the name of the build profile and overrides any
+        specified by the project.  compress_resources is cleared if the
+        resources should not be compressed so that the importer can use them
+        without copying.  external_resources is set if the resources should be
+        built as external .rcc files rather than being compiled into the
+        executable.  deep_freeze is set if the bootstrap, any main script and
+        the project's hot modules should be deep-frozen (Python v3.11 and v3.12
+        only).  warmup_trace is the name of an optional file containing an
+        import trace from which additional warm-up modules are taken.
+        generator is the name of the generator of the build system's project
+        file.  Raise a UserException if there is an error.
         """
 
         project = self._project
 
+        if build_profile is None:
+            build_profile = project.build_profile
+
         # Verify the sysroot.
         self._sysroot.verify()
 
         python = self._sysroot.get_component('Python')
 
+        # Link-time optimisation in particular requires that the application
+        # and Python are built with the same profile.
+        if python.install_from_source and python.build_profile != build_profile:
+            self._sysroot.warning(
+                    "the application build profile '{0}' is different to the "
+                    "Python build profile '{1}'".format(build_profile,
+                            python.build_profile))
+
         # Check the sysroot directory exists.
         if not os.path.isdir(self._sysroot.sysroot_dir):
             raise UserException(
                     "the sysroot directory '{0}' does not exist".format(
                             self._sysroot.sysroot_dir))
 
-        # Get all the parts provided by the sysroot.
-        available_parts = {}
-        for component in self._sysroot.components:
-            available_parts.update(component.parts)
-
         # Get the required parts.
-        parts = {}
-
-        # Always include the core Python modules and their dependencies.
-        for part_name, part in python.parts.items():
-            if isinstance(part, (PythonModule, PythonPackage)) and part.core:
-                self._add_project_part(part_name, parts, available_parts)
-
-        for part_name in project.parts:
-            self._add_project_part(part_name, parts, available_parts)
+        parts = self._sysroot.get_project_parts(project)
 
         # Determine the application name.
         if project.application_name:
@@ -165,12 +190,34 @@ class Builder:
                             PYQTDEPLOY_HEXVERSION))
 
         # Generate the application resources.
+        self._resource_sources = {}
+
         resource_names = self._generate_resources(parts, job_writer,
-                nr_resources)
+                nr_resources, python)
+
+        # Write the list of modules imported in the background.
+        self._write_warmup_modules(warmup_trace)
+
+        # Freeze any hot modules that will be deep-frozen.
+        if deep_freeze:
+            deepfreeze_script = self._get_deepfreeze_script(python)
+            deep_frozen_modules = self._freeze_hot_modules(job_writer)
+            self._write_deep_frozen_header(deep_frozen_modules)
+        else:
+            deep_frozen_modules = None
+
+        # Write the project file for the build system.
+        config = self._get_build_configuration(application_name, parts, opt,
+                resource_names, python, nr_unity_units, precompiled_header,
+                build_profile, compress_resources, external_resources,
+                deep_frozen_modules)
+
+        if generator != 'qmake' and config.qmake_configuration != '':
+            self._sysroot.warning(
+                    "the project's additional qmake configuration is ignored "
+                    "by the {0} generator".format(generator))
 
-        # Write the .pro file.
-        self._write_qmake(application_name, parts, job_writer, opt,
-                resource_names, python)
+        get_generator(generator)(config, self._build_dir)
 
         #osh
         shutil.copy(job_filename, '/tmp/jobfile.txt')
@@ -179,6 +226,11 @@ class Builder:
 
         self._run_freeze(python, job_filename, opt)
 
+        # Deep-freeze the frozen modules.
+        if deep_frozen_modules is not None:
+            self._run_deep_freeze(python, deepfreeze_script,
+                    deep_frozen_modules)
+
     def _add_bundled_shared_libs(self, libs, bundled_shared_libs):
         """ Add the shared library files to be bundled with the application.
         """
@@ -208,50 +260,6 @@ class Builder:
 
                 bundled_shared_libs.add(lib_path)
 
-    def _add_project_part(self, part_name, parts, available_parts):
-        """ Make sure a part is in the dict of all parts. """
-
-        # See if it has already been done.
-        if part_name in parts:
-            return
-
-        # Make sure any parent parts exist.
-        if '.' in part_name:
-            # Find the scoped name of the parent part.
-            unscoped_name = Part.get_unscoped_name(part_name)
-            unscoped_parent_name = '.'.join(unscoped_name.split('.')[:-1])
-
-            for component in self._sysroot.components:
-                parent_name = Part.get_name(component.name,
-                        unscoped_parent_name)
-
-                if parent_name in component.parts:
-                    break
-            else:
-                # Ignore parts whose parent is not provided.
-                return
-
-            self._add_project_part(parent_name, parts, available_parts)
-
-        # Ignore parts that aren't provided by the sysroot (we assume the
-        # application will handle that).
-        part = available_parts.get(part_name)
-        if part is None:
-            return
-
-        # For Android check the API level.
-        if self._target.platform.name == 'android' and part.min_android_api is not None and part.min_android_api > self._target.platform.android_api:
-            return
-
-        parts[part_name] = part
-
-        # Now handle the dependencies.
-        for dep in part.deps:
-            self._add_project_part(dep, parts, available_parts)
-
-        for dep in part.hidden_deps:
-            self._add_project_part(dep, parts, available_parts)
-
     def _add_values(self, used_values, values, part, is_filename=True):
         """ Parse a sequence of values and add them to a set of used values.
         The values are optionally treated as filenames where they are converted
@@ -304,7 +312,7 @@ class Builder:
                     os.path.join(build_dir, 'frozen_' + name + '.h'), path,
                     'pyqtdeploy_' + name, as_c=True)
 
-    def _generate_resources(self, parts, job_writer, nr_resources):
+    def _generate_resources(self, parts, job_writer, nr_resources, python):
         """ Generate the application resource files and return the names of
         the files relatve to the build directory.
         """
@@ -324,6 +332,11 @@ class Builder:
         # Handle the standard library and other packages.
         self._write_python_modules(parts, resources_contents, job_writer)
 
+        # Write the index of the modules in the resources and the extension
+        # modules installed alongside the executable.
+        self._write_module_index(resources_contents, project.lazy_modules,
+                self._get_adjacent_extension_modules(parts, python))
+
         # Write the .qrc files.
         if nr_resources == 1:
             resource_names = [self._write_resource(resources_contents)]
@@ -361,6 +374,335 @@ class Builder:
 
         return abs_resource_path
 
+    # The modules that are deep-frozen by default.  These are the pure Python
+    # modules imported by the interpreter when it starts and are the same as
+    # those frozen by Python itself.
+    _DEFAULT_DEEP_FROZEN_MODULES = ('_collections_abc', 'abc', 'codecs',
+            'genericpath', 'io', 'ntpath', 'os', 'posixpath', 'stat')
+
+    def _get_adjacent_extension_modules(self, parts, python):
+        """ Return the names of the extension modules that will be installed
+        in the same directory as the executable.
+        """
+
+        adjacent_extension_modules = set(
+                self._project.adjacent_extension_modules)
+
+        # Earlier versions would look for any extension module alongside the
+        # executable so warn about projects that may have relied on that.
+        if not adjacent_extension_modules and (python.dynamic_loading or not python.install_from_source):
+            self._sysroot.warning(
+                    "the target Python supports dynamic loading but no "
+                    "adjacent extension modules are specified, extension "
+                    "modules installed alongside the executable will only be "
+                    "imported if they are specified")
+
+        # On Windows an existing Python installation provides some extension
+        # modules as .pyd files that are copied alongside the executable.
+        if self._target.platform.name == 'win' and not python.install_from_source:
+            for part in parts.values():
+                if isinstance(part, ExtensionModule) and not part.core and part.pyd is not None:
+                    adjacent_extension_modules.add(
+                            os.path.splitext(part.pyd)[0])
+
+        return adjacent_extension_modules
+
+    def _get_build_configuration(self, application_name, parts, opt,
+            resource_names, python, nr_unity_units, precompiled_header,
+            build_profile, compress_resources, external_resources,
+            deep_frozen_modules):
+        """ Return the generator independent configuration of the application
+        and create the source files it refers to.
+        """
+
+        project = self._project
+        target_platform = self._target.platform.name
+
+        config = BuildConfiguration(application_name, self._target,
+                python.version)
+
+        config.is_console = project.application_is_console
+        config.is_bundle = project.application_is_bundle
+        config.build_profile = build_profile
+        config.qmake_configuration = project.qmake_configuration.strip()
+
+        config.qt.update(APPLICATION_QT_MODULES)
+
+        # Accumulate all the values used by the parts.
+        bundled_shared_libs = set()
+        used_dlls = set()
+        used_inittab = set()
+
+        config.used_includepath.add(self._sysroot.target_include_dir)
+        config.used_includepath.add(python.target_py_include_dir)
+
+        if python.version >= (3, 8):
+            config.used_includepath.add(
+                    python.target_py_include_dir + '/internal')
+
+        config.used_libs.add('-L' + self._sysroot.target_lib_dir)
+        config.used_libs.add('-l' + python.target_py_lib)
+
+        for part in parts.values():
+            # Ignore core parts.
+            if part.core:
+                continue
+
+            if isinstance(part, ExtensionModule):
+                if python.install_from_source:
+                    used_inittab.add(part.unscoped_name)
+
+                    self._add_values(config.used_sources, part.source, part)
+
+                    if part.qmake_config is not None:
+                        config.qmake_config.update(part.qmake_config)
+
+                    if part.qmake_cpp11:
+                        config.cpp11 = True
+
+                    if part.qmake_qt is not None:
+                        config.qt.update(part.qmake_qt)
+                elif target_platform == 'win' and part.pyd is not None:
+                    used_dlls.add(part)
+            elif isinstance(part, ComponentLibrary):
+                if part.bundle_shared_libs:
+                    self._add_bundled_shared_libs(part.libs,
+                            bundled_shared_libs)
+            else:
+                continue
+
+            self._add_values(config.used_defines, part.defines, part,
+                    is_filename=False)
+            self._add_values(config.used_libs, part.libs, part,
+                    is_filename=False)
+            self._add_values(config.used_includepath, part.includepath, part)
+
+        # Python requires C99 at least.
+        if target_platform != 'win':
+            config.c_standard = 'c11' if python.version >= (3, 11) else 'c99'
+
+        # The resource files.
+        config.resource_names = resource_names
+        config.compress_resources = compress_resources
+        config.external_resources = external_resources
+
+        # The defines and generated header files.
+        config.headers = ['pyqtdeploy_version.h', 'pdytools_index.h',
+                'pyqtdeploy_warmup.h', 'frozen_bootstrap.h',
+                'frozen_bootstrap_external.h']
+
+        if external_resources:
+            self._write_resources_header(config.rcc_names)
+
+            config.defines.append('PYQTDEPLOY_EXTERNAL_RESOURCES')
+            config.headers.append('pyqtdeploy_resources.h')
+
+        if project.application_script != '':
+            config.defines.append('PYQTDEPLOY_FROZEN_MAIN')
+            config.headers.append('frozen_main.h')
+
+        if opt:
+            config.defines.append('PYQTDEPLOY_OPTIMIZED={0}'.format(opt))
+
+        if deep_frozen_modules is not None:
+            config.defines.append('PYQTDEPLOY_DEEP_FROZEN')
+            config.headers.append('pyqtdeploy_deep_frozen.h')
+            config.headers.extend(
+                    ['frozen_hot_{0}.h'.format(ident)
+                            for _, ident in deep_frozen_modules])
+
+        # The interpreter options.
+        if project.hash_seed >= 0:
+            if project.hash_seed > 4294967295:
+                raise UserException(
+                        "the hash seed must be no greater than 4294967295")
+
+            config.defines.append('PYQTDEPLOY_HASH_SEED={0}'.format(
+                    project.hash_seed))
+
+        # The source files.
+        config.sources = ['pyqtdeploy_main.cpp', 'pyqtdeploy_start.cpp',
+                'pdytools_module.cpp']
+
+        if deep_frozen_modules is not None:
+            config.sources.append('pyqtdeploy_deepfreeze.c')
+
+        if nr_unity_units > 0:
+            config.used_sources = self._write_unity_sources(
+                    config.used_sources, nr_unity_units)
+
+        self._write_main(used_inittab, config.used_defines)
+        self._copy_to_build_dir('pyqtdeploy_start.cpp')
+        self._copy_to_build_dir('pdytools_module.cpp')
+
+        if precompiled_header:
+            config.precompiled_header = 'pyqtdeploy_pch.h'
+            config.no_pch_sources = self._write_precompiled_header(
+                    config.precompiled_header, config.used_sources,
+                    config.used_defines)
+
+        # Additional platform=specific configuration.
+        if target_platform == 'android':
+            config.android_extra_libs = bundled_shared_libs
+        elif target_platform == 'win':
+            # If we are using the installed Python on Windows then copy in the
+            # required DLLs.
+            if used_dlls:
+                config.dlls.extend(self._get_python_dlls(python, used_dlls))
+
+            # Copy in any component DLLs.
+            config.dlls.extend(sorted(bundled_shared_libs))
+
+        return config
+
+    def _get_deepfreeze_script(self, python):
+        """ Return the pathname of Python's deepfreeze.py script. """
+
+        if python.version < (3, 11) or python.version >= (3, 13):
+            raise UserException(
+                    "deep-freezing is only supported for Python v3.11 and "
+                    "v3.12")
+
+        if not python.install_from_source:
+            raise UserException(
+                    "deep-freezing requires Python to be built from source")
+
+        py_src_dir = os.path.join(python.target_src_dir,
+                'Python-{}'.format(python.version))
+
+        for tools_subdir in ('build', 'scripts'):
+            script = os.path.join(py_src_dir, 'Tools', tools_subdir,
+                    'deepfreeze.py')
+
+            if os.path.isfile(script):
+                return script
+
+        raise UserException(
+                "unable to find deepfreeze.py in '{0}'".format(py_src_dir))
+
+    def _freeze_hot_modules(self, job_writer):
+        """ Freeze the hot modules to C source code and return a list of the
+        module names and the corresponding C identifiers.
+        """
+
+        project = self._project
+
+        hot_modules = project.deep_frozen_modules
+        if len(hot_modules) == 0:
+            hot_modules = self._DEFAULT_DEEP_FROZEN_MODULES
+
+        deep_frozen_modules = []
+
+        for name in sorted(set(hot_modules)):
+            rel_resource_path = name.replace('.', os.sep) + '.pyo'
+            src_path = self._resource_sources.get(rel_resource_path)
+
+            if src_path is None:
+                # Only warn about modules that were explicitly specified.
+                if len(project.deep_frozen_modules) != 0:
+                    if os.path.join(name.replace('.', os.sep), '__init__.pyo') in self._resource_sources:
+                        self._sysroot.warning(
+                                "'{0}' is a package and cannot be "
+                                "deep-frozen".format(name))
+                    else:
+                        self._sysroot.warning(
+                                "deep-frozen module '{0}' is not included in "
+                                "the application".format(name))
+
+                continue
+
+            ident = name.replace('.', '_')
+
+            self._freeze(job_writer, name,
+                    os.path.join(self._build_dir,
+                            'frozen_hot_{0}.h'.format(ident)),
+                    src_path, 'pyqtdeploy_hot_' + ident, as_c=True)
+
+            deep_frozen_modules.append((name, ident))
+
+        return deep_frozen_modules
+
+    def _write_deep_frozen_header(self, deep_frozen_modules):
+        """ Write the header file that declares the deep-frozen modules. """
+
+        with create_file(os.path.join(self._build_dir, 'pyqtdeploy_deep_frozen.h')) as f:
+            f.write('extern "C" {\n')
+
+            f.write('PyObject *_Py_get_pyqtdeploy_bootstrap_toplevel(void);\n')
+            f.write('PyObject *_Py_get_pyqtdeploy_bootstrap_external_toplevel(void);\n')
+
+            if self._project.application_script != '':
+                f.write('PyObject *_Py_get_pyqtdeploy_main_toplevel(void);\n')
+
+            for _, ident in deep_frozen_modules:
+                f.write(
+                        'PyObject *_Py_get_pyqtdeploy_hot_{0}_toplevel(void);\n'.format(ident))
+
+            f.write('}\n\n')
+
+            for _, ident in deep_frozen_modules:
+                f.write('#include "frozen_hot_{0}.h"\n'.format(ident))
+
+            f.write('\nstatic const struct _frozen deep_frozen_stdlib[] = {\n')
+
+            for name, ident in deep_frozen_modules:
+                f.write(
+                        '    {{"{0}", frozen_pyqtdeploy_hot_{1}, sizeof (frozen_pyqtdeploy_hot_{1}), false, _Py_get_pyqtdeploy_hot_{1}_toplevel}},\n'.format(name, ident))
+
+            f.write('    {NULL, NULL, 0, false, NULL}\n};\n')
+
+    def _run_deep_freeze(self, python, deepfreeze_script,
+            deep_frozen_modules):
+        """ Deep-freeze the bootstrap, any main script and any hot modules
+        from the C source code created by the freeze jobs.
+        """
+
+        inputs = [('frozen_bootstrap.h', 'pyqtdeploy_bootstrap'),
+                ('frozen_bootstrap_external.h',
+                        'pyqtdeploy_bootstrap_external')]
+
+        if self._project.application_script != '':
+            inputs.append(('frozen_main.h', 'pyqtdeploy_main'))
+
+        for _, ident in deep_frozen_modules:
+            inputs.append(('frozen_hot_{0}.h'.format(ident),
+                    'pyqtdeploy_hot_' + ident))
+
+        # deepfreeze.py will only decode data in the format created by Python's
+        # own freeze tool so we add the comment that identifies it.
+        for header, _ in inputs:
+            header_path = os.path.join(self._build_dir, header)
+
+            with open(header_path) as f:
+                code = f.read()
+
+            with open(header_path, 'w') as f:
+                f.write('/* Auto-generated by Programs/_freeze_module.py */\n')
+                f.write(code)
+
+        deepfreeze_path = os.path.join(self._build_dir,
+                'pyqtdeploy_deepfreeze.c')
+
+        args = [python.host_python, deepfreeze_script, '-o', deepfreeze_path]
+        args.extend([h + ':' + m for h, m in inputs])
+
+        cwd = os.getcwd()
+        os.chdir(self._build_dir)
+
+        try:
+            self._host.platform.run(*args,
+                    message_handler=self._message_handler)
+        finally:
+            os.chdir(cwd)
+
+        # The generated code uses the internal API.
+        with open(deepfreeze_path) as f:
+            code = f.read()
+
+        with open(deepfreeze_path, 'w') as f:
+            f.write('#define Py_BUILD_CORE 1\n\n')
+            f.write(code)
+
     def _run_freeze(self, python, job_filename, opt):
         """ Run the accumlated freeze jobs. """
 
@@ -486,6 +828,139 @@ int main(int argc, char **argv)
 
         f.close()
 
+    def _write_module_index(self, resources_contents, lazy_modules,
+            adjacent_extension_modules):
+        """ Create the index of the modules, packages and namespaces contained
+        in the resources.  lazy_modules is the list of modules and packages
+        (including their sub-packages) that should be loaded lazily.
+        adjacent_extension_modules is the collection of the names of the
+        extension modules installed alongside the executable.  These are the
+        only extension modules that the importer will look for.
+        """
+
+        index = create_module_index(
+                [c.replace(os.sep, '/') for c in resources_contents],
+                adjacent_extension_modules, lazy_modules)
+
+        # An ordinary module or package in the resources takes precedence over
+        # an adjacent extension module.
+        for fqmn in sorted(adjacent_extension_modules):
+            if index[fqmn][0] != 'ModuleIsAdjacentExtensionModule':
+                self._sysroot.warning(
+                        "adjacent extension module '{0}' is hidden by a "
+                        "module in the application's resources".format(fqmn))
+
+        for lazy_module in lazy_modules:
+            if index.get(lazy_module, (None, ))[0] not in ('ModuleIsModule', 'ModuleIsPackage'):
+                self._sysroot.warning(
+                        "lazily loaded module '{0}' is not included in the "
+                        "application".format(lazy_module))
+
+        write_module_index(os.path.join(self._build_dir, 'pdytools_index.h'),
+                index)
+
+    def _write_warmup_modules(self, warmup_trace):
+        """ Write the list of modules that are imported in the background
+        when the application starts.
+        """
+
+        warmup_modules = list(self._project.warmup_modules)
+
+        if warmup_trace:
+            before_mark, after_mark = self._read_import_trace(warmup_trace)
+
+            self._sysroot.verbose(
+                    "{0} modules are imported before the first mark in "
+                    "'{1}'".format(len(before_mark), warmup_trace))
+
+            # Modules that are needed before the mark must not compete with
+            # the main thread.
+            for name in after_mark:
+                if name not in before_mark and name not in warmup_modules:
+                    warmup_modules.append(name)
+
+            self._sysroot.verbose(
+                    "{0} warm-up modules are imported in the background".format(
+                            len(warmup_modules)))
+
+        with create_file(os.path.join(self._build_dir, 'pyqtdeploy_warmup.h')) as f:
+            f.write('static const char *warmup_modules[] = {\n')
+
+            for name in warmup_modules:
+                f.write('    "{0}",\n'.format(to_c_string(name)))
+
+            f.write('    NULL\n};\n')
+
+    # The format of a line written when an import is traced.
+    _TRACE_LINE_RE = re.compile(r'^pdytools: \[\s*[0-9.]+ ms\] (\S+) (.+)$')
+
+    @classmethod
+    def _read_import_trace(cls, trace_file):
+        """ Read an import trace and return a list of the modules imported
+        before the first mark and a list of those imported after it.
+        """
+
+        before_mark = []
+        after_mark = []
+        imported = before_mark
+
+        with open_file(trace_file) as f:
+            for line in f:
+                match = cls._TRACE_LINE_RE.match(line.rstrip())
+                if match is None:
+                    continue
+
+                event, name = match.groups()
+
+                if event == 'mark':
+                    imported = after_mark
+                elif event in ('exec', 'builtin'):
+                    if name not in imported:
+                        imported.append(name)
+
+        if imported is before_mark:
+            raise UserException(
+                    "import trace '{0}' does not contain a mark".format(
+                            trace_file))
+
+        return before_mark, after_mark
+
+    def _write_precompiled_header(self, name, used_sources, defines):
+        """ Create the precompiled header file and return the sources that
+        must not use it.
+        """
+
+        pch = create_file(os.path.join(self._build_dir, name))
+
+        # See the comment in _write_main().
+        if 'Py_BUILD_CORE' in defines:
+            pch.write('''// Py_BUILD_CORE/HAVE_STD_ATOMIC conflict workaround.
+#include <pyconfig.h>
+#undef HAVE_STD_ATOMIC
+
+''')
+
+        pch.write('''#include <Python.h>
+
+#if defined(__cplusplus)
+#include <QtCore>
+#endif
+''')
+
+        pch.close()
+
+        # Sources that define macros before including Python.h would be
+        # broken by the implicit inclusion of the precompiled header.
+        no_pch_sources = []
+
+        for src in used_sources:
+            if os.path.splitext(src)[1] in self._unity_extensions:
+                if has_preamble_defines(os.path.join(self._build_dir, src)):
+                    no_pch_sources.append(src)
+
+        # Sort them for reproduceable output.
+        return sorted(no_pch_sources)
+
     def _write_python_module(self, name, part, parts, part_root_dir,
             resources_contents, job_writer):
         """ Write a Python module as a resource. """
@@ -578,6 +1053,7 @@ int main(int argc, char **argv)
                     rel_resource_path.replace(os.sep, '/'))
 
             resources_contents.append(rel_resource_path)
+            self._resource_sources[rel_resource_path] = src_path
 
         # Copy required resource files.
         for rel_resource_path in to_copy:
@@ -596,191 +1072,6 @@ int main(int argc, char **argv)
             self._write_python_module(name, part, parts, part_root_dir,
                     resources_contents, job_writer)
 
-    def _write_qmake(self, application_name, parts, job_writer, opt,
-            resource_names, python):
-        """ Create the .pro file for qmake. """
-
-        project = self._project
-        target_platform = self._target.platform.name
-
-        f = create_file(
-                os.path.join(self._build_dir, application_name + '.pro'))
-
-        f.write('# Generated for {0} and Python v{1}.\n\n'.format(
-                self._target.name, python.version))
-
-        f.write('TEMPLATE = app\n')
-        f.write('\n')
-
-        # Accumulate all the values of all the qmake variables.
-        bundled_shared_libs = set()
-        qmake_cpp11 = False
-        qmake_config = set()
-        qmake_qt = set()
-        used_defines = set()
-        used_dlls = set()
-        used_includepath = set()
-        used_inittab = set()
-        used_libs = set()
-        used_sources = set()
-
-        used_includepath.add(self._sysroot.target_include_dir)
-        used_includepath.add(python.target_py_include_dir)
-
-        if python.version >= (3, 8):
-            used_includepath.add(python.target_py_include_dir + '/internal')
-
-        used_libs.add('-L' + self._sysroot.target_lib_dir)
-        used_libs.add('-l' + python.target_py_lib)
-
-        for part in parts.values():
-            # Ignore core parts.
-            if part.core:
-                continue
-
-            if isinstance(part, ExtensionModule):
-                if python.install_from_source:
-                    used_inittab.add(part.unscoped_name)
-
-                    self._add_values(used_sources, part.source, part)
-
-                    if part.qmake_config is not None:
-                        qmake_config.update(part.qmake_config)
-
-                    if part.qmake_cpp11:
-                        qmake_cpp11 = True
-
-                    if part.qmake_qt is not None:
-                        qmake_qt.update(part.qmake_qt)
-                elif target_platform == 'win' and part.pyd is not None:
-                    used_dlls.add(part)
-            elif isinstance(part, ComponentLibrary):
-                if part.bundle_shared_libs:
-                    self._add_bundled_shared_libs(part.libs,
-                            bundled_shared_libs)
-            else:
-                continue
-
-            self._add_values(used_defines, part.defines, part,
-                    is_filename=False)
-            self._add_values(used_libs, part.libs, part, is_filename=False)
-            self._add_values(used_includepath, part.includepath, part)
-
-        # Generate QT.
-        if qmake_qt:
-            f.write('QT += %s\n' % ' '.join(qmake_qt))
-
-        #osh 
-        f.write('QT += core5compat\n' )
-
-        # Generate CONFIG.
-        config = ['warn_off']
-
-        if target_platform == 'win':
-            if project.application_is_console:
-                config.append('console')
-
-        if qmake_cpp11:
-            config.append('c++11')
-
-        f.write('CONFIG += {0}\n'.format(' '.join(config)))
-
-        if target_platform == 'macos':
-            if not project.application_is_bundle:
-                f.write('CONFIG -= app_bundle\n')
-
-        if qmake_config:
-            f.write('CONFIG += %s\n' % ' '.join(qmake_config))
-
-        # Python requires C99 at least.  Note that specifying 'c++11' in
-        # 'CONFIG' doesn't affect 'CFLAGS'.
-        if target_platform != 'win':
-            f.write('\n')
-
-            if python.version >= (3, 11):
-                f.write('QMAKE_CFLAGS += -std=c11\n')
-            else:
-                f.write('QMAKE_CFLAGS += -std=c99\n')
-
-        # Specify the resource files.
-        f.write('\n')
-        f.write('RESOURCES = \\\n')
-        f.write(' \\\n'.join(['    resources/{0}'.format(n) for n in resource_names]))
-        f.write('\n')
-
-        # Specify the defines.
-        defines = []
-        headers = ['pyqtdeploy_version.h', 'frozen_bootstrap.h',
-                'frozen_bootstrap_external.h']
-
-        if project.application_script != '':
-            defines.append('PYQTDEPLOY_FROZEN_MAIN')
-            headers.append('frozen_main.h')
-
-        if opt:
-            defines.append('PYQTDEPLOY_OPTIMIZED')
-
-        if defines or used_defines:
-            f.write('\n')
-
-            if defines:
-                f.write('DEFINES += {0}\n'.format(' '.join(defines)))
-
-            self._write_used_values(f, used_defines, 'DEFINES')
-
-        # Specify the include paths.
-        if used_includepath:
-            f.write('\n')
-            self._write_used_values(f, used_includepath, 'INCLUDEPATH')
-
-        # Specify the source files and header files.
-        f.write('\n')
-        f.write('SOURCES = pyqtdeploy_main.cpp pyqtdeploy_start.cpp pdytools_module.cpp\n')
-        self._write_used_values(f, used_sources, 'SOURCES')
-        self._write_main(used_inittab, used_defines)
-        self._copy_to_build_dir('pyqtdeploy_start.cpp')
-        self._copy_to_build_dir('pdytools_module.cpp')
-
-        f.write('\n')
-        f.write('HEADERS = {0}\n'.format(' '.join(headers)))
-
-        # Specify the libraries.
-        if used_libs:
-            f.write('\n')
-            self._write_used_values(f, used_libs, 'LIBS')
-
-        # Additional platform=specific configuration.
-        if target_platform == 'android':
-            f.write('\n')
-            f.write('ANDROID_ABIS = {}\n'.format(self._target.android_abi))
-
-            if bundled_shared_libs:
-                f.write(
-                        'ANDROID_EXTRA_LIBS += %s\n' % ' '.join(
-                                bundled_shared_libs))
-        elif target_platform == 'win':
-            # If we are using the installed Python on Windows then copy in the
-            # required DLLs.
-            if used_dlls:
-                self._copy_python_dlls(python, used_dlls, f)
-
-            # Copy in any component DLLs.
-            if bundled_shared_libs:
-                self._copy_dlls(bundled_shared_libs, f)
-
-        # Add the project independent post-configuration stuff.
-        f.write('\n')
-        f.write(resources.read_text(lib_package, 'post_configuration.pro'))
-
-        # Add any application specific stuff.
-        qmake_configuration = project.qmake_configuration.strip()
-
-        if qmake_configuration != '':
-            f.write('\n' + qmake_configuration + '\n')
-
-        # All done.
-        f.close()
-
     def _write_resource(self, resources_contents, nr=-1):
         """ Write a single resource file and return its basename. """
 
@@ -802,57 +1093,95 @@ int main(int argc, char **argv)
 
         return basename
 
-    # The map of non-C/C++ source extensions to qmake variable.
-    _source_extensions = (
-        ('.asm',    'MASMSOURCES'),
-        ('.h',      'HEADERS'),
-        ('.java',   'JAVASOURCES'),
-        ('.l',      'LEXSOURCES'),
-        ('.pyx',    'CYTHONSOURCES'),
-        ('.y',      'YACCSOURCES')
-    )
+    def _write_resources_header(self, rcc_names):
+        """ Create the header file containing the names of the external .rcc
+        files.
+        """
 
-    @classmethod
-    def _write_used_values(cls, f, used_values, name):
-        """ Write a set of used values to a .pro file. """
+        with create_file(os.path.join(self._build_dir, 'pyqtdeploy_resources.h')) as hf:
+            hf.write('static const char *pyqtdeploy_resources[] = {\n')
 
-        # Sort them for reproduceable output.
-        for value in sorted(used_values):
-            qmake_var = name
+            for rcc_name in rcc_names:
+                hf.write('    "{0}",\n'.format(rcc_name))
+
+            hf.write('    NULL\n};\n')
 
-            if qmake_var == 'SOURCES':
-                for ext, var in cls._source_extensions:
-                    if value.endswith(ext):
-                        qmake_var = var
+    # The extensions of the source files that can be amalgamated into a unity
+    # source file and the extension of that file.
+    _unity_extensions = {
+        '.c':   '.c',
+        '.cc':  '.cpp',
+        '.cpp': '.cpp',
+        '.cxx': '.cpp',
+    }
+
+    def _write_unity_sources(self, used_sources, nr_units):
+        """ Amalgamate C and C++ source files into a number of unity source
+        files and return the new set of used sources.  Files that define a
+        macro, a file scope static name, a typedef or a struct, union or enum
+        tag already defined by another file in a unity source file are placed
+        in a different one or left alone.  Files that must be at the start of
+        a translation unit (i.e. that define macros before including Python.h)
+        or that undefine macros are also left alone.
+        """
+
+        sources = set()
+        candidates = {}
+
+        for source in used_sources:
+            unity_ext = self._unity_extensions.get(os.path.splitext(source)[1])
+
+            if (unity_ext is None or has_preamble_defines(source) or
+                    has_undefs(source)):
+                sources.add(source)
+            else:
+                candidates.setdefault(unity_ext, []).append(source)
+
+        for unity_ext, candidate_sources in candidates.items():
+            units = [([], set()) for _ in range(nr_units)]
+
+            # Sort them for reproduceable output.
+            for source in sorted(candidate_sources):
+                names = get_file_scope_names(source)
+
+                # Use the smallest unit that doesn't have a conflicting name.
+                for unit_sources, unit_names in sorted(units,
+                        key=lambda u: len(u[0])):
+                    if unit_names.isdisjoint(names):
+                        unit_sources.append(source)
+                        unit_names.update(names)
                         break
+                else:
+                    self._sysroot.verbose(
+                            "excluding {0} from the unity build".format(
+                                    source))
+                    sources.add(source)
 
-            elif qmake_var == 'LIBS':
-                # A (strictly unnecessary) bit of pretty printing.
-                if value.startswith('"-framework') and value.endswith('"'):
-                    value = value[1:-1]
+            for nr, (unit_sources, _) in enumerate(units):
+                if len(unit_sources) == 0:
+                    continue
 
-            f.write('{0} += {1}\n'.format(qmake_var, value))
+                # There is no point in amalgamating a single file.
+                if len(unit_sources) == 1:
+                    sources.add(unit_sources[0])
+                    continue
 
-    def _copy_dlls(self, dlls, f):
-        """ Generate additional qmake commands to install additional DLLs so
-        that the application will be able to run.
-        """
+                unit_name = 'pyqtdeploy_unity_{0}{1}{2}'.format(unity_ext[1:],
+                        nr, unity_ext)
 
-        for dll in dlls:
-            f.write('''
-PDY_DLL = %s
-exists($$PDY_DLL) {
-    CONFIG(debug, debug|release) {
-        QMAKE_POST_LINK += $(COPY_FILE) $$shell_path($$PDY_DLL) $$shell_path($$OUT_PWD/debug) &
-    } else {
-        QMAKE_POST_LINK += $(COPY_FILE) $$shell_path($$PDY_DLL) $$shell_path($$OUT_PWD/release) &
-    }
-}
-''' % dll)
+                with create_file(os.path.join(self._build_dir, unit_name)) as f:
+                    f.write('// Generated unity source file.\n\n')
 
-    def _copy_python_dlls(self, python, parts, f):
-        """ Generate additional qmake commands to install additional DLLs from
-        the Python installation so that the application will be able to run.
+                    for source in unit_sources:
+                        f.write('#include "{0}"\n'.format(source))
+
+                sources.add(unit_name)
+
+        return sources
+
+    def _get_python_dlls(self, python, parts):
+        """ Return the full pathnames of the DLLs from the Python installation
+        needed by the application in order to run.
         """
 
         dlls = []
@@ -875,6 +1204,4 @@ exists($$PDY_DLL) {
         if python.version >= (3, 8):
             dlls.append('vcruntime140_1.dll')
 
-        dlls = [os.path.join(python.target_lib_dir, dll) for dll in dlls]
-
-        self._copy_dlls(dlls, f)
+        return [os.path.join(python.target_lib_dir, dll) for dll in dlls]
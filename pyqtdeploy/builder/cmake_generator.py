@@ -0,0 +1,389 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+from importlib import resources
+import os
+
+from ..build_profiles import get_build_profile_cmake
+from ..file_utilities import create_file
+from ..qt_modules import get_qt_cmake_module
+from ..user_exception import UserException
+
+from . import lib as lib_package
+
+
+# The CMake configuration that implements each supported qmake CONFIG feature
+# used by extension modules.
+_QMAKE_FEATURES = {
+    'qscintilla2': '''target_include_directories(${PROJECT_NAME} PRIVATE
+        ${QT6_INSTALL_PREFIX}/${QT6_INSTALL_HEADERS})
+target_link_directories(${PROJECT_NAME} PRIVATE
+        ${QT6_INSTALL_PREFIX}/${QT6_INSTALL_LIBS})
+target_link_libraries(${PROJECT_NAME} PRIVATE qscintilla2_qt6)
+''',
+}
+
+
+def write_cmake_project(config, build_dir):
+    """ Create the CMakeLists.txt file for CMake from a build configuration
+    and return its name.
+    """
+
+    target_platform = config.target_platform
+    name = config.application_name
+
+    # Check that everything can be expressed before writing anything.
+    qt_modules = {'Core'}
+    for qmake_name in config.qt:
+        qt_modules.add(get_qt_cmake_module(qmake_name))
+
+    for feature in config.qmake_config:
+        if feature not in _QMAKE_FEATURES:
+            raise UserException(
+                    "the '{0}' qmake CONFIG feature is not supported by the "
+                    "cmake generator".format(feature))
+
+    languages = ['C', 'CXX']
+    sources = list(config.sources)
+    cython_sources = []
+
+    # Sort them for reproduceable output.
+    for src in sorted(config.used_sources):
+        ext = os.path.splitext(src)[1]
+
+        if ext == '.pyx':
+            cython_sources.append(src)
+            src = _cython_output(src)
+        elif ext == '.asm':
+            if 'ASM_MASM' not in languages:
+                languages.append('ASM_MASM')
+        elif ext in ('.java', '.l', '.y'):
+            raise UserException(
+                    "'{0}' cannot be built by the cmake generator".format(
+                            src))
+
+        sources.append(src)
+
+    sources.extend(config.headers)
+
+    if not config.external_resources:
+        sources.extend(['resources/' + n for n in config.resource_names])
+
+    # Create the file.
+    cmake_name = os.path.join(build_dir, 'CMakeLists.txt')
+    f = create_file(cmake_name)
+
+    f.write('# Generated for {0} and Python v{1}.\n\n'.format(
+            config.target.name, config.python_version))
+
+    f.write('cmake_minimum_required(VERSION 3.21)\n')
+    f.write('\n')
+    f.write('project({0} LANGUAGES {1})\n'.format(name, ' '.join(languages)))
+    f.write('\n')
+    f.write('find_package(Qt6 REQUIRED COMPONENTS {0})\n'.format(
+            ' '.join(sorted(qt_modules))))
+
+    if not config.external_resources:
+        f.write('\n')
+        f.write('set(CMAKE_AUTORCC ON)\n')
+
+    # Generate the C source files from any Cython source files.
+    for src in cython_sources:
+        output = _cython_output(src)
+
+        f.write('''
+add_custom_command(OUTPUT {0}
+        COMMAND ${{CMAKE_COMMAND}} -E make_directory {1}
+        COMMAND cython {2} -o {0}
+        DEPENDS {2}
+        VERBATIM)
+'''.format(_quote_path(output),
+                _quote_path(output.rsplit('/', maxsplit=1)[0]),
+                _quote_path(src)))
+
+    # Specify the executable and its source files.
+    executable_type = ''
+
+    if target_platform == 'win':
+        if not config.is_console:
+            executable_type = ' WIN32'
+    elif target_platform == 'macos':
+        if config.is_bundle:
+            executable_type = ' MACOSX_BUNDLE'
+    elif target_platform == 'ios':
+        executable_type = ' MACOSX_BUNDLE'
+
+    f.write('\n')
+    f.write('qt_add_executable({0}{1}\n'.format(name, executable_type))
+
+    for src in sources:
+        f.write('    {0}\n'.format(_quote_path(src)))
+
+    f.write(')\n')
+
+    # Warnings from third-party code are not of interest.
+    f.write('''
+if(MSVC)
+    target_compile_options({0} PRIVATE /W0)
+else()
+    target_compile_options({0} PRIVATE -w)
+endif()
+'''.format(name))
+
+    # Python requires C99 at least.  Note that Qt v6 requires C++17 so there
+    # is nothing to do for extension modules that require C++11.
+    if config.c_standard is not None:
+        f.write('\n')
+        f.write(
+                'set_property(TARGET {0} PROPERTY C_STANDARD {1})\n'.format(
+                        name, config.c_standard[1:]))
+
+    # Specify the resource files.
+    if config.external_resources:
+        _write_external_resources(f, config)
+    elif not config.compress_resources:
+        f.write('\n')
+        f.write(
+                'set_property(TARGET {0} PROPERTY AUTORCC_OPTIONS '
+                        '-no-compress)\n'.format(name))
+
+    # Specify the defines.
+    defines = config.defines + sorted(config.used_defines)
+
+    if defines:
+        f.write('\n')
+        _write_values(f, name, 'target_compile_definitions', defines)
+
+    # Specify the include paths.
+    if config.used_includepath:
+        f.write('\n')
+        _write_values(f, name, 'target_include_directories',
+                sorted(config.used_includepath), are_paths=True)
+
+    # Specify any precompiled header.
+    if config.precompiled_header is not None:
+        _write_precompiled_header(f, config)
+
+    # Specify the libraries.  Sort them for reproduceable output.
+    lib_dirs = []
+    libs = ['Qt6::' + m for m in sorted(qt_modules)]
+
+    for lib in sorted(config.used_libs):
+        if lib.startswith('-L'):
+            lib_dirs.append(lib[2:])
+        else:
+            libs.append(lib)
+
+    if lib_dirs:
+        f.write('\n')
+        _write_values(f, name, 'target_link_directories', lib_dirs,
+                are_paths=True)
+
+    f.write('\n')
+    _write_values(f, name, 'target_link_libraries', libs)
+
+    for feature in sorted(config.qmake_config):
+        f.write('\n')
+        f.write('# The {0} qmake CONFIG feature.\n'.format(feature))
+        f.write(_QMAKE_FEATURES[feature])
+
+    # Additional platform=specific configuration.
+    if target_platform == 'android':
+        f.write('\n')
+        f.write('set_property(TARGET {0} PROPERTY QT_ANDROID_ABIS {1})\n'.format(
+                name, config.target.android_abi))
+
+        if config.android_extra_libs:
+            f.write(
+                    'set_property(TARGET {0} APPEND PROPERTY '
+                            'QT_ANDROID_EXTRA_LIBS {1})\n'.format(name,
+                                    ' '.join([_quote_path(lib) for lib in sorted(config.android_extra_libs)])))
+    elif target_platform == 'win':
+        # Copy in any DLLs so that the application will be able to run.
+        _copy_dlls(f, name, config.dlls)
+
+    # Add the project independent post-configuration stuff.
+    f.write('\n')
+    f.write(resources.read_text(lib_package, 'post_configuration.cmake'))
+
+    # Add any build profile and report the size of the resulting binary.
+    build_profile_cmake = get_build_profile_cmake(config.build_profile)
+
+    if build_profile_cmake != '':
+        f.write('\n' + build_profile_cmake)
+        f.write('''
+if(NOT WIN32)
+    add_custom_command(TARGET {0} POST_BUILD
+            COMMAND wc -c $<TARGET_FILE:{0}>
+            VERBATIM)
+endif()
+'''.format(name))
+
+    # Use the same default build type as qmake.
+    f.write('''
+if(NOT CMAKE_BUILD_TYPE)
+    set(CMAKE_BUILD_TYPE Release)
+endif()
+''')
+
+    # All done.
+    f.close()
+
+    return cmake_name
+
+
+def _copy_dlls(f, name, dlls):
+    """ Generate additional CMake commands to install additional DLLs so that
+    the application will be able to run.
+    """
+
+    for dll in dlls:
+        dll = _quote_path(dll)
+
+        f.write('''
+if(EXISTS {1})
+    add_custom_command(TARGET {0} POST_BUILD
+            COMMAND ${{CMAKE_COMMAND}} -E copy_if_different {1} $<TARGET_FILE_DIR:{0}>
+            VERBATIM)
+endif()
+'''.format(name, dll))
+
+
+def _cython_output(src):
+    """ Return the name of the C source file generated from a Cython source
+    file.  The full path of the source file is reproduced in the build
+    directory so that source files with the same name do not clash.
+    """
+
+    path = os.path.splitext(src.replace('\\', '/'))[0]
+
+    # Remove any Windows drive separator and make the path relative.
+    path = path.replace(':', '').lstrip('/')
+
+    return '${CMAKE_CURRENT_BINARY_DIR}/cython/' + path + '.c'
+
+
+def _quote(value):
+    """ Return a value quoted if necessary so that it is a single CMake
+    argument.
+    """
+
+    if value.startswith('"') and value.endswith('"'):
+        return value
+
+    if any(c in value for c in ' \t"#;()'):
+        return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+    return value
+
+
+def _quote_path(path):
+    """ Return a path quoted if necessary so that it is a single CMake
+    argument.
+    """
+
+    # CMake requires UNIX separators.
+    return _quote(path.replace('\\', '/'))
+
+
+def _write_external_resources(f, config):
+    """ Write the CMake configuration that builds each resource file as an
+    external .rcc file.
+    """
+
+    name = config.application_name
+    target_platform = config.target_platform
+
+    # Where the .rcc files are created depends on where they need to be
+    # deployed.
+    f.write('\n')
+
+    if target_platform == 'android':
+        f.write('''# The .rcc files are installed as assets.
+set(PDY_RCC_DIR ${{CMAKE_CURRENT_BINARY_DIR}}/android/assets)
+set_property(TARGET {0} PROPERTY QT_ANDROID_PACKAGE_SOURCE_DIR
+        ${{CMAKE_CURRENT_BINARY_DIR}}/android)
+'''.format(name))
+    else:
+        f.write('''# The .rcc files are created in the same directory as the executable.
+set(PDY_RCC_DIR ${CMAKE_CURRENT_BINARY_DIR})
+''')
+
+    options = '' if config.compress_resources else ' OPTIONS -no-compress'
+    is_bundle = (target_platform == 'ios' or (target_platform == 'macos' and config.is_bundle))
+
+    for nr, (resource_name, rcc_name) in enumerate(
+            zip(config.resource_names, config.rcc_names)):
+        rcc_file = '${PDY_RCC_DIR}/' + rcc_name
+
+        f.write('''
+qt_add_binary_resources({0}_rcc{1} resources/{2}
+        DESTINATION {3}{4})
+add_dependencies({0} {0}_rcc{1})
+'''.format(name, nr, resource_name, rcc_file, options))
+
+        # The .rcc files are copied to the Resources directory of a macOS
+        # application bundle and the top-level directory of an iOS one.
+        if is_bundle:
+            f.write('''target_sources({0} PRIVATE {1})
+set_source_files_properties({1} PROPERTIES GENERATED ON
+        MACOSX_PACKAGE_LOCATION Resources)
+'''.format(name, rcc_file))
+
+
+def _write_precompiled_header(f, config):
+    """ Write the CMake configuration that uses a precompiled header. """
+
+    name = config.application_name
+
+    f.write('\n')
+    f.write('target_precompile_headers({0} PRIVATE {1})\n'.format(name,
+            config.precompiled_header))
+
+    # Sources that define macros before including any header file would be
+    # broken by the implicit inclusion of the precompiled header.
+    if config.no_pch_sources:
+        f.write('set_source_files_properties(\n')
+
+        for src in config.no_pch_sources:
+            f.write('    {0}\n'.format(_quote_path(src)))
+
+        f.write('    PROPERTIES SKIP_PRECOMPILE_HEADERS ON\n')
+        f.write(')\n')
+
+
+def _write_values(f, name, command, values, are_paths=False):
+    """ Write a CMake command that applies a list of values to the target. """
+
+    quote = _quote_path if are_paths else _quote
+
+    f.write('{0}({1} PRIVATE\n'.format(command, name))
+
+    for value in values:
+        f.write('    {0}\n'.format(quote(value)))
+
+    f.write(')\n')
@@ -0,0 +1,57 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+from ..user_exception import UserException
+
+from .cmake_generator import write_cmake_project
+from .qmake_generator import write_qmake_project
+
+
+# The names of the generators of the build system's project file in the order
+# they are presented to the user.
+GENERATORS = ('qmake', 'cmake')
+
+
+# The map of each generator to the function that implements it.
+_GENERATORS = {
+    'cmake':    write_cmake_project,
+    'qmake':    write_qmake_project,
+}
+
+
+def get_generator(name):
+    """ Return the function that writes the project file for a generator.  It
+    is passed the build configuration and the name of the build directory and
+    returns the name of the file.
+    """
+
+    try:
+        return _GENERATORS[name]
+    except KeyError:
+        raise UserException(
+                "'{0}' is not a valid generator, it must be one of "
+                "{1}".format(name, ', '.join(GENERATORS)))
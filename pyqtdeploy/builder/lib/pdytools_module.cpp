@@ -24,17 +24,25 @@
 // POSSIBILITY OF SUCH DAMAGE.
 
 
+#include <stdlib.h>
+#include <string.h>
+
 #include <Python.h>
 #include <marshal.h>
+#include <pythread.h>
 #include <structmember.h>
 
 #include <QByteArray>
 #include <QChar>
 #include <QDir>
+#include <QElapsedTimer>
 #include <QFile>
 #include <QFileInfo>
+#include <QResource>
+#include <QSet>
 #include <QString>
 #include <QStringList>
+#include <QThread>
 #include <QVector>
 
 #include "pyqtdeploy_version.h"
@@ -47,13 +55,26 @@
 
 extern "C" {
 
+// The module function declarations.
+static PyObject *pdytools_mark_trace(PyObject *self, PyObject *arg);
+static PyObject *pdytools_stats(PyObject *self, PyObject *);
+
+
+// The module function table.
+static PyMethodDef pdytools_methods[] = {
+    {"mark_trace", pdytools_mark_trace, METH_O, NULL},
+    {"stats", pdytools_stats, METH_NOARGS, NULL},
+    {NULL, NULL, 0, NULL}
+};
+
+
 // The module definition structure.
 static struct PyModuleDef pdytoolsmodule = {
     PyModuleDef_HEAD_INIT,
     "pdytools",
     NULL,
     -1,
-    NULL,
+    pdytools_methods,
     NULL,
     NULL,
     NULL,
@@ -73,13 +94,17 @@ PyObject *PyInit_pdytools();
 
 static int qrcimporter_init(PyObject *self, PyObject *args, PyObject *kwds);
 static void qrcimporter_dealloc(PyObject *self);
+static PyObject *qrcimporter_create_module(PyObject *self, PyObject *arg);
+static PyObject *qrcimporter_exec_module(PyObject *self, PyObject *arg);
 static PyObject *qrcimporter_find_loader(PyObject *self, PyObject *args);
 static PyObject *qrcimporter_find_module(PyObject *self, PyObject *args);
+static PyObject *qrcimporter_find_spec(PyObject *self, PyObject *args);
 static PyObject *qrcimporter_get_code(PyObject *self, PyObject *args);
 static PyObject *qrcimporter_get_data(PyObject *self, PyObject *args);
 static PyObject *qrcimporter_get_resource_reader(PyObject *self,
         PyObject *arg);
 static PyObject *qrcimporter_get_source(PyObject *self, PyObject *args);
+static PyObject *qrcimporter_invalidate_caches(PyObject *self, PyObject *);
 static PyObject *qrcimporter_is_package(PyObject *self, PyObject *args);
 static PyObject *qrcimporter_load_module(PyObject *self, PyObject *args);
 
@@ -94,17 +119,25 @@ typedef struct _qrcimporter
 
     // The component parts of the path.
     QStringList *path_parts;
+
+    // The fully qualified names of the modules known not to be found by the
+    // importer.
+    QSet<QString> *not_found;
 } QrcImporter;
 
 
 // The importer method table.
 static PyMethodDef qrcimporter_methods[] = {
+    {"create_module", qrcimporter_create_module, METH_O, NULL},
+    {"exec_module", qrcimporter_exec_module, METH_O, NULL},
     {"find_loader", qrcimporter_find_loader, METH_VARARGS, NULL},
     {"find_module", qrcimporter_find_module, METH_VARARGS, NULL},
+    {"find_spec", qrcimporter_find_spec, METH_VARARGS, NULL},
     {"get_code", qrcimporter_get_code, METH_VARARGS, NULL},
     {"get_data", qrcimporter_get_data, METH_VARARGS, NULL},
     {"get_resource_reader", qrcimporter_get_resource_reader, METH_O, NULL},
     {"get_source", qrcimporter_get_source, METH_VARARGS, NULL},
+    {"invalidate_caches", qrcimporter_invalidate_caches, METH_NOARGS, NULL},
     {"is_package", qrcimporter_is_package, METH_VARARGS, NULL},
     {"load_module", qrcimporter_load_module, METH_VARARGS, NULL},
     {NULL, NULL, 0, NULL}
@@ -178,6 +211,7 @@ typedef struct _qrcreader
 static int qrcreader_init(PyObject *self, PyObject *args, PyObject *kwds);
 static void qrcreader_dealloc(PyObject *self);
 static PyObject *qrcreader_contents(PyObject *self, PyObject *);
+static PyObject *qrcreader_files(PyObject *self, PyObject *);
 static PyObject *qrcreader_is_resource(PyObject *self, PyObject *args);
 static PyObject *qrcreader_open_resource(PyObject *self, PyObject *arg);
 static PyObject *qrcreader_resource_path(PyObject *self, PyObject *arg);
@@ -186,6 +220,7 @@ static PyObject *qrcreader_resource_path(PyObject *self, PyObject *arg);
 // The reader method table.
 static PyMethodDef qrcreader_methods[] = {
     {"contents", qrcreader_contents, METH_NOARGS, NULL},
+    {"files", qrcreader_files, METH_NOARGS, NULL},
     {"is_resource", qrcreader_is_resource, METH_VARARGS, NULL},
     {"open_resource", qrcreader_open_resource, METH_O, NULL},
     {"resource_path", qrcreader_resource_path, METH_O, NULL},
@@ -246,6 +281,115 @@ static PyTypeObject QrcReader_Type = {
 };
 
 
+// The traversable object structure.
+typedef struct _qrctraversable
+{
+    PyObject_HEAD
+
+    // The pathname of the file or directory.
+    QString *pathname;
+} QrcTraversable;
+
+
+// The traversable method declarations.
+static void qrctraversable_dealloc(PyObject *self);
+static PyObject *qrctraversable_repr(PyObject *self);
+static PyObject *qrctraversable_str(PyObject *self);
+static PyObject *qrctraversable_truediv(PyObject *self, PyObject *arg);
+static PyObject *qrctraversable_is_dir(PyObject *self, PyObject *);
+static PyObject *qrctraversable_is_file(PyObject *self, PyObject *);
+static PyObject *qrctraversable_iterdir(PyObject *self, PyObject *);
+static PyObject *qrctraversable_joinpath(PyObject *self, PyObject *args);
+static PyObject *qrctraversable_open(PyObject *self, PyObject *args,
+        PyObject *kwds);
+static PyObject *qrctraversable_read_bytes(PyObject *self, PyObject *);
+static PyObject *qrctraversable_read_text(PyObject *self, PyObject *args,
+        PyObject *kwds);
+
+
+// The traversable method table.
+static PyMethodDef qrctraversable_methods[] = {
+    {"is_dir", qrctraversable_is_dir, METH_NOARGS, NULL},
+    {"is_file", qrctraversable_is_file, METH_NOARGS, NULL},
+    {"iterdir", qrctraversable_iterdir, METH_NOARGS, NULL},
+    {"joinpath", qrctraversable_joinpath, METH_VARARGS, NULL},
+    {"open", (PyCFunction)qrctraversable_open, METH_VARARGS|METH_KEYWORDS,
+            NULL},
+    {"read_bytes", qrctraversable_read_bytes, METH_NOARGS, NULL},
+    {"read_text", (PyCFunction)qrctraversable_read_text,
+            METH_VARARGS|METH_KEYWORDS, NULL},
+    {NULL, NULL, 0, NULL}
+};
+
+
+// The traversable get/set declarations.
+static PyObject *qrctraversable_get_name(PyObject *self, void *);
+
+
+// The traversable get/set table.
+static PyGetSetDef qrctraversable_getset[] = {
+    {"name", qrctraversable_get_name, NULL, NULL},
+    {NULL, NULL, NULL, NULL}
+};
+
+
+// The traversable number methods.
+static PyNumberMethods qrctraversable_as_number;
+
+
+// The traversable type structure.
+static PyTypeObject QrcTraversable_Type = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    "pdytools.qrctraversable",
+    sizeof (QrcTraversable),
+    0,                                          // tp_itemsize
+    qrctraversable_dealloc,                     // tp_dealloc
+    0,                                          // tp_print
+    0,                                          // tp_getattr
+    0,                                          // tp_setattr
+    0,                                          // tp_reserved
+    qrctraversable_repr,                        // tp_repr
+    &qrctraversable_as_number,                  // tp_as_number
+    0,                                          // tp_as_sequence
+    0,                                          // tp_as_mapping
+    0,                                          // tp_hash
+    0,                                          // tp_call
+    qrctraversable_str,                         // tp_str
+    0,                                          // tp_getattro
+    0,                                          // tp_setattro
+    0,                                          // tp_as_buffer
+    Py_TPFLAGS_DEFAULT,                         // tp_flags
+    0,                                          // tp_doc
+    0,                                          // tp_traverse
+    0,                                          // tp_clear
+    0,                                          // tp_richcompare
+    0,                                          // tp_weaklistoffset
+    0,                                          // tp_iter
+    0,                                          // tp_iternext
+    qrctraversable_methods,                     // tp_methods
+    0,                                          // tp_members
+    qrctraversable_getset,                      // tp_getset
+    0,                                          // tp_base
+    0,                                          // tp_dict
+    0,                                          // tp_descr_get
+    0,                                          // tp_descr_set
+    0,                                          // tp_dictoffset
+    0,                                          // tp_init
+    0,                                          // tp_alloc
+    0,                                          // tp_new
+    0,                                          // tp_free
+    0,                                          // tp_is_gc
+    0,                                          // tp_bases
+    0,                                          // tp_mro
+    0,                                          // tp_cache
+    0,                                          // tp_subclasses
+    0,                                          // tp_weaklist
+    0,                                          // tp_del
+    0,                                          // tp_version_tag
+    0,                                          // tp_finalize
+};
+
+
 // The resource object structure.
 typedef struct _qrcresource
 {
@@ -253,27 +397,42 @@ typedef struct _qrcresource
 
     // The resource itself.
     QFile *resource;
+
+    // A copy of the data of a compressed resource.  It is only created when
+    // the resource is first accessed as a buffer.
+    QByteArray *data;
 } QrcResource;
 
 
 // The resource method declarations.
 static int qrcresource_init(PyObject *self, PyObject *args, PyObject *kwds);
 static void qrcresource_dealloc(PyObject *self);
+static int qrcresource_getbuffer(PyObject *self, Py_buffer *view, int flags);
 static PyObject *qrcresource_close(PyObject *self, PyObject *);
+static PyObject *qrcresource_enter(PyObject *self, PyObject *);
+static PyObject *qrcresource_exit(PyObject *self, PyObject *);
 static PyObject *qrcresource_flush(PyObject *self, PyObject *);
 static PyObject *qrcresource_read(PyObject *self, PyObject *args);
 static PyObject *qrcresource_readable(PyObject *self, PyObject *);
+static PyObject *qrcresource_readinto(PyObject *self, PyObject *arg);
+static PyObject *qrcresource_seek(PyObject *self, PyObject *args);
 static PyObject *qrcresource_seekable(PyObject *self, PyObject *);
+static PyObject *qrcresource_tell(PyObject *self, PyObject *);
 static PyObject *qrcresource_writable(PyObject *self, PyObject *);
 
 
 // The resource method table.
 static PyMethodDef qrcresource_methods[] = {
+    {"__enter__", qrcresource_enter, METH_NOARGS, NULL},
+    {"__exit__", qrcresource_exit, METH_VARARGS, NULL},
     {"close", qrcresource_close, METH_NOARGS, NULL},
     {"flush", qrcresource_flush, METH_NOARGS, NULL},
     {"read", qrcresource_read, METH_VARARGS, NULL},
     {"readable", qrcresource_readable, METH_NOARGS, NULL},
+    {"readinto", qrcresource_readinto, METH_O, NULL},
+    {"seek", qrcresource_seek, METH_VARARGS, NULL},
     {"seekable", qrcresource_seekable, METH_NOARGS, NULL},
+    {"tell", qrcresource_tell, METH_NOARGS, NULL},
     {"writable", qrcresource_writable, METH_NOARGS, NULL},
     {NULL, NULL, 0, NULL}
 };
@@ -290,6 +449,13 @@ static PyGetSetDef qrcresource_getset[] = {
 };
 
 
+// The resource buffer methods.
+static PyBufferProcs qrcresource_as_buffer = {
+    qrcresource_getbuffer,                      // bf_getbuffer
+    0                                           // bf_releasebuffer
+};
+
+
 // The resource type structure.
 static PyTypeObject QrcResource_Type = {
     PyVarObject_HEAD_INIT(NULL, 0)
@@ -310,7 +476,7 @@ static PyTypeObject QrcResource_Type = {
     0,                                          // tp_str
     0,                                          // tp_getattro
     0,                                          // tp_setattro
-    0,                                          // tp_as_buffer
+    &qrcresource_as_buffer,                     // tp_as_buffer
     Py_TPFLAGS_DEFAULT,                         // tp_flags
     0,                                          // tp_doc
     0,                                          // tp_traverse
@@ -355,15 +521,103 @@ enum ModuleType {
 };
 
 
+// An entry in the module index.
+struct IndexEntry {
+    // The fully qualified name of the module encoded as UTF-8.
+    const char *fqmn;
+
+    // The type of the module.
+    ModuleType type;
+
+    // Set if the module should be loaded lazily.
+    bool lazy;
+};
+
+
+// The module index generated by pyqtdeploy-build.  It describes every module,
+// package and namespace in the application's resources and is sorted by the
+// fully qualified module name.  It means that a lookup needs a binary search
+// rather than a number of probes of the resources.
+#include "pdytools_index.h"
+
+
+// The list of modules to import in the background generated by
+// pyqtdeploy-build.
+#include "pyqtdeploy_warmup.h"
+
+
+// The import statistics.
+static struct {
+    // The number of times a module has been looked up.
+    unsigned long lookups;
+
+    // The number of lookups answered by the module index.
+    unsigned long index_hits;
+
+    // The number of lookups answered by the cache of modules that are known
+    // not to exist.
+    unsigned long negative_hits;
+
+    // The number of probes of the resources or file system.
+    unsigned long probes;
+
+    // The number of code objects that have been read.
+    unsigned long code_objects;
+
+    // The number of modules whose execution has been deferred.
+    unsigned long deferred;
+
+    // The number of modules imported by the warm-up thread.
+    unsigned long warmed;
+
+    // The number of bytes copied from resources into intermediate buffers.
+    unsigned long long bytes_copied;
+
+    // The number of bytes used directly from uncompressed resources.
+    unsigned long long bytes_mapped;
+} stats;
+
+
+// The state of the warm-up thread.  The lock is held until the thread has
+// finished.  The other values are only accessed with the GIL held.
+static PyThread_type_lock warmup_finished = NULL;
+static bool warmup_stop = false;
+static unsigned long warmup_main_thread;
+
+
+// The timer used to trace the start of the application and imports.  It is
+// only created if the PYQTDEPLOY_IMPORT_TRACE environment variable is set.
+static QElapsedTimer *import_trace_timer = 0;
+
+
 // The internal API.
 void pdytools_init_executable_dir(const QString &argv0);
 const QDir &pdytools_get_executable_dir();
+void pdytools_init_trace();
+void pdytools_trace(const char *event, const char *name);
+void pdytools_start_warmup();
+void pdytools_stop_warmup();
 
 
 // Other forward declarations.
+static int compare_index_entry(const void *key, const void *entry);
+static ModuleType lookup_index(const QString &fqmn, bool *lazy);
+static bool probe_file(const QString &filename);
+static bool probe_dir(const QString &dirname);
+static bool is_builtin(const QString &fqmn);
+static PyObject *get_bootstrap_attr(const char *module_name, const char *name);
+static PyObject *create_spec(PyObject *py_fqmn, PyObject *loader,
+        const QString &origin, const QString &pathname, bool is_package);
 static ModuleType find_module(QrcImporter *self, const QString &fqmn,
-        QString &pathname, QString &filename);
+        QString &pathname, QString &filename, bool *lazy = 0);
+static PyObject *create_lazy_loader(PyObject *loader);
+static void trace_import(const char *event, PyObject *py_fqmn);
+static void warmup(void *);
+static int main_thread_is_importing();
+static int warmup_import(PyObject *imp, const char *name);
 static bool read_data(const QString &filename, QByteArray &data);
+static bool get_mapped_data(const QString &filename, const char **data,
+        Py_ssize_t *size);
 static PyObject *get_code_object(const QString &filename);
 static void raise_import_error(const QString &fqmn);
 static QString str_to_qstring(PyObject *str);
@@ -371,12 +625,25 @@ static PyObject *qstring_to_str(const QString &qstring);
 static bool parse_qstring(PyObject *args, const char *fmt, QString &qstring,
         PyObject **str_obj = 0);
 static QString get_resource_path(QrcReader *reader, const QString &resource);
+static PyObject *create_traversable(const QString &pathname);
+static bool open_resource(QrcResource *self, const QString &pathname);
+static QFile *get_open_resource(PyObject *self);
 
 
 // The directory containing the application executable.
 static QDir *executable_dir = 0;
 
 
+// Set if modules that are not in the index should be looked for in the
+// resources.  This is only needed once the application has registered
+// resources of its own and then invalidated the import caches.
+static bool probe_resources = false;
+
+
+// The paths for which an importer has been created.
+static QSet<QString> *importer_paths = 0;
+
+
 // The importer initialisation function.
 static int qrcimporter_init(PyObject *self, PyObject *args, PyObject *kwds)
 {
@@ -402,12 +669,26 @@ static int qrcimporter_init(PyObject *self, PyObject *args, PyObject *kwds)
     if (!q_path->endsWith(QChar('/')))
         q_path->append(QChar('/'));
 
+    // From Python v3.10 importlib.invalidate_caches() discards the importers
+    // for relative paths (which includes ours) rather than calling their
+    // invalidate_caches() method.  Therefore a second importer for the same
+    // path means that the caches have been invalidated.
+    if (!importer_paths)
+        importer_paths = new QSet<QString>;
+
+    if (importer_paths->contains(*q_path))
+        probe_resources = true;
+    else
+        importer_paths->insert(*q_path);
+
     ((QrcImporter *)self)->path = q_path;
 
     ((QrcImporter *)self)->path_parts = new QStringList(
             q_path->mid(2, q_path->length() - 3).split(QChar('/'),
                     Qt::SkipEmptyParts));
 
+    ((QrcImporter *)self)->not_found = new QSet<QString>;
+
     return 0;
 }
 
@@ -427,6 +708,12 @@ static void qrcimporter_dealloc(PyObject *self)
         ((QrcImporter *)self)->path_parts = 0;
     }
 
+    if (((QrcImporter *)self)->not_found)
+    {
+        delete ((QrcImporter *)self)->not_found;
+        ((QrcImporter *)self)->not_found = 0;
+    }
+
     Py_TYPE(self)->tp_free(self);
 }
 
@@ -529,13 +816,8 @@ static PyObject *qrcimporter_find_module(PyObject *self, PyObject *args)
 
         // If we have failed to find a sub-package then it may be because it is
         // a builtin.
-        if (fqmn.contains(QChar('.')))
-            for (struct _inittab *p = PyImport_Inittab; p->name; ++p)
-                if (fqmn == p->name)
-                {
-                    result = self;
-                    break;
-                }
+        if (is_builtin(fqmn))
+            result = self;
     }
     else
     {
@@ -547,6 +829,238 @@ static PyObject *qrcimporter_find_module(PyObject *self, PyObject *args)
 }
 
 
+// Implement the standard find_spec() method for the importer.
+static PyObject *qrcimporter_find_spec(PyObject *self, PyObject *args)
+{
+    PyObject *py_fqmn, *target = NULL;
+
+    if (!PyArg_ParseTuple(args, "U|O:qrcimporter.find_spec", &py_fqmn, &target))
+        return NULL;
+
+    QString fqmn = str_to_qstring(py_fqmn);
+
+    // The resources are immutable so a module that wasn't found before won't
+    // be found now.
+    QSet<QString> *not_found = ((QrcImporter *)self)->not_found;
+
+    if (not_found->contains(fqmn))
+    {
+        ++stats.negative_hits;
+        Py_RETURN_NONE;
+    }
+
+    QString pathname, filename;
+    bool lazy;
+    PyObject *spec;
+
+    ModuleType mt = find_module((QrcImporter *)self, fqmn, pathname, filename,
+            &lazy);
+
+    switch (mt)
+    {
+    case ModuleIsModule:
+    case ModuleIsPackage:
+        if (lazy)
+        {
+            // Execution of the module is deferred until one of its attributes
+            // is first accessed.
+            PyObject *loader = create_lazy_loader(self);
+            if (!loader)
+                return NULL;
+
+            spec = create_spec(py_fqmn, loader, filename, pathname,
+                    (mt == ModuleIsPackage));
+            Py_DECREF(loader);
+
+            if (spec)
+            {
+                ++stats.deferred;
+                trace_import("defer", py_fqmn);
+            }
+        }
+        else
+        {
+            spec = create_spec(py_fqmn, self, filename, pathname,
+                    (mt == ModuleIsPackage));
+        }
+
+        break;
+
+    case ModuleIsNamespace:
+        spec = create_spec(py_fqmn, Py_None, QString(), pathname, true);
+        break;
+
+    case ModuleIsAdjacentExtensionModule:
+        {
+            // Sub-packages that are dynamically linked extension modules
+            // installed in the same directory as the executable are handled
+            // by the standard loader.
+            static PyObject *extension_file_loader = NULL;
+
+            if (!extension_file_loader)
+            {
+                extension_file_loader = get_bootstrap_attr(
+                        "_frozen_importlib_external", "ExtensionFileLoader");
+
+                if (!extension_file_loader)
+                    return NULL;
+            }
+
+            PyObject *py_filename = qstring_to_str(filename);
+            if (!py_filename)
+                return NULL;
+
+            PyObject *loader = PyObject_CallFunctionObjArgs(
+                    extension_file_loader, py_fqmn, py_filename, NULL);
+
+            Py_DECREF(py_filename);
+
+            if (!loader)
+                return NULL;
+
+            spec = create_spec(py_fqmn, loader, filename, QString(), false);
+            Py_DECREF(loader);
+
+            break;
+        }
+
+    default:
+        // If we have failed to find a sub-package then it may be because it
+        // is a builtin.
+        if (is_builtin(fqmn))
+        {
+            static PyObject *builtin_importer = NULL;
+
+            trace_import("builtin", py_fqmn);
+
+            if (!builtin_importer)
+            {
+                builtin_importer = get_bootstrap_attr("_frozen_importlib",
+                        "BuiltinImporter");
+
+                if (!builtin_importer)
+                    return NULL;
+            }
+
+            return PyObject_CallMethod(builtin_importer, "find_spec", "O",
+                    py_fqmn);
+        }
+
+        // An adjacent extension module cannot be found until the executable
+        // directory is known so don't remember any failure before then.
+        if (executable_dir)
+            not_found->insert(fqmn);
+
+        spec = Py_None;
+        Py_INCREF(spec);
+    }
+
+    return spec;
+}
+
+
+// Implement the standard create_module() method for the importer.
+static PyObject *qrcimporter_create_module(PyObject *self, PyObject *arg)
+{
+    // Use the default module creation semantics.
+    Py_RETURN_NONE;
+}
+
+
+// Implement the standard exec_module() method for the importer.
+static PyObject *qrcimporter_exec_module(PyObject *self, PyObject *arg)
+{
+    if (!PyModule_Check(arg))
+    {
+        PyErr_SetString(PyExc_TypeError,
+                "qrcimporter.exec_module: argument must be a module");
+        return NULL;
+    }
+
+    // The spec already contains the name of the resource so we don't need to
+    // find it again.
+    PyObject *spec = PyObject_GetAttrString(arg, "__spec__");
+    if (!spec)
+        return NULL;
+
+    PyObject *loader_state = PyObject_GetAttrString(spec, "loader_state");
+
+    if (!loader_state)
+    {
+        Py_DECREF(spec);
+        return NULL;
+    }
+
+    // If the module is being loaded lazily then importlib will have replaced
+    // the loader state with its own so use the origin instead.
+    if (!PyUnicode_Check(loader_state))
+    {
+        Py_DECREF(loader_state);
+
+        loader_state = PyObject_GetAttrString(spec, "origin");
+
+        if (!loader_state)
+        {
+            Py_DECREF(spec);
+            return NULL;
+        }
+
+        if (!PyUnicode_Check(loader_state))
+        {
+            Py_DECREF(loader_state);
+            Py_DECREF(spec);
+
+            PyErr_SetString(PyExc_ImportError,
+                    "qrcimporter: the module spec has no resource name");
+            return NULL;
+        }
+    }
+
+    if (import_trace_timer)
+    {
+        PyObject *py_fqmn = PyObject_GetAttrString(spec, "name");
+
+        if (!py_fqmn)
+        {
+            Py_DECREF(loader_state);
+            Py_DECREF(spec);
+            return NULL;
+        }
+
+        trace_import("exec", py_fqmn);
+        Py_DECREF(py_fqmn);
+    }
+
+    Py_DECREF(spec);
+
+    PyObject *code = get_code_object(str_to_qstring(loader_state));
+    Py_DECREF(loader_state);
+
+    if (!code)
+        return NULL;
+
+    PyObject *mod_dict = PyModule_GetDict(arg);
+
+    // This is what the exec() builtin does.
+    if (!PyDict_GetItemString(mod_dict, "__builtins__"))
+        if (PyDict_SetItemString(mod_dict, "__builtins__", PyEval_GetBuiltins()) < 0)
+        {
+            Py_DECREF(code);
+            return NULL;
+        }
+
+    PyObject *res = PyEval_EvalCode(code, mod_dict, mod_dict);
+    Py_DECREF(code);
+
+    if (!res)
+        return NULL;
+
+    Py_DECREF(res);
+
+    Py_RETURN_NONE;
+}
+
+
 // Implement the standard load_module() method for the importer.
 static PyObject *qrcimporter_load_module(PyObject *self, PyObject *args)
 {
@@ -781,6 +1295,13 @@ static PyObject *qrcreader_contents(PyObject *self, PyObject *)
 }
 
 
+// Implement the files() method for the reader.
+static PyObject *qrcreader_files(PyObject *self, PyObject *)
+{
+    return create_traversable(*((QrcReader *)self)->pathname);
+}
+
+
 // Implement the is_resource() method for the reader.
 static PyObject *qrcreader_is_resource(PyObject *self, PyObject *args)
 {
@@ -826,36 +1347,365 @@ static PyObject *qrcreader_resource_path(PyObject *self, PyObject *arg)
 }
 
 
-// The resource initialisation function.
-static int qrcresource_init(PyObject *self, PyObject *args, PyObject *kwds)
+// Create a traversable for a pathname.
+static PyObject *create_traversable(const QString &pathname)
 {
-    // It's not clear if this is part of the public API.
-    if (!_PyArg_NoKeywords("qrcresource()", kwds))
-        return -1;
+    PyObject *self = QrcTraversable_Type.tp_alloc(&QrcTraversable_Type, 0);
+    if (!self)
+        return NULL;
 
-    QrcReader *reader;
-    PyObject *py_resource;
+    ((QrcTraversable *)self)->pathname = new QString(pathname);
 
-    if (!PyArg_ParseTuple(args, "OU:qrcresource", &reader, &py_resource))
-        return -1;
+    return self;
+}
 
-    QFile *resource = new QFile(
-            get_resource_path(reader, str_to_qstring(py_resource)));
 
-    if (!resource->open(QIODevice::ReadOnly))
+// The traversable deallocation function.
+static void qrctraversable_dealloc(PyObject *self)
+{
+    if (((QrcTraversable *)self)->pathname)
     {
-        delete resource;
-        return -1;
+        delete ((QrcTraversable *)self)->pathname;
+        ((QrcTraversable *)self)->pathname = 0;
     }
 
-    ((QrcResource *)self)->resource = resource;
-
-    return 0;
+    Py_TYPE(self)->tp_free(self);
 }
 
 
-// The resource deallocation function.
-static void qrcresource_dealloc(PyObject *self)
+// The traversable repr function.
+static PyObject *qrctraversable_repr(PyObject *self)
+{
+    PyObject *py_pathname = qrctraversable_str(self);
+    if (!py_pathname)
+        return NULL;
+
+    PyObject *repr = PyUnicode_FromFormat("qrctraversable(%R)", py_pathname);
+    Py_DECREF(py_pathname);
+
+    return repr;
+}
+
+
+// The traversable str function.
+static PyObject *qrctraversable_str(PyObject *self)
+{
+    return qstring_to_str(*((QrcTraversable *)self)->pathname);
+}
+
+
+// Implement the / operator for the traversable.
+static PyObject *qrctraversable_truediv(PyObject *self, PyObject *arg)
+{
+    if (!PyObject_TypeCheck(self, &QrcTraversable_Type) || !PyUnicode_Check(arg))
+        Py_RETURN_NOTIMPLEMENTED;
+
+    PyObject *args = PyTuple_Pack(1, arg);
+    if (!args)
+        return NULL;
+
+    PyObject *child = qrctraversable_joinpath(self, args);
+    Py_DECREF(args);
+
+    return child;
+}
+
+
+// Implement the is_dir() method for the traversable.
+static PyObject *qrctraversable_is_dir(PyObject *self, PyObject *)
+{
+    if (QFileInfo(*((QrcTraversable *)self)->pathname).isDir())
+        Py_RETURN_TRUE;
+
+    Py_RETURN_FALSE;
+}
+
+
+// Implement the is_file() method for the traversable.
+static PyObject *qrctraversable_is_file(PyObject *self, PyObject *)
+{
+    if (QFileInfo(*((QrcTraversable *)self)->pathname).isFile())
+        Py_RETURN_TRUE;
+
+    Py_RETURN_FALSE;
+}
+
+
+// Implement the iterdir() method for the traversable.
+static PyObject *qrctraversable_iterdir(PyObject *self, PyObject *)
+{
+    const QString &pathname = *((QrcTraversable *)self)->pathname;
+    QStringList contents(QDir(pathname).entryList());
+
+    PyObject *py_contents = PyList_New(contents.size());
+    if (!py_contents)
+        return NULL;
+
+    for (int i = 0; i < contents.size(); ++i)
+    {
+        PyObject *child = create_traversable(
+                QString("%1/%2").arg(pathname).arg(contents.at(i)));
+        if (!child)
+        {
+            Py_DECREF(py_contents);
+            return NULL;
+        }
+
+        PyList_SET_ITEM(py_contents, i, child);
+    }
+
+    PyObject *iter = PyObject_GetIter(py_contents);
+    Py_DECREF(py_contents);
+
+    return iter;
+}
+
+
+// Implement the joinpath() method for the traversable.
+static PyObject *qrctraversable_joinpath(PyObject *self, PyObject *args)
+{
+    QString pathname = *((QrcTraversable *)self)->pathname;
+
+    for (Py_ssize_t i = 0; i < PyTuple_Size(args); ++i)
+    {
+        PyObject *descendant = PyTuple_GetItem(args, i);
+
+        if (!PyUnicode_Check(descendant))
+        {
+            PyErr_Format(PyExc_TypeError,
+                    "qrctraversable.joinpath: argument %zd must be str, not %s",
+                    i + 1, Py_TYPE(descendant)->tp_name);
+            return NULL;
+        }
+
+        QStringList names = str_to_qstring(descendant).split(QChar('/'),
+                Qt::SkipEmptyParts);
+
+        for (const QString &name : names)
+        {
+            if (name == "..")
+            {
+                PyErr_Format(PyExc_ValueError,
+                        "qrctraversable.joinpath: %R must be a descendant",
+                        descendant);
+                return NULL;
+            }
+
+            if (name != ".")
+                pathname = QString("%1/%2").arg(pathname).arg(name);
+        }
+    }
+
+    return create_traversable(pathname);
+}
+
+
+// Implement the open() method for the traversable.
+static PyObject *qrctraversable_open(PyObject *self, PyObject *args,
+        PyObject *kwds)
+{
+    static const char *kwlist[] = {"mode", "encoding", "errors", "newline",
+            NULL};
+
+    const char *mode = "r";
+    PyObject *encoding = Py_None, *errors = Py_None, *newline = Py_None;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "|sOOO:qrctraversable.open",
+            (char **)kwlist, &mode, &encoding, &errors, &newline))
+        return NULL;
+
+    bool binary;
+
+    if (strcmp(mode, "r") == 0)
+    {
+        binary = false;
+    }
+    else if (strcmp(mode, "rb") == 0)
+    {
+        if (encoding != Py_None || errors != Py_None || newline != Py_None)
+        {
+            PyErr_SetString(PyExc_ValueError,
+                    "qrctraversable.open: binary mode doesn't take an "
+                    "encoding, errors or newline argument");
+            return NULL;
+        }
+
+        binary = true;
+    }
+    else
+    {
+        PyErr_Format(PyExc_ValueError,
+                "qrctraversable.open: invalid mode: '%s'", mode);
+        return NULL;
+    }
+
+    PyObject *resource = QrcResource_Type.tp_alloc(&QrcResource_Type, 0);
+    if (!resource)
+        return NULL;
+
+    if (!open_resource((QrcResource *)resource, *((QrcTraversable *)self)->pathname))
+    {
+        Py_DECREF(resource);
+        return NULL;
+    }
+
+    if (binary)
+        return resource;
+
+    // Text is decoded by wrapping the resource.
+    PyObject *io = PyImport_ImportModule("io");
+    if (!io)
+    {
+        Py_DECREF(resource);
+        return NULL;
+    }
+
+    PyObject *text_resource = PyObject_CallMethod(io, "TextIOWrapper", "OOOO",
+            resource, encoding, errors, newline);
+
+    Py_DECREF(io);
+    Py_DECREF(resource);
+
+    return text_resource;
+}
+
+
+// Implement the read_bytes() method for the traversable.
+static PyObject *qrctraversable_read_bytes(PyObject *self, PyObject *)
+{
+    const QString &pathname = *((QrcTraversable *)self)->pathname;
+    const char *data;
+    Py_ssize_t size;
+
+    if (get_mapped_data(pathname, &data, &size))
+        return PyBytes_FromStringAndSize(data, size);
+
+    QFile resource(pathname);
+
+    if (!resource.open(QIODevice::ReadOnly))
+    {
+        PyErr_Format(PyExc_FileNotFoundError, "%R does not exist", self);
+        return NULL;
+    }
+
+    QByteArray contents = resource.readAll();
+
+    stats.bytes_copied += contents.size();
+
+    return PyBytes_FromStringAndSize(contents.constData(), contents.size());
+}
+
+
+// Implement the read_text() method for the traversable.
+static PyObject *qrctraversable_read_text(PyObject *self, PyObject *args,
+        PyObject *kwds)
+{
+    static const char *kwlist[] = {"encoding", "errors", NULL};
+
+    const char *encoding = "utf-8", *errors = "strict";
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "|zz:qrctraversable.read_text",
+            (char **)kwlist, &encoding, &errors))
+        return NULL;
+
+    if (!encoding)
+        encoding = "utf-8";
+
+    if (!errors)
+        errors = "strict";
+
+    const QString &pathname = *((QrcTraversable *)self)->pathname;
+    const char *data;
+    Py_ssize_t size;
+
+    // Decode directly from the resource if possible.
+    if (get_mapped_data(pathname, &data, &size))
+        return PyUnicode_Decode(data, size, encoding, errors);
+
+    PyObject *contents = qrctraversable_read_bytes(self, NULL);
+    if (!contents)
+        return NULL;
+
+    PyObject *text = PyUnicode_Decode(PyBytes_AsString(contents),
+            PyBytes_Size(contents), encoding, errors);
+    Py_DECREF(contents);
+
+    return text;
+}
+
+
+// Implement the name getter for the traversable.
+static PyObject *qrctraversable_get_name(PyObject *self, void *)
+{
+    const QString &pathname = *((QrcTraversable *)self)->pathname;
+
+    return qstring_to_str(pathname.mid(pathname.lastIndexOf(QChar('/')) + 1));
+}
+
+
+// The resource initialisation function.
+static int qrcresource_init(PyObject *self, PyObject *args, PyObject *kwds)
+{
+    // It's not clear if this is part of the public API.
+    if (!_PyArg_NoKeywords("qrcresource()", kwds))
+        return -1;
+
+    QrcReader *reader;
+    PyObject *py_resource;
+
+    if (!PyArg_ParseTuple(args, "OU:qrcresource", &reader, &py_resource))
+        return -1;
+
+    if (!open_resource((QrcResource *)self, get_resource_path(reader, str_to_qstring(py_resource))))
+        return -1;
+
+    return 0;
+}
+
+
+// Open a resource.
+static bool open_resource(QrcResource *self, const QString &pathname)
+{
+    QFile *resource = new QFile(pathname);
+
+    if (!resource->open(QIODevice::ReadOnly))
+    {
+        delete resource;
+
+        PyObject *py_pathname = qstring_to_str(pathname);
+
+        if (py_pathname)
+        {
+            PyErr_SetObject(PyExc_FileNotFoundError, py_pathname);
+            Py_DECREF(py_pathname);
+        }
+
+        return false;
+    }
+
+    self->resource = resource;
+
+    return true;
+}
+
+
+// Return the open file of a resource.
+static QFile *get_open_resource(PyObject *self)
+{
+    QFile *resource = ((QrcResource *)self)->resource;
+
+    if (!resource || !resource->isOpen())
+    {
+        PyErr_SetString(PyExc_ValueError, "I/O operation on closed resource");
+        return 0;
+    }
+
+    return resource;
+}
+
+
+// The resource deallocation function.
+static void qrcresource_dealloc(PyObject *self)
 {
     QFile *resource = ((QrcResource *)self)->resource;
 
@@ -868,22 +1718,83 @@ static void qrcresource_dealloc(PyObject *self)
         ((QrcResource *)self)->resource = 0;
     }
 
+    if (((QrcResource *)self)->data)
+    {
+        delete ((QrcResource *)self)->data;
+        ((QrcResource *)self)->data = 0;
+    }
+
     Py_TYPE(self)->tp_free(self);
 }
 
 
+// Implement the buffer protocol for the resource.  The buffer refers directly
+// to the data of an uncompressed resource.  A compressed resource has to be
+// uncompressed to a copy that is kept for the lifetime of the resource object.
+static int qrcresource_getbuffer(PyObject *self, Py_buffer *view, int flags)
+{
+    QFile *resource = get_open_resource(self);
+    if (!resource)
+        return -1;
+
+    const char *data;
+    Py_ssize_t size;
+
+    if (!get_mapped_data(resource->fileName(), &data, &size))
+    {
+        QByteArray *copy = ((QrcResource *)self)->data;
+
+        if (!copy)
+        {
+            qint64 pos = resource->pos();
+
+            resource->seek(0);
+            copy = new QByteArray(resource->readAll());
+            resource->seek(pos);
+
+            stats.bytes_copied += copy->size();
+
+            ((QrcResource *)self)->data = copy;
+        }
+
+        data = copy->constData();
+        size = copy->size();
+    }
+
+    return PyBuffer_FillInfo(view, self, (void *)data, size, 1, flags);
+}
+
+
 // Implement the close() method for the resource.
 static PyObject *qrcresource_close(PyObject *self, PyObject *)
 {
     QFile *resource = ((QrcResource *)self)->resource;
 
-    if (resource->isOpen())
+    if (resource && resource->isOpen())
         resource->close();
 
     Py_RETURN_NONE;
 }
 
 
+// Implement the __enter__() method for the resource.
+static PyObject *qrcresource_enter(PyObject *self, PyObject *)
+{
+    if (!get_open_resource(self))
+        return NULL;
+
+    Py_INCREF(self);
+    return self;
+}
+
+
+// Implement the __exit__() method for the resource.
+static PyObject *qrcresource_exit(PyObject *self, PyObject *)
+{
+    return qrcresource_close(self, NULL);
+}
+
+
 // Implement the flush() method for the resource.
 static PyObject *qrcresource_flush(PyObject *self, PyObject *)
 {
@@ -899,7 +1810,9 @@ static PyObject *qrcresource_read(PyObject *self, PyObject *args)
     if (!PyArg_ParseTuple(args, "|n:qrcresource.read", &size))
         return NULL;
 
-    QFile *resource = ((QrcResource *)self)->resource;
+    QFile *resource = get_open_resource(self);
+    if (!resource)
+        return NULL;
 
     QByteArray data = (size < 0 ? resource->readAll() : resource->read(size));
 
@@ -914,10 +1827,96 @@ static PyObject *qrcresource_readable(PyObject *self, PyObject *)
 }
 
 
+// Implement the readinto() method for the resource.  The data is read
+// directly into the caller's buffer.
+static PyObject *qrcresource_readinto(PyObject *self, PyObject *arg)
+{
+    QFile *resource = get_open_resource(self);
+    if (!resource)
+        return NULL;
+
+    Py_buffer view;
+
+    if (PyObject_GetBuffer(arg, &view, PyBUF_WRITABLE) < 0)
+        return NULL;
+
+    qint64 nr_read = resource->read((char *)view.buf, view.len);
+
+    PyBuffer_Release(&view);
+
+    if (nr_read < 0)
+    {
+        PyErr_SetString(PyExc_OSError, "qrcresource: error reading resource");
+        return NULL;
+    }
+
+    return PyLong_FromLongLong(nr_read);
+}
+
+
+// Implement the seek() method for the resource.
+static PyObject *qrcresource_seek(PyObject *self, PyObject *args)
+{
+    long long offset;
+    int whence = SEEK_SET;
+
+    if (!PyArg_ParseTuple(args, "L|i:qrcresource.seek", &offset, &whence))
+        return NULL;
+
+    QFile *resource = get_open_resource(self);
+    if (!resource)
+        return NULL;
+
+    switch (whence)
+    {
+    case SEEK_SET:
+        break;
+
+    case SEEK_CUR:
+        offset += resource->pos();
+        break;
+
+    case SEEK_END:
+        offset += resource->size();
+        break;
+
+    default:
+        PyErr_Format(PyExc_ValueError, "invalid whence (%d, should be 0, 1 or 2)",
+                whence);
+        return NULL;
+    }
+
+    if (offset < 0)
+    {
+        PyErr_Format(PyExc_ValueError, "negative seek position %lld", offset);
+        return NULL;
+    }
+
+    if (!resource->seek(offset))
+    {
+        PyErr_SetString(PyExc_OSError, "qrcresource: error seeking resource");
+        return NULL;
+    }
+
+    return PyLong_FromLongLong(resource->pos());
+}
+
+
 // Implement the seekable() method for the resource.
 static PyObject *qrcresource_seekable(PyObject *self, PyObject *)
 {
-    Py_RETURN_FALSE;
+    Py_RETURN_TRUE;
+}
+
+
+// Implement the tell() method for the resource.
+static PyObject *qrcresource_tell(PyObject *self, PyObject *)
+{
+    QFile *resource = get_open_resource(self);
+    if (!resource)
+        return NULL;
+
+    return PyLong_FromLongLong(resource->pos());
 }
 
 
@@ -933,7 +1932,7 @@ static PyObject *qrcresource_get_closed(PyObject *self, void *)
 {
     QFile *resource = ((QrcResource *)self)->resource;
 
-    if (resource->isOpen())
+    if (resource && resource->isOpen())
         Py_RETURN_FALSE;
 
     Py_RETURN_TRUE;
@@ -947,9 +1946,23 @@ static QString get_resource_path(QrcReader *reader, const QString &resource)
 }
 
 
-// Implement the optional get_source() method for the importer.
-static PyObject *qrcimporter_get_source(PyObject *self, PyObject *args)
-{
+// Implement the optional get_source() method for the importer.
+static PyObject *qrcimporter_get_source(PyObject *self, PyObject *args)
+{
+    Py_RETURN_NONE;
+}
+
+
+// Implement the optional invalidate_caches() method for the importer.  This
+// is called by importlib.invalidate_caches() which an application should call
+// after registering resources containing additional modules.
+static PyObject *qrcimporter_invalidate_caches(PyObject *self, PyObject *)
+{
+    ((QrcImporter *)self)->not_found->clear();
+
+    // The index no longer describes all the modules in the resources.
+    probe_resources = true;
+
     Py_RETURN_NONE;
 }
 
@@ -992,6 +2005,12 @@ static PyObject *qrcimporter_get_data(PyObject *self, PyObject *args)
     if (!parse_qstring(args, "U:qrcimporter.get_data", filename))
         return NULL;
 
+    const char *mapped_data;
+    Py_ssize_t mapped_size;
+
+    if (get_mapped_data(filename, &mapped_data, &mapped_size))
+        return PyBytes_FromStringAndSize(mapped_data, mapped_size);
+
     QByteArray data;
 
     if (!read_data(filename, data))
@@ -1004,8 +2023,13 @@ static PyObject *qrcimporter_get_data(PyObject *self, PyObject *args)
 // Find a fully qualified module name handled by an importer and return its
 // type, path name and file name.
 static ModuleType find_module(QrcImporter *self, const QString &fqmn,
-        QString &pathname, QString &filename)
+        QString &pathname, QString &filename, bool *lazy)
 {
+    ++stats.lookups;
+
+    if (lazy)
+        *lazy = false;
+
     QStringList fqmn_parts = fqmn.split(QChar('.'));
     QString fqmn_last = fqmn_parts.takeLast();
 
@@ -1015,22 +2039,49 @@ static ModuleType find_module(QrcImporter *self, const QString &fqmn,
 
     pathname = *self->path + fqmn_last;
 
-    // See if it is an ordinary module.
-    filename = pathname + ".pyo";
+    // See if it is an ordinary module or a package.
+    ModuleType mt = lookup_index(fqmn, lazy);
+
+    switch (mt)
+    {
+    case ModuleIsModule:
+        filename = pathname + ".pyo";
+        return mt;
+
+    case ModuleIsPackage:
+        filename = pathname + "/__init__.pyo";
+        return mt;
+
+    default:
+        break;
+    }
+
+    // See if it is in resources registered by the application.
+    if (mt == ModuleNotFound && probe_resources)
+    {
+        filename = pathname + ".pyo";
+
+        if (probe_file(filename))
+            return ModuleIsModule;
 
-    if (QFileInfo(filename).isFile())
-        return ModuleIsModule;
+        filename = pathname + "/__init__.pyo";
 
-    // See if it is a package.
-    filename = pathname + "/__init__.pyo";
+        if (probe_file(filename))
+            return ModuleIsPackage;
 
-    if (QFileInfo(filename).isFile())
-        return ModuleIsPackage;
+        if (probe_dir(pathname))
+            mt = ModuleIsNamespace;
+    }
 
-    // See if it is an adjacent extension module.  Allow for the fact that we
-    // can be called before we have set the executable directory.
-    if (executable_dir)
+    // See if it is an adjacent extension module.  The index contains every
+    // extension module installed alongside the executable so the file system
+    // is only accessed for those.  Allow for the fact that we can be called
+    // before we have set the executable directory.
+    if (mt == ModuleIsAdjacentExtensionModule)
     {
+        if (!executable_dir)
+            return ModuleNotFound;
+
         const QDir &exec_dir = pdytools_get_executable_dir();
 
         QString em_name(fqmn);
@@ -1040,32 +2091,206 @@ static ModuleType find_module(QrcImporter *self, const QString &fqmn,
         // The PlugIns directory is the prefered location for dynamic modules.
         filename = exec_dir.filePath(QString("../PlugIns/%1").arg(em_name));
 
-        if (QFileInfo(filename).isFile())
-            return ModuleIsAdjacentExtensionModule;
+        if (probe_file(filename))
+            return mt;
 
         filename = exec_dir.filePath(QString("../Frameworks/%1").arg(em_name));
 
-        if (QFileInfo(filename).isFile())
-            return ModuleIsAdjacentExtensionModule;
+        if (probe_file(filename))
+            return mt;
 #endif
 
+        // Any error will be reported when the module is loaded.
         filename = exec_dir.filePath(em_name);
 
-        if (QFileInfo(filename).isFile())
-            return ModuleIsAdjacentExtensionModule;
+        return mt;
     }
 
     // See if it is a namespace.
-    filename = pathname;
-
-    if (QFileInfo(filename).isDir())
-        return ModuleIsNamespace;
+    if (mt == ModuleIsNamespace)
+    {
+        filename = pathname;
+        return mt;
+    }
 
     // Nothing was found.
     return ModuleNotFound;
 }
 
 
+// Compare a fully qualified module name with an entry of the module index.
+static int compare_index_entry(const void *key, const void *entry)
+{
+    return strcmp((const char *)key, ((const IndexEntry *)entry)->fqmn);
+}
+
+
+// Look up a fully qualified module name in the module index and return its
+// type and, optionally, if it should be loaded lazily.
+static ModuleType lookup_index(const QString &fqmn, bool *lazy)
+{
+    QByteArray key(fqmn.toUtf8());
+
+    const IndexEntry *entry = (const IndexEntry *)bsearch(key.constData(),
+            module_index, module_index_size, sizeof (IndexEntry),
+            compare_index_entry);
+
+    if (!entry)
+        return ModuleNotFound;
+
+    ++stats.index_hits;
+
+    if (lazy)
+        *lazy = entry->lazy;
+
+    return entry->type;
+}
+
+
+// See if a file exists.
+static bool probe_file(const QString &filename)
+{
+    ++stats.probes;
+
+    return QFileInfo(filename).isFile();
+}
+
+
+// See if a directory exists.
+static bool probe_dir(const QString &dirname)
+{
+    ++stats.probes;
+
+    return QFileInfo(dirname).isDir();
+}
+
+
+// See if a fully qualified module name is a builtin sub-package.
+static bool is_builtin(const QString &fqmn)
+{
+    if (fqmn.contains(QChar('.')))
+        for (struct _inittab *p = PyImport_Inittab; p->name; ++p)
+            if (fqmn == p->name)
+                return true;
+
+    return false;
+}
+
+
+// Return an attribute of one of the frozen bootstrap modules.  Unlike
+// importlib these are always available and never need to be imported from the
+// resources.
+static PyObject *get_bootstrap_attr(const char *module_name, const char *name)
+{
+    PyObject *module = PyImport_ImportModule(module_name);
+    if (!module)
+        return NULL;
+
+    PyObject *attr = PyObject_GetAttrString(module, name);
+    Py_DECREF(module);
+
+    return attr;
+}
+
+
+// Create a module spec.  The origin, if any, is also used as the loader state
+// so that the loader doesn't have to find the module again.
+static PyObject *create_spec(PyObject *py_fqmn, PyObject *loader,
+        const QString &origin, const QString &pathname, bool is_package)
+{
+    static PyObject *module_spec = NULL;
+
+    if (!module_spec)
+    {
+        module_spec = get_bootstrap_attr("_frozen_importlib", "ModuleSpec");
+        if (!module_spec)
+            return NULL;
+    }
+
+    PyObject *spec = PyObject_CallFunctionObjArgs(module_spec, py_fqmn, loader,
+            NULL);
+    if (!spec)
+        return NULL;
+
+    if (!origin.isEmpty())
+    {
+        PyObject *py_origin = qstring_to_str(origin);
+        if (!py_origin)
+            goto error;
+
+        int rc = PyObject_SetAttrString(spec, "origin", py_origin);
+
+        if (rc == 0)
+            rc = PyObject_SetAttrString(spec, "loader_state", py_origin);
+
+        Py_DECREF(py_origin);
+
+        if (rc < 0)
+            goto error;
+
+        if (PyObject_SetAttrString(spec, "has_location", Py_True) < 0)
+            goto error;
+    }
+
+    if (is_package)
+    {
+        PyObject *py_pathname = qstring_to_str(pathname);
+        if (!py_pathname)
+            goto error;
+
+        PyObject *locations = Py_BuildValue("[N]", py_pathname);
+        if (!locations)
+            goto error;
+
+        int rc = PyObject_SetAttrString(spec, "submodule_search_locations",
+                locations);
+        Py_DECREF(locations);
+
+        if (rc < 0)
+            goto error;
+    }
+
+    return spec;
+
+error:
+    Py_DECREF(spec);
+    return NULL;
+}
+
+
+// Create a loader that defers the execution of a module loaded by another
+// loader.
+static PyObject *create_lazy_loader(PyObject *loader)
+{
+    static PyObject *lazy_loader = NULL;
+
+    if (!lazy_loader)
+    {
+        PyObject *util = PyImport_ImportModule("importlib.util");
+        if (!util)
+            return NULL;
+
+        lazy_loader = PyObject_GetAttrString(util, "LazyLoader");
+        Py_DECREF(util);
+
+        if (!lazy_loader)
+            return NULL;
+    }
+
+    return PyObject_CallFunctionObjArgs(lazy_loader, loader, NULL);
+}
+
+
+// Write an import event to stderr if tracing is enabled.
+static void trace_import(const char *event, PyObject *py_fqmn)
+{
+    if (!import_trace_timer)
+        return;
+
+    pdytools_trace(event, str_to_qstring(py_fqmn).toUtf8().constData());
+}
+
+
 // Get the data from a file.
 static bool read_data(const QString &filename, QByteArray &data)
 {
@@ -1082,6 +2307,42 @@ static bool read_data(const QString &filename, QByteArray &data)
 
     mfile.close();
 
+    stats.bytes_copied += data.size();
+
+    return true;
+}
+
+
+// Get the data of a resource without copying it.  This is only possible if
+// the resource is not compressed.
+static bool get_mapped_data(const QString &filename, const char **data,
+        Py_ssize_t *size)
+{
+    if (!filename.startsWith(QChar(':')))
+        return false;
+
+    QResource resource(filename);
+
+    if (!resource.isValid())
+        return false;
+
+#if QT_VERSION >= 0x050d00
+    if (resource.compressionAlgorithm() != QResource::NoCompression)
+        return false;
+#else
+    if (resource.isCompressed())
+        return false;
+#endif
+
+    *data = (const char *)resource.data();
+    *size = resource.size();
+
+    // A directory has no data.
+    if (!*data)
+        return false;
+
+    stats.bytes_mapped += *size;
+
     return true;
 }
 
@@ -1089,6 +2350,15 @@ static bool read_data(const QString &filename, QByteArray &data)
 // Get the code object from a file.
 static PyObject *get_code_object(const QString &filename)
 {
+    ++stats.code_objects;
+
+    // Unmarshal directly from the resource if possible.
+    const char *mapped_data;
+    Py_ssize_t mapped_size;
+
+    if (get_mapped_data(filename, &mapped_data, &mapped_size))
+        return PyMarshal_ReadObjectFromString(mapped_data, mapped_size);
+
     QByteArray data;
 
     if (!read_data(filename, data))
@@ -1180,11 +2450,275 @@ const QDir &pdytools_get_executable_dir()
 }
 
 
+// Enable tracing if required.
+void pdytools_init_trace()
+{
+    if (!import_trace_timer && !qgetenv("PYQTDEPLOY_IMPORT_TRACE").isEmpty())
+    {
+        import_trace_timer = new QElapsedTimer;
+        import_trace_timer->start();
+    }
+}
+
+
+// Write an event to stderr if tracing is enabled.
+void pdytools_trace(const char *event, const char *name)
+{
+    if (!import_trace_timer)
+        return;
+
+    fprintf(stderr, "pdytools: [%8.3f ms] %s %s\n",
+            import_trace_timer->nsecsElapsed() / 1000000.0, event, name);
+}
+
+
+// Start the thread that imports the warm-up modules in the background.  This
+// must be called with the GIL held.
+void pdytools_start_warmup()
+{
+    if (!warmup_modules[0])
+        return;
+
+    warmup_finished = PyThread_allocate_lock();
+    if (!warmup_finished)
+    {
+        pdytools_trace("warm-failed", "lock");
+        return;
+    }
+
+    PyThread_acquire_lock(warmup_finished, WAIT_LOCK);
+
+    warmup_main_thread = PyThread_get_thread_ident();
+
+    if (PyThread_start_new_thread(warmup, NULL) == PYTHREAD_INVALID_THREAD_ID)
+    {
+        pdytools_trace("warm-failed", "thread");
+
+        PyThread_release_lock(warmup_finished);
+        PyThread_free_lock(warmup_finished);
+        warmup_finished = NULL;
+    }
+}
+
+
+// Stop the warm-up thread (after any import it is doing has completed) and
+// wait for it to finish.  This must be called with the GIL held and before
+// the interpreter is finalised.
+void pdytools_stop_warmup()
+{
+    if (!warmup_finished)
+        return;
+
+    warmup_stop = true;
+
+    Py_BEGIN_ALLOW_THREADS
+    PyThread_acquire_lock(warmup_finished, WAIT_LOCK);
+    Py_END_ALLOW_THREADS
+
+    PyThread_free_lock(warmup_finished);
+    warmup_finished = NULL;
+}
+
+
+// The warm-up thread.
+static void warmup(void *)
+{
+    PyGILState_STATE gil = PyGILState_Ensure();
+
+    PyObject *imp = PyImport_ImportModule("_imp");
+
+    if (imp)
+    {
+        for (const char **wp = warmup_modules; *wp != NULL; ++wp)
+        {
+            // Give the main thread a chance to run between each import.
+            Py_BEGIN_ALLOW_THREADS
+            Py_END_ALLOW_THREADS
+
+            // Retry while the main thread is part way through an import.
+            int imported = 0;
+
+            while (!warmup_stop && (imported = warmup_import(imp, *wp)) == 0)
+            {
+                Py_BEGIN_ALLOW_THREADS
+                QThread::msleep(1);
+                Py_END_ALLOW_THREADS
+            }
+
+            if (warmup_stop || imported < 0)
+                break;
+        }
+
+        Py_DECREF(imp);
+    }
+
+    PyErr_Clear();
+    PyGILState_Release(gil);
+
+    PyThread_release_lock(warmup_finished);
+}
+
+
+// Import a warm-up module while holding the global import lock so that the
+// main thread cannot start an import of its own (and so cannot be given a
+// partially initialised module) until it is complete.  The lock is acquired
+// (which may release the GIL) before checking that the main thread doesn't
+// hold any module locks so that the two threads can never be waiting for each
+// other.  1 is returned if the module was handled, 0 if the main thread is
+// part way through an import and the module should be retried later, or -1
+// if there was an error.
+static int warmup_import(PyObject *imp, const char *name)
+{
+    PyObject *res = PyObject_CallMethod(imp, "acquire_lock", NULL);
+    if (!res)
+        return -1;
+
+    Py_DECREF(res);
+
+    int importing = main_thread_is_importing();
+
+    if (importing != 0)
+    {
+        res = PyObject_CallMethod(imp, "release_lock", NULL);
+        if (!res)
+            return -1;
+
+        Py_DECREF(res);
+
+        return importing < 0 ? -1 : 0;
+    }
+
+    // Ignore modules that have already been imported (or are being imported)
+    // by the main thread.
+    PyObject *sys_modules = PyImport_GetModuleDict();
+
+    if (!PyDict_GetItemString(sys_modules, name))
+    {
+        pdytools_trace("warm", name);
+
+        PyObject *mod = PyImport_ImportModule(name);
+
+        if (mod)
+        {
+            Py_DECREF(mod);
+            ++stats.warmed;
+        }
+        else
+        {
+            // A failure isn't fatal as the application will get the exception
+            // when it imports the module itself.
+            PyErr_Clear();
+            pdytools_trace("warm-failed", name);
+        }
+    }
+
+    res = PyObject_CallMethod(imp, "release_lock", NULL);
+    if (!res)
+        return -1;
+
+    Py_DECREF(res);
+
+    return 1;
+}
+
+
+// Return 1 if the main thread holds any module import locks, 0 if it doesn't
+// or -1 if it couldn't be determined.
+static int main_thread_is_importing()
+{
+    static PyObject *module_locks = NULL;
+
+    if (!module_locks)
+    {
+        module_locks = get_bootstrap_attr("_frozen_importlib", "_module_locks");
+        if (!module_locks)
+            return -1;
+    }
+
+    PyObject *lock_refs = PyDict_Values(module_locks);
+    if (!lock_refs)
+        return -1;
+
+    int importing = 0;
+
+    for (Py_ssize_t i = 0; i < PyList_GET_SIZE(lock_refs); ++i)
+    {
+        // The values are weak references to the locks.
+        PyObject *lock = PyObject_CallObject(PyList_GET_ITEM(lock_refs, i),
+                NULL);
+        if (!lock)
+        {
+            importing = -1;
+            break;
+        }
+
+        PyObject *owner = PyObject_GetAttrString(lock, "owner");
+        Py_DECREF(lock);
+
+        if (!owner)
+        {
+            // A lock may not have an owner (e.g. a dummy lock).
+            PyErr_Clear();
+            continue;
+        }
+
+        if (PyLong_Check(owner) &&
+                PyLong_AsUnsignedLong(owner) == warmup_main_thread)
+            importing = 1;
+
+        Py_DECREF(owner);
+
+        if (importing)
+            break;
+    }
+
+    Py_DECREF(lock_refs);
+
+    return importing;
+}
+
+
+// Implement the mark_trace() function of the module.
+static PyObject *pdytools_mark_trace(PyObject *, PyObject *arg)
+{
+    if (!PyUnicode_Check(arg))
+    {
+        PyErr_SetString(PyExc_TypeError,
+                "pdytools.mark_trace: argument must be a str");
+        return NULL;
+    }
+
+    trace_import("mark", arg);
+
+    Py_RETURN_NONE;
+}
+
+
+// Implement the stats() function of the module.
+static PyObject *pdytools_stats(PyObject *, PyObject *)
+{
+    return Py_BuildValue("{s:k,s:k,s:k,s:k,s:k,s:k,s:k,s:K,s:K,s:n}",
+            "lookups", stats.lookups,
+            "index_hits", stats.index_hits,
+            "negative_hits", stats.negative_hits,
+            "probes", stats.probes,
+            "code_objects", stats.code_objects,
+            "deferred", stats.deferred,
+            "warmed", stats.warmed,
+            "bytes_copied", stats.bytes_copied,
+            "bytes_mapped", stats.bytes_mapped,
+            "index_size", (Py_ssize_t)module_index_size);
+}
+
+
 // The module initialisation function.
 PyObject *PyInit_pdytools()
 {
     PyObject *mod;
 
+    // Enable the tracing of imports if required.
+    pdytools_init_trace();
+
     // Just in case we are linking against Python as a Windows DLL.
     QrcImporter_Type.tp_new = PyType_GenericNew;
 
@@ -1201,6 +2735,11 @@ PyObject *PyInit_pdytools()
     if (PyType_Ready(&QrcResource_Type) < 0)
         return NULL;
 
+    qrctraversable_as_number.nb_true_divide = qrctraversable_truediv;
+
+    if (PyType_Ready(&QrcTraversable_Type) < 0)
+        return NULL;
+
     mod = PyModule_Create(&pdytoolsmodule);
     if (mod == NULL)
         return NULL;
@@ -0,0 +1,18 @@
+if(CMAKE_SYSTEM_NAME STREQUAL "Linux")
+    target_link_libraries(${PROJECT_NAME} PRIVATE util dl)
+endif()
+
+if(WIN32)
+    target_link_libraries(${PROJECT_NAME} PRIVATE pathcch shlwapi advapi32
+            shell32 user32 ws2_32 ole32 oleaut32 version)
+    target_compile_definitions(${PROJECT_NAME} PRIVATE MS_WINDOWS
+            _WIN32_WINNT=Py_WINVER NTDDI_VERSION=Py_NTDDI WINVER=Py_WINVER)
+
+    # This is added by Qt but clashes with _pickle.c.
+    qt_disable_unicode_defines(${PROJECT_NAME})
+endif()
+
+if(APPLE AND NOT IOS)
+    target_link_libraries(${PROJECT_NAME} PRIVATE
+            "-framework SystemConfiguration" "-framework CoreFoundation")
+endif()
@@ -26,6 +26,8 @@
 
 #include <stdio.h>
 
+#include <string>
+
 #include <Python.h>
 
 #if PY_VERSION_HEX >= 0x030b0000
@@ -34,10 +36,22 @@
 
 #include <QByteArray>
 #include <QDir>
+#include <QFileInfo>
 #include <QString>
 #include <QRegExp>
 #include <QTextCodec>
 
+#if defined(PYQTDEPLOY_EXTERNAL_RESOURCES)
+#include <QResource>
+#include <QStringList>
+#endif
+
+#if defined(Q_OS_WIN)
+#include <windows.h>
+#elif defined(Q_OS_DARWIN)
+#include <mach-o/dyld.h>
+#endif
+
 #include "frozen_bootstrap.h"
 #include "frozen_bootstrap_external.h"
 
@@ -45,12 +59,24 @@
 #include "frozen_main.h"
 #endif
 
+#if defined(PYQTDEPLOY_EXTERNAL_RESOURCES)
+#include "pyqtdeploy_resources.h"
+#endif
+
+#if PY_VERSION_HEX >= 0x030b0000 && defined(PYQTDEPLOY_DEEP_FROZEN)
+#include "pyqtdeploy_deep_frozen.h"
+#endif
+
 
 extern "C" PyObject *PyInit_pdytools(void);
 
 // The internal API.
 void pdytools_init_executable_dir(const QString &argv0);
 const QDir &pdytools_get_executable_dir();
+void pdytools_init_trace();
+void pdytools_trace(const char *event, const char *name);
+void pdytools_start_warmup();
+void pdytools_stop_warmup();
 
 // We use Qt as the source of the locale information, partly because it
 // officially supports Android.
@@ -59,13 +85,44 @@ static QTextCodec *locale_codec;
 // Foward declarations.
 static int handle_exception();
 static int append_path_dirs(PyObject *list, const char **path_dirs);
+#if PY_VERSION_HEX >= 0x03080000
+static int initialize_from_config(int argc, wchar_t **w_argv);
+#endif
+#if defined(PYQTDEPLOY_EXTERNAL_RESOURCES)
+static bool register_resources(const QString &argv0);
+#endif
+static QString get_executable_path(const QString &argv0);
 
 
 const struct _frozen *PyImport_FrozenModules;
 #if PY_VERSION_HEX >= 0x030b0000
 static const struct _frozen frozen_sentinel[] = {{NULL, NULL, 0, false, NULL}};
+#if defined(PYQTDEPLOY_DEEP_FROZEN)
+// The bootstrap modules are always looked up first.  Python still requires
+// the marshalled code even though it isn't used.
+static const struct _frozen deep_frozen_bootstrap[] = {
+    {
+        "_frozen_importlib",
+        frozen_pyqtdeploy_bootstrap,
+        sizeof (frozen_pyqtdeploy_bootstrap),
+        false,
+        _Py_get_pyqtdeploy_bootstrap_toplevel,
+    },
+    {
+        "_frozen_importlib_external",
+        frozen_pyqtdeploy_bootstrap_external,
+        sizeof (frozen_pyqtdeploy_bootstrap_external),
+        false,
+        _Py_get_pyqtdeploy_bootstrap_external_toplevel,
+    },
+    {NULL, NULL, 0, false, NULL}
+};
+const struct _frozen *_PyImport_FrozenBootstrap = deep_frozen_bootstrap;
+const struct _frozen *_PyImport_FrozenStdlib = deep_frozen_stdlib;
+#else
 const struct _frozen *_PyImport_FrozenBootstrap = frozen_sentinel;
 const struct _frozen *_PyImport_FrozenStdlib = frozen_sentinel;
+#endif
 const struct _frozen *_PyImport_FrozenTest = frozen_sentinel;
 
 static const struct _module_alias aliases[] = {
@@ -115,13 +172,21 @@ int pyqtdeploy_start(int argc, char **argv,
             sizeof (frozen_pyqtdeploy_main),
 #if PY_VERSION_HEX >= 0x030b0000
             false,
+#if defined(PYQTDEPLOY_DEEP_FROZEN)
+            _Py_get_pyqtdeploy_main_toplevel,
+#else
             NULL,
+#endif
 #endif
         },
 #endif
         {NULL, NULL, 0}
     };
 
+    // Enable any tracing as early as possible so that the time taken to
+    // initialise the interpreter is included.
+    pdytools_init_trace();
+
     // Get the codec for the locale.
     locale_codec = QTextCodec::codecForLocale();
 
@@ -135,12 +200,13 @@ int pyqtdeploy_start(int argc, char **argv,
         return 1;
     }
 
+#if PY_VERSION_HEX < 0x03080000
     // Initialise some Python globals.
     Py_FrozenFlag = 1;
     Py_NoSiteFlag = 1;
     Py_IgnoreEnvironmentFlag = 1;
 #if defined(PYQTDEPLOY_OPTIMIZED)
-    Py_OptimizeFlag = 1;
+    Py_OptimizeFlag = PYQTDEPLOY_OPTIMIZED;
 #endif
 
     if (!Py_FileSystemDefaultEncoding)
@@ -157,6 +223,7 @@ int pyqtdeploy_start(int argc, char **argv,
             Py_HasFileSystemDefaultEncoding = 1;
         }
     }
+#endif
 
     PyImport_FrozenModules = modules;
 
@@ -201,10 +268,25 @@ int pyqtdeploy_start(int argc, char **argv,
     w_argv[argc] = NULL;
 #endif
 
+#if defined(PYQTDEPLOY_EXTERNAL_RESOURCES)
+    // Register the external resources.  This must be done before the
+    // interpreter is initialised as it will import modules from them.
+    if (!register_resources(QString::fromWCharArray(w_argv[0])))
+        return 1;
+#endif
+
     // Initialise the Python v3 interpreter.
+#if PY_VERSION_HEX >= 0x03080000
+    int exit_code = initialize_from_config(argc, w_argv);
+    if (exit_code >= 0)
+        return exit_code;
+#else
     Py_SetProgramName(w_argv[0]);
     Py_Initialize();
     PySys_SetArgvEx(argc, w_argv, 0);
+#endif
+
+    pdytools_trace("init", "interpreter");
 
     // Set sys.frozen.
     if (PySys_SetObject("frozen", Py_True) < 0)
@@ -246,6 +328,9 @@ int pyqtdeploy_start(int argc, char **argv,
     Py_DECREF(py_filename);
 
     // Import the main module.
+    pdytools_trace("run", main_module);
+    pdytools_start_warmup();
+
     if (PyImport_ImportFrozenModule(main_module) < 0)
         return handle_exception();
 #else
@@ -261,11 +346,15 @@ int pyqtdeploy_start(int argc, char **argv,
         return handle_exception();
 
     // Call the entry point.
+    pdytools_trace("run", entry_point);
+    pdytools_start_warmup();
+
     if (!PyObject_CallMethod(mod, entry_point, NULL))
         return handle_exception();
 #endif
 
     // Tidy up.
+    pdytools_stop_warmup();
     Py_Finalize();
 
     return 0;
@@ -325,6 +414,7 @@ static int handle_exception()
         exit_code = 1;
     }
 
+    pdytools_stop_warmup();
     Py_Finalize();
 
     return exit_code;
@@ -390,9 +480,198 @@ static int append_path_dirs(PyObject *list, const char **path_dirs)
 }
 
 
-// Note that we don't support deepfrozen modules (ie. static declarations of
-// the corresponding Python objects).
-#if PY_VERSION_HEX >= 0x030b0000
+#if defined(PYQTDEPLOY_EXTERNAL_RESOURCES)
+// Register the external resource files.  Qt will memory-map them where
+// possible.  Return false if there was an error.
+static bool register_resources(const QString &argv0)
+{
+#if defined(Q_OS_ANDROID)
+    Q_UNUSED(argv0)
+
+    // The resource files are installed as assets.
+    QStringList dirs("assets:");
+#else
+    QDir exec_dir(get_executable_path(argv0));
+    exec_dir.makeAbsolute();
+    exec_dir.cdUp();
+
+    QStringList dirs;
+
+#if defined(Q_OS_MACOS)
+    // The resource files are in the Resources directory of an application
+    // bundle.
+    dirs << exec_dir.filePath("../Resources");
+#endif
+
+    dirs << exec_dir.path();
+#endif
+
+    for (const char **rp = pyqtdeploy_resources; *rp != NULL; ++rp)
+    {
+        QString resource_file;
+        bool registered = false;
+
+        for (const QString &dir : dirs)
+        {
+            resource_file = QDir::cleanPath(QString("%1/%2").arg(dir).arg(*rp));
+
+            if (QFileInfo(resource_file).exists())
+            {
+                registered = QResource::registerResource(resource_file);
+                break;
+            }
+        }
+
+        if (!registered)
+        {
+            fprintf(stderr, "%s: unable to register the resource file %s\n",
+                    argv0.toLocal8Bit().constData(), *rp);
+            return false;
+        }
+    }
+
+    return true;
+}
+#endif
+
+
+// Return the name of the application executable.  This is needed before
+// Python has been initialised so it cannot use sys.executable.
+static QString get_executable_path(const QString &argv0)
+{
+#if defined(Q_OS_WIN)
+    wchar_t buf[MAX_PATH];
+    DWORD len = GetModuleFileNameW(NULL, buf, MAX_PATH);
+
+    if (len > 0 && len < MAX_PATH)
+        return QString::fromWCharArray(buf, len);
+#elif defined(Q_OS_DARWIN)
+    uint32_t size = 0;
+
+    _NSGetExecutablePath(NULL, &size);
+
+    QByteArray buf(size, '\0');
+
+    if (_NSGetExecutablePath(buf.data(), &size) == 0)
+        return QString::fromUtf8(buf.constData());
+#elif defined(Q_OS_LINUX)
+    QString exe = QFileInfo("/proc/self/exe").symLinkTarget();
+
+    if (!exe.isEmpty())
+        return exe;
+#endif
+
+    return argv0;
+}
+
+
+#if PY_VERSION_HEX >= 0x03080000
+// Initialise the interpreter using an isolated configuration.  Everything
+// that Python would otherwise calculate (most expensively the module search
+// path) is set explicitly.  Return -1 if the interpreter was initialised or
+// the exit code to immediately pass back to the operating system.
+static int initialize_from_config(int argc, wchar_t **w_argv)
+{
+    PyStatus status;
+    PyConfig config;
+
+    PyConfig_InitIsolatedConfig(&config);
+
+    config.pathconfig_warnings = 0;
+    config.site_import = 0;
+    config.write_bytecode = 0;
+#if defined(PYQTDEPLOY_OPTIMIZED)
+    config.optimization_level = PYQTDEPLOY_OPTIMIZED;
+#endif
+#if defined(PYQTDEPLOY_HASH_SEED)
+    config.use_hash_seed = 1;
+    config.hash_seed = PYQTDEPLOY_HASH_SEED;
+#endif
+#if PY_VERSION_HEX >= 0x030b0000 && defined(PYQTDEPLOY_DEEP_FROZEN)
+    // Enable the deep-frozen hot modules.
+    config.use_frozen_modules = 1;
+#endif
+
+    // Python doesn't have a platform default filesystem encoding so get it
+    // from Qt.  However if Qt isn't specific then let Python decide.
+    QByteArray locale_codec_name = locale_codec->name();
+
+    if (locale_codec_name != "System")
+    {
+        std::wstring encoding = QString::fromLatin1(locale_codec_name).toStdWString();
+
+        status = PyConfig_SetString(&config, &config.filesystem_encoding,
+                encoding.c_str());
+        if (PyStatus_Exception(status))
+            goto exception;
+    }
+
+    {
+        // Use the real name of the executable and its directory as the
+        // prefixes.
+        QString executable = QDir::cleanPath(
+                QFileInfo(get_executable_path(QString::fromWCharArray(w_argv[0]))).absoluteFilePath());
+        std::wstring w_executable = QDir::toNativeSeparators(executable).toStdWString();
+        std::wstring w_prefix = QDir::toNativeSeparators(QFileInfo(executable).absolutePath()).toStdWString();
+
+        status = PyConfig_SetString(&config, &config.program_name, w_argv[0]);
+        if (PyStatus_Exception(status))
+            goto exception;
+
+        status = PyConfig_SetString(&config, &config.executable,
+                w_executable.c_str());
+        if (PyStatus_Exception(status))
+            goto exception;
+
+        wchar_t **prefixes[] = {&config.prefix, &config.base_prefix,
+                &config.exec_prefix, &config.base_exec_prefix};
+
+        for (wchar_t **prefix : prefixes)
+        {
+            status = PyConfig_SetString(&config, prefix, w_prefix.c_str());
+            if (PyStatus_Exception(status))
+                goto exception;
+        }
+    }
+
+    // Python modules are only imported from the resources.  Any additional
+    // directories are added to sys.path later.
+    config.module_search_paths_set = 1;
+
+    status = PyWideStringList_Append(&config.module_search_paths, L":/");
+    if (PyStatus_Exception(status))
+        goto exception;
+
+    status = PyConfig_SetArgv(&config, argc, w_argv);
+    if (PyStatus_Exception(status))
+        goto exception;
+
+    status = Py_InitializeFromConfig(&config);
+    if (PyStatus_Exception(status))
+        goto exception;
+
+    PyConfig_Clear(&config);
+
+    return -1;
+
+exception:
+    PyConfig_Clear(&config);
+
+    if (PyStatus_IsExit(status))
+        return status.exitcode;
+
+    // This will not return.
+    Py_ExitStatusException(status);
+
+    return 1;
+}
+#endif
+
+
+// Unless deep-freezing was enabled we don't support deepfrozen modules (ie.
+// static declarations of the corresponding Python objects).  Otherwise these
+// are defined in the code generated by Python's deepfreeze.py.
+#if PY_VERSION_HEX >= 0x030b0000 && !defined(PYQTDEPLOY_DEEP_FROZEN)
 extern "C" int _Py_Deepfreeze_Init(void)
 {
     return 0;
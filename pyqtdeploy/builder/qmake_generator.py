@@ -0,0 +1,287 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+from importlib import resources
+import os
+
+from ..build_profiles import get_build_profile_qmake
+from ..file_utilities import create_file
+
+from . import lib as lib_package
+
+
+def write_qmake_project(config, build_dir):
+    """ Create the .pro file for qmake from a build configuration and return
+    its name.
+    """
+
+    target_platform = config.target_platform
+
+    pro_name = os.path.join(build_dir, config.application_name + '.pro')
+    f = create_file(pro_name)
+
+    f.write('# Generated for {0} and Python v{1}.\n\n'.format(
+            config.target.name, config.python_version))
+
+    f.write('TEMPLATE = app\n')
+    f.write('\n')
+
+    # Generate QT.
+    if config.qt:
+        f.write('QT += %s\n' % ' '.join(sorted(config.qt)))
+
+    # Generate CONFIG.
+    qmake_config = ['warn_off']
+
+    if target_platform == 'win':
+        if config.is_console:
+            qmake_config.append('console')
+
+    if config.cpp11:
+        qmake_config.append('c++11')
+
+    f.write('CONFIG += {0}\n'.format(' '.join(qmake_config)))
+
+    if target_platform == 'macos':
+        if not config.is_bundle:
+            f.write('CONFIG -= app_bundle\n')
+
+    if config.qmake_config:
+        f.write('CONFIG += %s\n' % ' '.join(sorted(config.qmake_config)))
+
+    # Python requires C99 at least.  Note that specifying 'c++11' in 'CONFIG'
+    # doesn't affect 'CFLAGS'.
+    if config.c_standard is not None:
+        f.write('\n')
+        f.write('QMAKE_CFLAGS += -std={0}\n'.format(config.c_standard))
+
+    # Specify the resource files.
+    f.write('\n')
+
+    if not config.compress_resources:
+        f.write('QMAKE_RESOURCE_FLAGS += -no-compress\n')
+
+    if config.external_resources:
+        _write_external_resources(f, config)
+    else:
+        f.write('RESOURCES = \\\n')
+        f.write(' \\\n'.join(['    resources/{0}'.format(n) for n in config.resource_names]))
+        f.write('\n')
+
+    # Specify the defines.
+    if config.defines or config.used_defines:
+        f.write('\n')
+
+        if config.defines:
+            f.write('DEFINES += {0}\n'.format(' '.join(config.defines)))
+
+        _write_used_values(f, config.used_defines, 'DEFINES')
+
+    # Specify the include paths.
+    if config.used_includepath:
+        f.write('\n')
+        _write_used_values(f, config.used_includepath, 'INCLUDEPATH')
+
+    # Specify the source files and header files.
+    # Note that HEADERS must be set before any used header files are added to
+    # it.
+    f.write('\n')
+    f.write('HEADERS = {0}\n'.format(' '.join(config.headers)))
+    f.write('SOURCES = {0}\n'.format(' '.join(config.sources)))
+    _write_used_values(f, config.used_sources, 'SOURCES')
+
+    if config.precompiled_header is not None:
+        _write_precompiled_header(f, config)
+
+    # Specify the libraries.
+    if config.used_libs:
+        f.write('\n')
+        _write_used_values(f, config.used_libs, 'LIBS')
+
+    # Additional platform=specific configuration.
+    if target_platform == 'android':
+        f.write('\n')
+        f.write('ANDROID_ABIS = {}\n'.format(config.target.android_abi))
+
+        if config.android_extra_libs:
+            f.write(
+                    'ANDROID_EXTRA_LIBS += %s\n' % ' '.join(
+                            sorted(config.android_extra_libs)))
+    elif target_platform == 'win':
+        # Copy in any DLLs so that the application will be able to run.
+        _copy_dlls(f, config.dlls)
+
+    # Add the project independent post-configuration stuff.
+    f.write('\n')
+    f.write(resources.read_text(lib_package, 'post_configuration.pro'))
+
+    # Add any build profile and report the size of the resulting binary.
+    build_profile_qmake = get_build_profile_qmake(config.build_profile)
+
+    if build_profile_qmake != '':
+        f.write('\n' + build_profile_qmake)
+
+        # iOS projects are built by Xcode rather than make so the make
+        # variables are not available.
+        f.write('''
+!win32:!ios {
+    QMAKE_POST_LINK += @echo "$(DESTDIR)$(TARGET) is `wc -c < $(DESTDIR)$(TARGET)` bytes"
+}
+''')
+
+    # Add any application specific stuff.
+    if config.qmake_configuration != '':
+        f.write('\n' + config.qmake_configuration + '\n')
+
+    # All done.
+    f.close()
+
+    return pro_name
+
+
+def _copy_dlls(f, dlls):
+    """ Generate additional qmake commands to install additional DLLs so that
+    the application will be able to run.
+    """
+
+    for dll in dlls:
+        f.write('''
+PDY_DLL = %s
+exists($$PDY_DLL) {
+    CONFIG(debug, debug|release) {
+        QMAKE_POST_LINK += $(COPY_FILE) $$shell_path($$PDY_DLL) $$shell_path($$OUT_PWD/debug) &
+    } else {
+        QMAKE_POST_LINK += $(COPY_FILE) $$shell_path($$PDY_DLL) $$shell_path($$OUT_PWD/release) &
+    }
+}
+''' % dll)
+
+
+def _write_external_resources(f, config):
+    """ Write the qmake configuration that builds each resource file as an
+    external .rcc file.
+    """
+
+    f.write('PDY_RCC_FILES = {0}\n'.format(
+            ' '.join(['resources/' + n for n in config.resource_names])))
+
+    f.write('''
+# The .rcc files are created in the same directory as the executable.
+PDY_RCC_DIR = $$OUT_PWD
+!isEmpty(DESTDIR): PDY_RCC_DIR = $$DESTDIR
+
+win32:debug_and_release {
+    CONFIG(debug, debug|release) {
+        PDY_RCC_DIR = $$PDY_RCC_DIR/debug
+    } else {
+        PDY_RCC_DIR = $$PDY_RCC_DIR/release
+    }
+}
+
+qtPrepareTool(PDY_RCC, rcc)
+
+pdy_rcc.name = RCC ${QMAKE_FILE_IN}
+pdy_rcc.input = PDY_RCC_FILES
+pdy_rcc.output = $$PDY_RCC_DIR/${QMAKE_FILE_BASE}.rcc
+pdy_rcc.commands = $$PDY_RCC -binary $$QMAKE_RESOURCE_FLAGS ${QMAKE_FILE_IN} -o ${QMAKE_FILE_OUT}
+pdy_rcc.depend_command = $$PDY_RCC -list $$QMAKE_RESOURCE_FLAGS ${QMAKE_FILE_IN}
+pdy_rcc.CONFIG += no_link target_predeps
+QMAKE_EXTRA_COMPILERS += pdy_rcc
+''')
+
+    rcc_files = ' '.join(['$$PDY_RCC_DIR/' + n for n in config.rcc_names])
+
+    f.write('''
+macx:app_bundle|ios {{
+    pdy_rcc_bundle.files = {0}
+    macx: pdy_rcc_bundle.path = Contents/Resources
+    QMAKE_BUNDLE_DATA += pdy_rcc_bundle
+}}
+
+android {{
+    pdy_rcc_assets.files = {0}
+    pdy_rcc_assets.path = /assets
+    pdy_rcc_assets.CONFIG += no_check_exist
+    INSTALLS += pdy_rcc_assets
+}}
+'''.format(rcc_files))
+
+
+def _write_precompiled_header(f, config):
+    """ Write the qmake configuration that uses a precompiled header. """
+
+    f.write('''
+gcc|clang|msvc {{
+    CONFIG += precompile_header
+    PRECOMPILED_HEADER = {0}
+
+    msvc {{
+        CONFIG += precompile_header_c
+    }}
+'''.format(config.precompiled_header))
+
+    # Sources that define macros before including any header file would be
+    # broken by the implicit inclusion of the precompiled header.
+    if config.no_pch_sources:
+        f.write('\n')
+
+        for src in config.no_pch_sources:
+            f.write('    NO_PCH_SOURCES += {0}\n'.format(src))
+
+    f.write('}\n')
+
+
+# The map of non-C/C++ source extensions to qmake variable.
+_SOURCE_EXTENSIONS = (
+    ('.asm',    'MASMSOURCES'),
+    ('.h',      'HEADERS'),
+    ('.java',   'JAVASOURCES'),
+    ('.l',      'LEXSOURCES'),
+    ('.pyx',    'CYTHONSOURCES'),
+    ('.y',      'YACCSOURCES')
+)
+
+
+def _write_used_values(f, used_values, name):
+    """ Write a set of used values to a .pro file. """
+
+    # Sort them for reproduceable output.
+    for value in sorted(used_values):
+        qmake_var = name
+
+        if qmake_var == 'SOURCES':
+            for ext, var in _SOURCE_EXTENSIONS:
+                if value.endswith(ext):
+                    qmake_var = var
+                    break
+
+        elif qmake_var == 'LIBS':
+            # A (strictly unnecessary) bit of pretty printing.
+            if value.startswith('"-framework') and value.endswith('"'):
+                value = value[1:-1]
+
+        f.write('{0} += {1}\n'.format(qmake_var, value))
@@ -0,0 +1,445 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+from collections import namedtuple
+import importlib
+import importlib.machinery
+import importlib.util
+import marshal
+import sys
+import time
+import types
+
+from ..module_index import (create_module_index, is_module_covered,
+        read_module_index, verify_lazy_modules)
+from ..user_exception import UserException
+
+
+# The record of the execution of a single module.  inclusive is the time in
+# seconds taken to execute the module including any modules it imported,
+# exclusive excludes them.  nr_bytes is the number of bytes of the module's
+# code object read from the resources.
+ImportRecord = namedtuple('ImportRecord',
+        'name inclusive exclusive nr_bytes')
+
+
+class Emulator:
+    """ The Emulator class emulates, on the host, the importer that a deployed
+    application uses to import modules from its resources.  The code objects
+    in the resources can only be executed if the host Python is the same
+    version as the target Python.
+    """
+
+    def __init__(self, resources, index_file=None, use_index=True,
+            lazy_modules=()):
+        """ Initialise the object.  resources is the Resources instance to
+        import from.  index_file is the name of the pdytools_index.h file
+        written by pyqtdeploy-build.  If it is not specified then the index is
+        created from the resources.  use_index is set if the index is used to
+        look up modules rather than probing the resources.  lazy_modules is a
+        list of additional modules and packages (including their sub-packages)
+        that are loaded lazily.
+        """
+
+        self.resources = resources
+        self.use_index = use_index
+
+        if index_file is None:
+            self._index = create_module_index(resources.file_names())
+        else:
+            self._index = read_module_index(index_file)
+
+        verify_lazy_modules(lazy_modules)
+
+        for fqmn, (module_type, _) in self._index.items():
+            if module_type in ('ModuleIsModule', 'ModuleIsPackage'):
+                for lazy_module in lazy_modules:
+                    if is_module_covered(fqmn, lazy_module):
+                        self._index[fqmn] = (module_type, True)
+                        break
+
+        self.imports = []
+
+        self._stats = dict(lookups=0, index_hits=0, negative_hits=0, probes=0,
+                code_objects=0, deferred=0, warmed=0, bytes_copied=0,
+                bytes_mapped=0, index_size=len(self._index))
+
+        # Set once the import caches have been invalidated.
+        self._probe_resources = False
+        self._importer_paths = set()
+
+        self._exec_stack = []
+        self._saved_state = None
+
+    def import_module(self, name):
+        """ Import a module from the resources and return the time in seconds
+        it took.
+        """
+
+        start = time.perf_counter()
+        importlib.import_module(name)
+
+        return time.perf_counter() - start
+
+    def install(self):
+        """ Install the emulated importer so that modules that have not yet
+        been imported are imported from the resources.
+        """
+
+        if self._saved_state is not None:
+            return
+
+        self._saved_state = (sys.path[:], sys.path_hooks[:],
+                dict(sys.path_importer_cache))
+
+        sys.path[:] = [':/']
+        sys.path_hooks.insert(0, self._path_hook)
+        sys.path_importer_cache.clear()
+        importlib.invalidate_caches()
+
+    def run_script(self, script):
+        """ Run a script as __main__ and return the time in seconds it took.
+        """
+
+        try:
+            with open(script, 'rb') as f:
+                source = f.read()
+        except Exception as e:
+            raise UserException("unable to read '{0}'".format(script), str(e))
+
+        # Note that runpy isn't used as it imports modules that may not be
+        # included in the resources.
+        main_module = types.ModuleType('__main__')
+        main_module.__file__ = script
+
+        start = time.perf_counter()
+
+        try:
+            exec(compile(source, script, 'exec'), main_module.__dict__)
+        except SystemExit:
+            pass
+
+        return time.perf_counter() - start
+
+    def stats(self):
+        """ Return the statistics using the same keys as pdytools.stats(). """
+
+        return dict(self._stats)
+
+    def uninstall(self):
+        """ Uninstall the emulated importer.  Any modules that have been
+        imported from the resources remain in sys.modules.
+        """
+
+        if self._saved_state is None:
+            return
+
+        sys.path[:], sys.path_hooks[:], saved_cache = self._saved_state
+        sys.path_importer_cache.clear()
+        sys.path_importer_cache.update(saved_cache)
+        importlib.invalidate_caches()
+
+        self._saved_state = None
+
+    def exec_module(self, module):
+        """ Execute a module from the resources and record how long it took.
+        """
+
+        spec = module.__spec__
+        start = time.perf_counter()
+        bytes_before = self._bytes_read()
+
+        # The origin is used rather than the loader state because importlib
+        # replaces the latter when a module is loaded lazily.
+        code = self.get_code_object(spec.origin)
+
+        nr_bytes = self._bytes_read() - bytes_before
+
+        self._exec_stack.append(0.0)
+
+        try:
+            exec(code, module.__dict__)
+        finally:
+            children = self._exec_stack.pop()
+            inclusive = time.perf_counter() - start
+
+            if self._exec_stack:
+                self._exec_stack[-1] += inclusive
+
+            self.imports.append(
+                    ImportRecord(spec.name, inclusive, inclusive - children,
+                            nr_bytes))
+
+    def find_module(self, path, fqmn):
+        """ Find a module in a directory of the resources and return a tuple
+        of its type, its pathname, its file name and if it is loaded lazily.
+        """
+
+        self._stats['lookups'] += 1
+
+        parts = fqmn.split('.')
+
+        # Reject it if the path is clearly wrong.
+        if (path.split('/') if path else []) != parts[:-1]:
+            return 'ModuleNotFound', None, None, False
+
+        pathname = path + '/' + parts[-1] if path else parts[-1]
+
+        if self.use_index:
+            module_type, lazy = self._index.get(fqmn,
+                    ('ModuleNotFound', False))
+
+            if module_type != 'ModuleNotFound':
+                self._stats['index_hits'] += 1
+        else:
+            module_type = 'ModuleNotFound'
+            lazy = self._index.get(fqmn, (None, False))[1]
+
+        # Probe the resources if the index isn't being used or it may be out
+        # of date.
+        if module_type == 'ModuleNotFound' and (not self.use_index or self._probe_resources):
+            if self._probe(pathname + '.pyo'):
+                module_type = 'ModuleIsModule'
+            elif self._probe(pathname + '/__init__.pyo'):
+                module_type = 'ModuleIsPackage'
+            elif self._probe(pathname, is_dir=True):
+                module_type = 'ModuleIsNamespace'
+
+        if module_type == 'ModuleIsModule':
+            filename = pathname + '.pyo'
+        elif module_type == 'ModuleIsPackage':
+            filename = pathname + '/__init__.pyo'
+        elif module_type == 'ModuleIsNamespace':
+            filename = pathname
+        else:
+            # Adjacent extension modules cannot be loaded by the host.
+            return 'ModuleNotFound', None, None, False
+
+        return module_type, ':/' + pathname, ':/' + filename, lazy
+
+    def get_code_object(self, filename):
+        """ Return the code object contained in a resource. """
+
+        self._stats['code_objects'] += 1
+
+        data = self.get_data(filename)
+
+        try:
+            return marshal.loads(data)
+        except Exception as e:
+            raise ImportError(
+                    "qrcimporter: unable to unmarshal {0} (the host Python "
+                    "may be a different version to the target Python): "
+                    "{1}".format(filename, e))
+
+    def get_data(self, filename):
+        """ Return the contents of a resource and update the statistics. """
+
+        name = filename[1:].strip('/')
+
+        if not self.resources.is_file(name):
+            raise OSError("qrcimporter: error opening file {0}".format(
+                    filename))
+
+        data = self.resources.read(name)
+
+        # Uncompressed resources would be used directly by the target.
+        if self.resources.is_compressed(name):
+            self._stats['bytes_copied'] += len(data)
+        else:
+            self._stats['bytes_mapped'] += len(data)
+
+        return data
+
+    def invalidate_caches(self):
+        """ Record that the import caches have been invalidated so that the
+        index may no longer describe all the modules in the resources.
+        """
+
+        self._probe_resources = True
+
+    def record_negative_hit(self):
+        """ Record that a lookup was answered by the negative cache. """
+
+        self._stats['negative_hits'] += 1
+
+    def defer(self):
+        """ Record that the execution of a module has been deferred. """
+
+        self._stats['deferred'] += 1
+
+    def _bytes_read(self):
+        """ Return the total number of bytes of resources read so far. """
+
+        return self._stats['bytes_copied'] + self._stats['bytes_mapped']
+
+    def _path_hook(self, path):
+        """ The path hook that creates an importer for a resources directory.
+        """
+
+        if path.startswith(':'):
+            path = path[1:].strip('/')
+
+            if self.resources.is_dir(path):
+                # A second importer for the same path means that
+                # importlib.invalidate_caches() has discarded the first.
+                if path in self._importer_paths:
+                    self.invalidate_caches()
+                else:
+                    self._importer_paths.add(path)
+
+                return _QrcImporter(self, path)
+
+        raise ImportError("qrcimporter: not a qrc file")
+
+    def _probe(self, name, is_dir=False):
+        """ See if a file, or optionally a directory, exists in the resources.
+        """
+
+        self._stats['probes'] += 1
+
+        if is_dir:
+            return self.resources.is_dir(name)
+
+        return self.resources.is_file(name)
+
+
+class _QrcImporter:
+    """ The emulation of pdytools.qrcimporter for a single directory of the
+    resources.
+    """
+
+    def __init__(self, emulator, path):
+        """ Initialise the object. """
+
+        self._emulator = emulator
+        self._path = path
+        self._not_found = set()
+
+    def create_module(self, spec):
+        """ Use the default module creation semantics. """
+
+        return None
+
+    def exec_module(self, module):
+        """ Execute a module. """
+
+        self._emulator.exec_module(module)
+
+    def find_spec(self, fqmn, target=None):
+        """ Return the spec of a module or None if it wasn't found. """
+
+        emulator = self._emulator
+
+        # The resources are immutable so a module that wasn't found before
+        # won't be found now.
+        if fqmn in self._not_found:
+            emulator.record_negative_hit()
+            return None
+
+        module_type, pathname, filename, lazy = emulator.find_module(
+                self._path, fqmn)
+
+        if module_type in ('ModuleIsModule', 'ModuleIsPackage'):
+            loader = self
+
+            if lazy:
+                loader = importlib.util.LazyLoader(self)
+                emulator.defer()
+
+            return self._create_spec(fqmn, loader, filename, pathname,
+                    module_type == 'ModuleIsPackage')
+
+        if module_type == 'ModuleIsNamespace':
+            return self._create_spec(fqmn, None, None, pathname, True)
+
+        # If we have failed to find a sub-package then it may be because it is
+        # a builtin.
+        if '.' in fqmn and fqmn in sys.builtin_module_names:
+            return importlib.machinery.BuiltinImporter.find_spec(fqmn)
+
+        self._not_found.add(fqmn)
+
+        return None
+
+    def get_code(self, fqmn):
+        """ Return the code object of a module. """
+
+        module_type, _, filename, _ = self._emulator.find_module(self._path,
+                fqmn)
+
+        if module_type in ('ModuleIsModule', 'ModuleIsPackage'):
+            return self._emulator.get_code_object(filename)
+
+        if module_type == 'ModuleIsNamespace':
+            return None
+
+        raise ImportError("qrcimporter: can't find module {0}".format(fqmn),
+                name=fqmn)
+
+    def get_data(self, filename):
+        """ Return the contents of a resource. """
+
+        return self._emulator.get_data(filename)
+
+    def get_source(self, fqmn):
+        """ The source code is never available. """
+
+        return None
+
+    def invalidate_caches(self):
+        """ Invalidate the cache of modules known not to exist. """
+
+        self._not_found.clear()
+        self._emulator.invalidate_caches()
+
+    def is_package(self, fqmn):
+        """ Return True if a module is a package. """
+
+        module_type, _, _, _ = self._emulator.find_module(self._path, fqmn)
+
+        if module_type == 'ModuleNotFound':
+            raise ImportError(
+                    "qrcimporter: can't find module {0}".format(fqmn),
+                    name=fqmn)
+
+        return module_type != 'ModuleIsModule'
+
+    @staticmethod
+    def _create_spec(fqmn, loader, origin, pathname, is_package):
+        """ Create a module spec in the same way as the qrcimporter. """
+
+        spec = importlib.machinery.ModuleSpec(fqmn, loader, origin=origin,
+                loader_state=origin, is_package=is_package)
+
+        if origin is not None:
+            spec.has_location = True
+
+        if is_package:
+            spec.submodule_search_locations = [pathname]
+
+        return spec
@@ -0,0 +1,300 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import os
+import struct
+import zlib
+from xml.etree import ElementTree
+
+from ..user_exception import UserException
+
+
+class Resources:
+    """ The Resources class is a read-only, in-memory emulation of the Qt
+    resource system as seen by the application's importer.  Every resource is
+    held as it would be stored by rcc, i.e. possibly compressed.
+    """
+
+    # The default rcc compression threshold, i.e. the minimum percentage
+    # saving needed for a resource to be stored compressed.
+    COMPRESS_THRESHOLD = 70
+
+    def __init__(self):
+        """ Initialise the object. """
+
+        self._files = {}
+        self._dirs = {''}
+
+    @classmethod
+    def load(cls, name, compress=True):
+        """ Create a Resources instance from name which may be a build
+        directory (or its resources sub-directory), a .qrc file or a binary
+        .rcc file.  compress is set if resources read from a build directory or
+        a .qrc file should be compressed as rcc would compress them by default.
+        """
+
+        if os.path.isdir(name):
+            resources_dir = os.path.join(name, 'resources')
+            if not os.path.isdir(resources_dir):
+                resources_dir = name
+
+            return cls._load_directory(resources_dir, compress)
+
+        if name.endswith('.qrc'):
+            resources = cls()
+            resources._read_qrc(name, compress)
+
+            return resources
+
+        if name.endswith('.rcc'):
+            resources = cls()
+            resources._read_rcc(name)
+
+            return resources
+
+        raise UserException(
+                "'{0}' is not a build directory, a .qrc file or a .rcc "
+                "file".format(name))
+
+    def add_file(self, name, data, compressed=False):
+        """ Add a file to the resources.  name is the /-separated name of the
+        file relative to the root of the resources.  data is the stored data.
+        compressed is set if the data is in the format created by qCompress().
+        """
+
+        if name in self._files:
+            return
+
+        self._files[name] = (data, compressed)
+
+        parts = name.split('/')
+        for i in range(1, len(parts)):
+            self._dirs.add('/'.join(parts[:i]))
+
+    def contents(self, name):
+        """ Return the sorted names of the entries of a directory. """
+
+        prefix = name + '/' if name else ''
+        contents = set()
+
+        for entry in self._files:
+            if entry.startswith(prefix):
+                contents.add(entry[len(prefix):].split('/')[0])
+
+        return sorted(contents)
+
+    def file_names(self):
+        """ Return the sorted names of all the files. """
+
+        return sorted(self._files)
+
+    def is_compressed(self, name):
+        """ Return True if a file is stored compressed. """
+
+        return self._files[name][1]
+
+    def is_dir(self, name):
+        """ Return True if a name refers to a directory. """
+
+        return name in self._dirs
+
+    def is_file(self, name):
+        """ Return True if a name refers to a file. """
+
+        return name in self._files
+
+    def read(self, name):
+        """ Return the uncompressed data of a file. """
+
+        data, compressed = self._files[name]
+
+        if compressed:
+            # Skip the length prepended by qCompress().
+            data = zlib.decompress(data[4:])
+
+        return data
+
+    @property
+    def stored_size(self):
+        """ The total number of bytes used to store the files. """
+
+        return sum(len(data) for data, _ in self._files.values())
+
+    @property
+    def uncompressed_size(self):
+        """ The total number of bytes of the uncompressed files. """
+
+        size = 0
+
+        for data, compressed in self._files.values():
+            size += struct.unpack('>I', data[:4])[0] if compressed else len(data)
+
+        return size
+
+    def _add_host_file(self, name, file_name, compress):
+        """ Add a file read from the host file system. """
+
+        try:
+            with open(file_name, 'rb') as f:
+                data = f.read()
+        except Exception as e:
+            raise UserException("unable to read '{0}'".format(file_name),
+                    str(e))
+
+        compressed = False
+
+        if compress and len(data) != 0:
+            zdata = struct.pack('>I', len(data)) + zlib.compress(data)
+
+            if (len(data) - len(zdata)) * 100 // len(data) >= self.COMPRESS_THRESHOLD:
+                data = zdata
+                compressed = True
+
+        self.add_file(name, data, compressed)
+
+    @classmethod
+    def _load_directory(cls, resources_dir, compress):
+        """ Create a Resources instance from a directory.  If the directory
+        contains .qrc files then only the files they refer to are added.
+        """
+
+        resources = cls()
+
+        qrc_files = [fn for fn in os.listdir(resources_dir)
+                if fn.endswith('.qrc')]
+
+        if qrc_files:
+            for qrc_file in sorted(qrc_files):
+                resources._read_qrc(os.path.join(resources_dir, qrc_file),
+                        compress)
+        else:
+            for dirpath, _, filenames in os.walk(resources_dir):
+                for filename in filenames:
+                    file_name = os.path.join(dirpath, filename)
+                    name = os.path.relpath(file_name,
+                            resources_dir).replace(os.sep, '/')
+
+                    resources._add_host_file(name, file_name, compress)
+
+        return resources
+
+    def _read_qrc(self, qrc_file, compress):
+        """ Add the files referred to by a .qrc file. """
+
+        try:
+            root = ElementTree.parse(qrc_file).getroot()
+        except Exception as e:
+            raise UserException("unable to parse '{0}'".format(qrc_file),
+                    str(e))
+
+        qrc_dir = os.path.dirname(qrc_file)
+
+        for qresource in root.iter('qresource'):
+            prefix = qresource.get('prefix', '').strip('/')
+
+            for file_el in qresource.iter('file'):
+                rel_path = file_el.text.strip()
+                name = file_el.get('alias', rel_path).strip('/')
+
+                if prefix:
+                    name = prefix + '/' + name
+
+                self._add_host_file(name,
+                        os.path.join(qrc_dir, rel_path.replace('/', os.sep)),
+                        compress)
+
+    # The flags of a node of a .rcc file.
+    _RCC_COMPRESSED = 0x01
+    _RCC_DIRECTORY = 0x02
+    _RCC_COMPRESSED_ZSTD = 0x04
+
+    def _read_rcc(self, rcc_file):
+        """ Add the files contained in a binary .rcc file. """
+
+        try:
+            with open(rcc_file, 'rb') as f:
+                rcc = f.read()
+        except Exception as e:
+            raise UserException("unable to read '{0}'".format(rcc_file),
+                    str(e))
+
+        if rcc[:4] != b'qres':
+            raise UserException(
+                    "'{0}' is not a binary resource file".format(rcc_file))
+
+        version, tree_offset, data_offset, names_offset = struct.unpack_from(
+                '>IIII', rcc, 4)
+
+        if version > 3:
+            raise UserException(
+                    "'{0}' has an unsupported format version ({1})".format(
+                            rcc_file, version))
+
+        node_size = 22 if version >= 2 else 14
+
+        def node_name(node):
+            name_offset = struct.unpack_from('>I', rcc,
+                    tree_offset + node * node_size)[0]
+            name_len = struct.unpack_from('>H', rcc,
+                    names_offset + name_offset)[0]
+            start = names_offset + name_offset + 6
+
+            return rcc[start:start + name_len * 2].decode('utf-16-be')
+
+        def add_node(node, dir_name):
+            offset = tree_offset + node * node_size
+            flags = struct.unpack_from('>H', rcc, offset + 4)[0]
+
+            if flags & self._RCC_DIRECTORY:
+                nr_children, first_child = struct.unpack_from('>II', rcc,
+                        offset + 6)
+
+                for child in range(first_child, first_child + nr_children):
+                    name = node_name(child)
+                    if dir_name:
+                        name = dir_name + '/' + name
+
+                    add_node(child, name)
+            else:
+                if flags & self._RCC_COMPRESSED_ZSTD:
+                    raise UserException(
+                            "'{0}' contains zstd compressed resources, use "
+                            "'rcc --compress-algo zlib' instead".format(
+                                    rcc_file))
+
+                file_offset = struct.unpack_from('>I', rcc, offset + 10)[0]
+                size = struct.unpack_from('>I', rcc,
+                        data_offset + file_offset)[0]
+                start = data_offset + file_offset + 4
+
+                self.add_file(dir_name, rcc[start:start + size],
+                        bool(flags & self._RCC_COMPRESSED))
+
+        try:
+            add_node(0, '')
+        except struct.error as e:
+            raise UserException("'{0}' is corrupt".format(rcc_file), str(e))
@@ -26,8 +26,10 @@
 
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFontInfo, QGuiApplication
-from PyQt5.QtWidgets import (QCheckBox, QFileDialog, QGridLayout, QGroupBox,
-        QLineEdit, QPlainTextEdit, QWidget)
+from PyQt5.QtWidgets import (QCheckBox, QComboBox, QFileDialog, QGridLayout,
+        QGroupBox, QLineEdit, QPlainTextEdit, QSpinBox, QWidget)
+
+from ..build_profiles import BUILD_PROFILES
 
 from .better_form import BetterForm
 from .collapsible_widget import CollapsibleWidget
@@ -100,6 +102,45 @@ class ApplicationPage(QWidget):
                 textEdited=self._sys_path_changed)
         form.addRow("sys.path", self._sys_path_edit)
 
+        self._lazy_modules_edit = QLineEdit(
+                placeholderText="Lazily loaded modules",
+                whatsThis="A space separated list of the fully qualified names "
+                        "of modules and packages that are loaded lazily, i.e. "
+                        "they are not executed until one of their attributes "
+                        "is first used. Sub-packages of a package are also "
+                        "loaded lazily.",
+                textEdited=self._lazy_modules_changed)
+        form.addRow("Lazy modules", self._lazy_modules_edit)
+
+        self._deep_frozen_modules_edit = QLineEdit(
+                placeholderText="Deep-frozen modules",
+                whatsThis="A space separated list of the fully qualified names "
+                        "of the modules that are deep-frozen when the "
+                        "application is built using the <tt>--deep-freeze</tt> "
+                        "option of <tt>pyqtdeploy-build</tt>. If none are "
+                        "specified then a default set of modules is used.",
+                textEdited=self._deep_frozen_modules_changed)
+        form.addRow("Deep-frozen modules", self._deep_frozen_modules_edit)
+
+        self._warmup_modules_edit = QLineEdit(
+                placeholderText="Warm-up modules",
+                whatsThis="A space separated list of the fully qualified names "
+                        "of modules that are imported in a background thread "
+                        "when the application starts.",
+                textEdited=self._warmup_modules_changed)
+        form.addRow("Warm-up modules", self._warmup_modules_edit)
+
+        self._adjacent_extension_modules_edit = QLineEdit(
+                placeholderText="Adjacent extension modules",
+                whatsThis="A space separated list of the fully qualified names "
+                        "of extension modules that are installed as shared "
+                        "libraries in the same directory as the application "
+                        "executable. The application only looks for the "
+                        "extension modules specified here.",
+                textEdited=self._adjacent_extension_modules_changed)
+        form.addRow("Adjacent extension modules",
+                self._adjacent_extension_modules_edit)
+
         layout.addLayout(form, 0, 0)
 
         options_layout = BetterForm()
@@ -118,6 +159,23 @@ class ApplicationPage(QWidget):
                 stateChanged=self._bundle_changed)
         options_layout.addRow(self._bundle_edit)
 
+        self._build_profile_edit = QComboBox(
+                whatsThis="The build profile that configures the compiler and "
+                        "linker optimisations used when building the "
+                        "application.",
+                currentTextChanged=self._build_profile_changed)
+        self._build_profile_edit.addItems(('',) + BUILD_PROFILES)
+        options_layout.addRow("Build profile", self._build_profile_edit)
+
+        self._hash_seed_edit = QSpinBox(minimum=-1, maximum=2147483647,
+                specialValueText="Random",
+                whatsThis="The seed used to generate the hash of "
+                        "<tt>str</tt> and <tt>bytes</tt> objects. If it is "
+                        "random then a new seed is used each time the "
+                        "application is run.",
+                valueChanged=self._hash_seed_changed)
+        options_layout.addRow("Hash seed", self._hash_seed_edit)
+
         layout.addLayout(options_layout, 0, 1)
 
         # Extra space is needed before the application package editor.
@@ -151,6 +209,12 @@ class ApplicationPage(QWidget):
         self._script_edit.setText(project.application_script)
         self._entry_point_edit.setText(project.application_entry_point)
         self._sys_path_edit.setText(project.sys_path)
+        self._lazy_modules_edit.setText(' '.join(project.lazy_modules))
+        self._deep_frozen_modules_edit.setText(
+                ' '.join(project.deep_frozen_modules))
+        self._warmup_modules_edit.setText(' '.join(project.warmup_modules))
+        self._adjacent_extension_modules_edit.setText(
+                ' '.join(project.adjacent_extension_modules))
         self._package_edit.configure(project.application_package, project)
 
         blocked = self._console_edit.blockSignals(True)
@@ -163,10 +227,30 @@ class ApplicationPage(QWidget):
                 Qt.Checked if project.application_is_bundle else Qt.Unchecked)
         self._bundle_edit.blockSignals(blocked)
 
+        blocked = self._build_profile_edit.blockSignals(True)
+        self._build_profile_edit.setCurrentText(project.build_profile)
+        self._build_profile_edit.blockSignals(blocked)
+
+        blocked = self._hash_seed_edit.blockSignals(True)
+        self._hash_seed_edit.setValue(project.hash_seed)
+        self._hash_seed_edit.blockSignals(blocked)
+
         blocked = self._qmake_edit.blockSignals(True)
         self._qmake_edit.setPlainText(self._project.qmake_configuration)
         self._qmake_edit.blockSignals(blocked)
 
+    def _build_profile_changed(self, value):
+        """ Invoked when the user changes the build profile. """
+
+        self.project.build_profile = value
+        self.project.modified = True
+
+    def _hash_seed_changed(self, value):
+        """ Invoked when the user changes the hash seed. """
+
+        self.project.hash_seed = value
+        self.project.modified = True
+
     def _console_changed(self, state):
         """ Invoked when the user changes the console state. """
 
@@ -203,6 +287,30 @@ class ApplicationPage(QWidget):
         self.project.sys_path = value.strip()
         self.project.modified = True
 
+    def _lazy_modules_changed(self, value):
+        """ Invoked when the user edits the lazily loaded modules. """
+
+        self.project.lazy_modules = value.split()
+        self.project.modified = True
+
+    def _deep_frozen_modules_changed(self, value):
+        """ Invoked when the user edits the deep-frozen modules. """
+
+        self.project.deep_frozen_modules = value.split()
+        self.project.modified = True
+
+    def _warmup_modules_changed(self, value):
+        """ Invoked when the user edits the warm-up modules. """
+
+        self.project.warmup_modules = value.split()
+        self.project.modified = True
+
+    def _adjacent_extension_modules_changed(self, value):
+        """ Invoked when the user edits the adjacent extension modules. """
+
+        self.project.adjacent_extension_modules = value.split()
+        self.project.modified = True
+
     def _package_changed(self):
         """ Invoked when the user edits the application package. """
 
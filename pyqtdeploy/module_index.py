@@ -0,0 +1,198 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import re
+
+from .file_utilities import create_file, open_file
+from .user_exception import UserException
+
+
+# The types of the entries of the index.  These are the names of the values of
+# the corresponding C++ enum.
+MODULE_TYPES = ('ModuleNotFound', 'ModuleIsModule', 'ModuleIsPackage',
+        'ModuleIsNamespace', 'ModuleIsAdjacentExtensionModule')
+
+# The modules that are imported in order to implement lazy loading (i.e. by
+# importlib.util) and so cannot themselves be loaded lazily.  Note that, from
+# Python v3.12.3, threading is imported when a lazily loaded module is executed.
+LAZY_LOADER_MODULES = ('contextlib', 'functools', 'importlib', 'threading',
+        'types', 'warnings')
+
+
+def create_module_index(resource_names, adjacent_extension_modules=(),
+        lazy_modules=()):
+    """ Return the index of the modules, packages and namespaces contained in
+    a sequence of resource names (using '/' as the separator).
+    adjacent_extension_modules is the collection of the names of the extension
+    modules installed alongside the executable.  lazy_modules is the sequence
+    of modules and packages (including their sub-packages) that should be
+    loaded lazily.  The index is a dict of 2-tuples of the module type and a
+    flag that is set if the module is loaded lazily, keyed by the fully
+    qualified module name.  A UserException is raised if a lazy module is
+    needed to implement lazy loading.
+    """
+
+    index = {}
+
+    for name in resource_names:
+        parts = name.split('/')
+
+        # Every directory is a potential namespace.
+        for i in range(1, len(parts)):
+            index.setdefault('.'.join(parts[:i]), 'ModuleIsNamespace')
+
+        if parts[-1].endswith('.pyo'):
+            if parts[-1] == '__init__.pyo':
+                if len(parts) > 1:
+                    fqmn = '.'.join(parts[:-1])
+
+                    # An ordinary module takes precedence.
+                    if index.get(fqmn) != 'ModuleIsModule':
+                        index[fqmn] = 'ModuleIsPackage'
+            else:
+                fqmn = '.'.join(parts[:-1] + [parts[-1][:-4]])
+                index[fqmn] = 'ModuleIsModule'
+
+    # An ordinary module or package in the resources takes precedence over an
+    # adjacent extension module.
+    for fqmn in adjacent_extension_modules:
+        if index.get(fqmn) not in ('ModuleIsModule', 'ModuleIsPackage'):
+            index[fqmn] = 'ModuleIsAdjacentExtensionModule'
+
+    verify_lazy_modules(lazy_modules)
+
+    return {fqmn: (module_type, _is_lazy(fqmn, module_type, lazy_modules))
+            for fqmn, module_type in index.items()}
+
+
+def is_module_covered(fqmn, package):
+    """ Return True if a module is a package or is contained in it. """
+
+    return fqmn == package or fqmn.startswith(package + '.')
+
+
+def read_module_index(file_name):
+    """ Return the index contained in a file written by write_module_index().
+    """
+
+    index = {}
+
+    with open_file(file_name) as f:
+        for line in f:
+            m = _INDEX_ENTRY_RE.match(line)
+            if m is None:
+                continue
+
+            fqmn, module_type, lazy = m.groups()
+
+            if module_type not in MODULE_TYPES:
+                raise UserException(
+                        "'{0}' contains an unknown module type "
+                        "'{1}'".format(file_name, module_type))
+
+            index[_from_c_string(fqmn)] = (module_type, lazy == 'true')
+
+    return index
+
+
+def to_c_string(value):
+    """ Return a value as the contents of a C string literal that is
+    independent of the compiler's source character set.
+    """
+
+    chars = []
+
+    for byte in value.encode('UTF-8'):
+        if byte in (ord('"'), ord('\\')) or byte < 32 or byte > 126:
+            chars.append('\\{0:03o}'.format(byte))
+        else:
+            chars.append(chr(byte))
+
+    return ''.join(chars)
+
+
+def verify_lazy_modules(lazy_modules):
+    """ Raise a UserException if any of a sequence of lazy modules is needed
+    to implement lazy loading.
+    """
+
+    for lazy_module in lazy_modules:
+        for module in LAZY_LOADER_MODULES:
+            if is_module_covered(module, lazy_module) or is_module_covered(lazy_module, module):
+                raise UserException(
+                        "'{0}' cannot be loaded lazily as '{1}' is needed "
+                        "to implement lazy loading".format(lazy_module,
+                                module))
+
+
+def write_module_index(file_name, index):
+    """ Write an index created by create_module_index() as the C++ source of
+    the array used by the importer.
+    """
+
+    # The importer compares the names as UTF-8 encoded C strings.
+    sorted_index = sorted(index.items(),
+            key=lambda entry: entry[0].encode('UTF-8'))
+
+    with create_file(file_name) as f:
+        f.write('static const IndexEntry module_index[] = {\n')
+
+        for fqmn, (module_type, lazy) in sorted_index:
+            f.write('    {{"{0}", {1}, {2}}},\n'.format(to_c_string(fqmn),
+                    module_type, 'true' if lazy else 'false'))
+
+        f.write('''    {{NULL, ModuleNotFound, false}}
+}};
+
+static const size_t module_index_size = {0};
+'''.format(len(sorted_index)))
+
+
+# The regular expression that matches an entry of the index.
+_INDEX_ENTRY_RE = re.compile(r'^\s*\{"(.*)", (\w+), (true|false)\},\s*$')
+
+# The regular expression that matches an octal escape written by
+# to_c_string().
+_OCTAL_ESCAPE_RE = re.compile(rb'\\([0-7]{3})')
+
+
+def _from_c_string(value):
+    """ Return the value of the contents of a C string literal written by
+    to_c_string().
+    """
+
+    return _OCTAL_ESCAPE_RE.sub(lambda m: bytes([int(m.group(1), 8)]),
+            value.encode('ascii')).decode('UTF-8')
+
+
+def _is_lazy(fqmn, module_type, lazy_modules):
+    """ Return True if a module is loaded lazily. """
+
+    if module_type not in ('ModuleIsModule', 'ModuleIsPackage'):
+        return False
+
+    return any(is_module_covered(fqmn, lazy_module)
+            for lazy_module in lazy_modules)
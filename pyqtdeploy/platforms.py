@@ -94,8 +94,12 @@ class Platform:
         raise UserException("'{0}' is not a supported platform".format(name))
 
     @staticmethod
-    def run(*args, message_handler, capture=False):
-        """ Run a command, optionally capturing stdout. """
+    def run(*args, message_handler, capture=False, probe_cache=None):
+        """ Run a command, optionally capturing stdout.  If the command is a
+        probe of the host whose output is captured then a probe cache can be
+        given so that any output saved in it by an earlier invocation is used
+        instead.
+        """
 
         # Allow the first argument to be a sequence of arguments.  This allows
         # default arguments to be specified for all invocations without
@@ -105,6 +109,18 @@ class Platform:
             new_args.extend(args[1:])
             args = new_args
 
+        if not capture:
+            probe_cache = None
+
+        if probe_cache is not None:
+            stdout = probe_cache.get_command_result(args)
+
+            if stdout is not None:
+                message_handler.verbose_message(
+                        "Using the cached output of '{0}'.".format(
+                                ' '.join(args)))
+                return stdout
+
         message_handler.verbose_message(
                 "Running '{0}'.".format(' '.join(args)))
 
@@ -139,10 +155,15 @@ class Platform:
             raise UserException(
                     "execution of '{0}' failed: {1}".format(args[0], detail))
 
+        if probe_cache is not None:
+            probe_cache.set_command_result(args, stdout)
+
         return stdout
 
-    def verify_as_target(self, message_handler):
-        """ Verify the platform as a target. """
+    def verify_as_target(self, message_handler, probe_cache=None):
+        """ Verify the platform as a target.  probe_cache is the optional
+        cache of the results of probing the host.
+        """
 
 
 class Architecture:
@@ -271,10 +292,12 @@ class Architecture:
                     "{0} is not a supported {1} development host".format(
                             self.name, target.name))
 
-    def verify_as_target(self, message_handler):
-        """ Verify the architecture as a target. """
+    def verify_as_target(self, message_handler, probe_cache=None):
+        """ Verify the architecture as a target.  probe_cache is the optional
+        cache of the results of probing the host.
+        """
 
-        self.platform.verify_as_target(message_handler)
+        self.platform.verify_as_target(message_handler, probe_cache)
 
 
 class ApplePlatform(Platform):
@@ -286,19 +309,27 @@ class ApplePlatform(Platform):
     # The prefix of the directory name of the SDK.
     sdk_prefix = ''
 
-    def verify_as_target(self, message_handler):
+    def verify_as_target(self, message_handler, probe_cache=None):
         """ Verify the platform as a target. """
 
-        super().verify_as_target(message_handler)
+        super().verify_as_target(message_handler, probe_cache)
 
-        # Get the SDK path and version number.
+        # Get the SDK path and version number.  Ignore any cached results if
+        # the SDK has since been removed.
         self.apple_sdk = self.run('xcrun', '--sdk', self.sdk_name,
                 '--show-sdk-path', message_handler=message_handler,
-                capture=True)
+                capture=True, probe_cache=probe_cache)
+
+        if probe_cache is not None and not os.path.isdir(self.apple_sdk):
+            probe_cache = None
+
+            self.apple_sdk = self.run('xcrun', '--sdk', self.sdk_name,
+                    '--show-sdk-path', message_handler=message_handler,
+                    capture=True)
 
         self.apple_sdk_version = self.run('xcrun', '--sdk', self.sdk_name,
                 '--show-sdk-version', message_handler=message_handler,
-                capture=True)
+                capture=True, probe_cache=probe_cache)
 
         if not self.apple_sdk or not self.apple_sdk_version:
             raise UserException(
@@ -328,10 +359,10 @@ class AndroidArchitecture(Architecture):
     # The architecture-specific clang prefix.
     clang_prefix = ''
 
-    def verify_as_target(self, message_handler):
+    def verify_as_target(self, message_handler, probe_cache=None):
         """ Verify the architecture as a target. """
 
-        super().verify_as_target(message_handler)
+        super().verify_as_target(message_handler, probe_cache)
 
         # Set the various property values.
         ndk_root = self.platform.android_ndk_root
@@ -404,10 +435,10 @@ class Android(Platform):
     _REQUIRED_ENV_VARS = ('ANDROID_NDK_ROOT', 'ANDROID_NDK_PLATFORM',
             'ANDROID_SDK_ROOT')
 
-    def verify_as_target(self, message_handler):
+    def verify_as_target(self, message_handler, probe_cache=None):
         """ Verify the platform as a target. """
 
-        super().verify_as_target(message_handler)
+        super().verify_as_target(message_handler, probe_cache)
 
         # Verify required environment variables.
         for name in self._REQUIRED_ENV_VARS:
@@ -423,7 +454,7 @@ class Android(Platform):
         self.android_check_exists(self.android_ndk_sysroot)
 
         # Verify the NDK revision.
-        self.android_ndk_version = self._get_ndk_version()
+        self.android_ndk_version = self._get_ndk_version(probe_cache)
         if self.android_ndk_version is None:
             raise UserException("unable to determine the NDK revision")
 
@@ -439,7 +470,7 @@ class Android(Platform):
                     "versions of the NDK later than r21 are untested")
 
         # Verify the SDK version.
-        self.android_sdk_version = self._get_sdk_version()
+        self.android_sdk_version = self._get_sdk_version(probe_cache)
         if self.android_sdk_version is None:
             raise UserException("unable to determine the SDK version number")
 
@@ -479,29 +510,37 @@ class Android(Platform):
         return api
 
     @staticmethod
-    def _get_version(source_properties):
+    def _get_version(source_properties, probe_cache):
         """ Get the version number of a source.properties file. """
 
-        with open(source_properties) as f:
-            for line in f:
-                line = line.replace(' ', '')
-                parts = line.split('=')
-                if parts[0] == 'Pkg.Revision' and len(parts) == 2:
-                    version = VersionNumber.parse_version_number(parts[1])
-                    break
-            else:
-                version = None
+        revision = None
+        if probe_cache is not None:
+            revision = probe_cache.get_file_result(source_properties)
+
+        if revision is None:
+            with open(source_properties) as f:
+                for line in f:
+                    line = line.replace(' ', '')
+                    parts = line.split('=')
+                    if parts[0] == 'Pkg.Revision' and len(parts) == 2:
+                        revision = parts[1].strip()
+                        break
+                else:
+                    return None
+
+            if probe_cache is not None:
+                probe_cache.set_file_result(source_properties, revision)
 
-        return version
+        return VersionNumber.parse_version_number(revision)
 
-    def _get_ndk_version(self):
+    def _get_ndk_version(self, probe_cache):
         """ Return the version number of the NDK. """
 
         # source.properties is available from r11.
         source_properties = os.path.join(self.android_ndk_root,
                 'source.properties')
         if os.path.isfile(source_properties):
-            return self._get_version(source_properties)
+            return self._get_version(source_properties, probe_cache)
 
         # RELEASE.TXT is available in r10 and earlier.
         release_txt = os.path.join(self.android_ndk_root, 'RELEASE.TXT')
@@ -523,7 +562,7 @@ class Android(Platform):
 
         return None
 
-    def _get_sdk_version(self):
+    def _get_sdk_version(self, probe_cache):
         """ Return the version number of the SDK. """
 
         # Assume that source.properties should be available.
@@ -535,7 +574,7 @@ class Android(Platform):
                     "'{0}' does not exist, make sure ANDROID_SDK_ROOT is set "
                     "correctly".format(source_properties))
 
-        return self._get_version(source_properties)
+        return self._get_version(source_properties, probe_cache)
 
 Android()
 
@@ -669,10 +708,10 @@ class WindowsArchitecture(Architecture):
 class Windows_x86_32(WindowsArchitecture):
     """ Encapsulate the Windows 32-bit x86 architecture. """
 
-    def verify_as_target(self, message_handler):
+    def verify_as_target(self, message_handler, probe_cache=None):
         """ Verify the architecture as a target. """
 
-        super().verify_as_target(message_handler)
+        super().verify_as_target(message_handler, probe_cache)
 
         if self.msvc_target() != '32':
             raise UserException("MSVC is not configured for a 32-bit target")
@@ -681,10 +720,10 @@ class Windows_x86_32(WindowsArchitecture):
 class Windows_x86_64(WindowsArchitecture):
     """ Encapsulate the Windows 64-bit x86 architecture. """
 
-    def verify_as_target(self, message_handler):
+    def verify_as_target(self, message_handler, probe_cache=None):
         """ Verify the architecture as a target. """
 
-        super().verify_as_target(message_handler)
+        super().verify_as_target(message_handler, probe_cache)
 
         if self.msvc_target() != '64':
             raise UserException("MSVC is not configured for a 64-bit target")
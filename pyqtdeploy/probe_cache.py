@@ -0,0 +1,184 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import json
+import os
+import shutil
+import sys
+
+
+class ProbeCache:
+    """ The ProbeCache class is a persistent cache of the results of probing
+    the host, i.e. the output of commands that query the toolchain and the
+    contents of files describing installed SDKs.  A result is keyed by the
+    resolved pathname, modification time and size of the executable (or file),
+    the arguments, the values of the environment variables that might
+    affect it and, on macOS, the selected Xcode developer directory.
+    """
+
+    # The environment variables that might affect the result of a probe.
+    ENVIRONMENT = ('ANDROID_NDK_PLATFORM', 'ANDROID_NDK_ROOT',
+            'ANDROID_SDK_ROOT', 'DEVELOPER_DIR', 'PYTHONHOME', 'PYTHONPATH',
+            'QMAKESPEC', 'SDKROOT')
+
+    # The version of the format of the cache file.
+    _FORMAT = 2
+
+    # The link to the developer directory selected by 'xcode-select -s'.
+    _XCODE_SELECT_LINK = '/var/db/xcode_select_link'
+
+    def __init__(self, file_name, reprobe=False):
+        """ Initialise the object.  file_name is the name of the file the
+        cache is stored in.  If reprobe is set then any existing results are
+        ignored (but new results are still saved).
+        """
+
+        self._file_name = file_name
+        self._results = {}
+
+        if not reprobe:
+            try:
+                with open(file_name) as f:
+                    cache = json.load(f)
+
+                if cache.get('format') == self._FORMAT:
+                    self._results = cache.get('results', {})
+            except (OSError, ValueError, AttributeError):
+                # A missing or corrupt cache is ignored.
+                pass
+
+    def get_command_result(self, args):
+        """ Return the cached output of a command or None if there is none.
+        """
+
+        key = self._command_key(args)
+        if key is None:
+            return None
+
+        return self._results.get(key)
+
+    def get_file_result(self, file_name):
+        """ Return the cached result of reading a file or None if there is
+        none.
+        """
+
+        key = self._file_key(file_name)
+        if key is None:
+            return None
+
+        return self._results.get(key)
+
+    def set_command_result(self, args, result):
+        """ Save the output of a command. """
+
+        self._set_result(self._command_key(args), result)
+
+    def set_file_result(self, file_name, result):
+        """ Save the result of reading a file. """
+
+        self._set_result(self._file_key(file_name), result)
+
+    def _command_key(self, args):
+        """ Return the key for a command or None if the executable couldn't be
+        found.
+        """
+
+        exe = shutil.which(args[0])
+        if exe is None:
+            return None
+
+        return self._key('command', exe, list(args[1:]))
+
+    def _file_key(self, file_name):
+        """ Return the key for a file or None if it doesn't exist. """
+
+        return self._key('file', file_name, [])
+
+    def _key(self, kind, file_name, args):
+        """ Return the key for a probe or None if the file doesn't exist. """
+
+        file_name = os.path.realpath(file_name)
+
+        try:
+            st = os.stat(file_name)
+        except OSError:
+            return None
+
+        environment = [(name, os.environ.get(name))
+                for name in self.ENVIRONMENT]
+
+        return json.dumps([kind, file_name, st.st_mtime_ns, st.st_size, args,
+                environment, self._developer_dir_key()])
+
+    @classmethod
+    def _developer_dir_key(cls):
+        """ Return the part of a key that identifies the selected Xcode
+        developer directory.  The tools (e.g. xcrun) don't change when a
+        different Xcode is selected or Xcode is upgraded but their output
+        does.
+        """
+
+        if sys.platform != 'darwin':
+            return None
+
+        developer_dir = os.path.realpath(cls._XCODE_SELECT_LINK)
+
+        try:
+            st = os.stat(developer_dir)
+        except OSError:
+            return None
+
+        return [developer_dir, st.st_mtime_ns]
+
+    def _set_result(self, key, result):
+        """ Save a result and write the cache file. """
+
+        if key is None:
+            return
+
+        self._results[key] = result
+
+        # Don't create the directory containing the cache, i.e. the sysroot,
+        # as a side effect.
+        if not os.path.isdir(os.path.dirname(self._file_name)):
+            return
+
+        # Write the file atomically as other processes may be reading it.
+        temp_name = '{0}.{1}.tmp'.format(self._file_name, os.getpid())
+
+        try:
+            with open(temp_name, 'w') as f:
+                json.dump({'format': self._FORMAT, 'results': self._results},
+                        f, indent=1)
+
+            os.replace(temp_name, self._file_name)
+        except OSError:
+            # The cache is an optimisation so failing to save it is ignored.
+            try:
+                os.remove(temp_name)
+            except OSError:
+                pass
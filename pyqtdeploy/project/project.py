@@ -68,10 +68,16 @@ class Project:
         self.application_package = QrcPackage()
         self.application_script = ''
         self.application_entry_point = ''
+        self.adjacent_extension_modules = []
+        self.build_profile = ''
+        self.deep_frozen_modules = []
+        self.hash_seed = -1
+        self.lazy_modules = []
         self.sys_path = ''
         self.sysroot_toml = ''
         self.sysroots_dir = ''
         self.parts = []
+        self.warmup_modules = []
         self.qmake_configuration = ''
 
     @property
@@ -275,14 +281,22 @@ class Project:
         # The application specific configuration.
         application = cls._get_dict(root, 'Application')
 
+        project.adjacent_extension_modules = cls._get_list(application,
+                'adjacent_extension_modules')
         project.application_entry_point = application.get('entry_point', '')
         project.application_is_console = application.get('is_console', False)
         project.application_is_bundle = application.get('is_bundle', False)
         project.application_name = application.get('name', '')
         project.application_script = application.get('script', '')
+        project.build_profile = application.get('build_profile', '')
+        project.deep_frozen_modules = cls._get_list(application,
+                'deep_frozen_modules')
+        project.hash_seed = application.get('hash_seed', -1)
+        project.lazy_modules = cls._get_list(application, 'lazy_modules')
         project.qmake_configuration = application.get('qmake_configuration',
                 '')
         project.sys_path = application.get('syspath', '')
+        project.warmup_modules = cls._get_list(application, 'warmup_modules')
 
         # Any application package.
         app_package = application.get('Package')
@@ -305,13 +319,19 @@ class Project:
         }
 
         application = {
+            'adjacent_extension_modules': self.adjacent_extension_modules,
+            'build_profile': self.build_profile,
+            'deep_frozen_modules': self.deep_frozen_modules,
             'entry_point': self.application_entry_point,
+            'hash_seed': self.hash_seed,
             'is_console': self.application_is_console,
             'is_bundle': self.application_is_bundle,
+            'lazy_modules': self.lazy_modules,
             'name': self.application_name,
             'qmake_configuration': self.qmake_configuration,
             'script': self.application_script,
-            'syspath': self.sys_path
+            'syspath': self.sys_path,
+            'warmup_modules': self.warmup_modules,
         }
 
         if self.application_package.name is not None:
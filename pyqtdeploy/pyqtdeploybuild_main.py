@@ -27,6 +27,8 @@
 import argparse
 
 from . import Builder, MessageHandler, PYQTDEPLOY_RELEASE, UserException
+from .build_profiles import BUILD_PROFILES
+from .builder import GENERATORS
 
 
 def main():
@@ -40,14 +42,36 @@ def main():
             version=PYQTDEPLOY_RELEASE)
     parser.add_argument('--build-dir', help="the name of the build directory",
             metavar="DIR")
+    parser.add_argument('--deep-freeze',
+            help="deep-freeze the bootstrap, any main script and the hot "
+                    "modules (Python v3.11 and v3.12 only)",
+            action='store_true')
+    parser.add_argument('--external-resources',
+            help="build the resources as external .rcc files that are "
+                    "registered when the application starts",
+            action='store_true')
+    parser.add_argument('--generator',
+            help="the generator of the build system's project file "
+                    "[default: qmake]",
+            choices=GENERATORS, default='qmake')
     parser.add_argument('--no-clean',
             help="do not delete and re-create the build directory before "
                     "starting",
             dest='clean', default=True, action='store_false')
+    parser.add_argument('--no-compress',
+            help="do not compress the resources so that Python modules can "
+                    "be loaded without being copied",
+            dest='compress', default=True, action='store_false')
     parser.add_argument('--opt',
             help="the optimisation level where 0 is none, 1 is no asserts, 2 "
                     "is no asserts or docstrings [default: 2]",
             metavar="LEVEL", type=int, choices=range(3), default=2),
+    parser.add_argument('--precompiled-header',
+            help="use a precompiled header where the compiler supports it",
+            action='store_true')
+    parser.add_argument('--profile',
+            help="the build profile overriding any specified by the project",
+            choices=BUILD_PROFILES),
     parser.add_argument('--python',
             help="the python executable when using an existing Python "
                     "installation",
@@ -55,10 +79,23 @@ def main():
     parser.add_argument('--qmake',
             help="the qmake executable when using an existing Qt installation",
             metavar="EXECUTABLE")
+    parser.add_argument('--reprobe',
+            help="ignore the results of probing the host saved by earlier "
+                    "invocations",
+            action='store_true')
     parser.add_argument('--resources',
             help="the number of .qrc resource files to generate [default: 1]",
             metavar="NUMBER", type=int, default=1),
     parser.add_argument('--target', help="the target architecture"),
+    parser.add_argument('--unity-build',
+            help="the number of unity source files the extension module "
+                    "sources are amalgamated into where 0 disables unity "
+                    "builds [default: 0]",
+            metavar="NUMBER", type=int, default=0),
+    parser.add_argument('--warmup-trace',
+            help="an import trace from which additional modules to import in "
+                    "the background are taken",
+            metavar="FILE")
     parser.add_argument('--quiet', help="disable progress messages",
             action='store_true')
     parser.add_argument('--verbose', help="enable verbose progress messages",
@@ -75,11 +112,24 @@ def main():
                 "Error: argument --resources: number must be at least 1.")
         return 2
 
+    if args.unity_build < 0:
+        message_handler.error(
+                "Error: argument --unity-build: number must not be negative.")
+        return 2
+
     try:
         builder = Builder(args.project, args.target, message_handler,
-                args.python, args.qmake)
+                args.python, args.qmake, reprobe=args.reprobe)
 
-        builder.build(args.opt, args.resources, args.clean, args.build_dir)
+        builder.build(args.opt, args.resources, args.clean, args.build_dir,
+                nr_unity_units=args.unity_build,
+                precompiled_header=args.precompiled_header,
+                build_profile=args.profile,
+                compress_resources=args.compress,
+                external_resources=args.external_resources,
+                deep_freeze=args.deep_freeze,
+                warmup_trace=args.warmup_trace,
+                generator=args.generator)
     except UserException as e:
         message_handler.exception(e)
         return 1
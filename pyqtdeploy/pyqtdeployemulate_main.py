@@ -0,0 +1,144 @@
+# Copyright (c) 2020, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import argparse
+import os
+
+from . import MessageHandler, PYQTDEPLOY_RELEASE, UserException
+from .emulator import Emulator, Resources
+
+
+def main():
+    """ The entry point for the setuptools generated pyqtdeploy-emulate
+    wrapper.
+    """
+
+    # Parse the command line.
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument('-V', '--version', action='version',
+            version=PYQTDEPLOY_RELEASE)
+    parser.add_argument('--import',
+            help="a module to import from the resources (may be specified "
+                    "more than once)",
+            metavar="MODULE", dest='imports', action='append', default=[])
+    parser.add_argument('--lazy',
+            help="a module or package to load lazily in addition to those "
+                    "specified in the index (may be specified more than once)",
+            metavar="MODULE", action='append', default=[])
+    parser.add_argument('--no-compress',
+            help="do not compress resources read from a build directory or "
+                    ".qrc file",
+            dest='compress', default=True, action='store_false')
+    parser.add_argument('--no-index',
+            help="probe the resources rather than using the index of modules",
+            dest='use_index', default=True, action='store_false')
+    parser.add_argument('--script',
+            help="a script to run as __main__ after any modules have been "
+                    "imported",
+            metavar="FILE")
+    parser.add_argument('--top',
+            help="the number of the slowest modules to report [default: 20]",
+            metavar="NUMBER", type=int, default=20)
+    parser.add_argument('--quiet', help="disable progress messages",
+            action='store_true')
+    parser.add_argument('--verbose', help="enable verbose progress messages",
+            action='store_true')
+    parser.add_argument('resources',
+            help="the build directory, .qrc file or binary .rcc file "
+                    "containing the resources")
+
+    args = parser.parse_args()
+
+    message_handler = MessageHandler(args.quiet, args.verbose)
+
+    if len(args.imports) == 0 and args.script is None:
+        message_handler.error(
+                "Error: at least one of --import or --script must be "
+                "specified.")
+        return 2
+
+    try:
+        message_handler.progress_message(
+                "Reading the resources from '{0}'".format(args.resources))
+
+        resources = Resources.load(args.resources, compress=args.compress)
+
+        # Use the index written by pyqtdeploy-build if there is one.
+        index_file = os.path.join(args.resources, 'pdytools_index.h')
+        if not os.path.isfile(index_file):
+            index_file = None
+
+        emulator = Emulator(resources, index_file=index_file,
+                use_index=args.use_index, lazy_modules=args.lazy)
+
+        emulator.install()
+
+        try:
+            for name in args.imports:
+                elapsed = emulator.import_module(name)
+                message_handler.verbose_message(
+                        "Imported {0} in {1:.3f} ms".format(name,
+                                elapsed * 1000))
+
+            if args.script is not None:
+                elapsed = emulator.run_script(args.script)
+                message_handler.verbose_message(
+                        "Ran {0} in {1:.3f} ms".format(args.script,
+                                elapsed * 1000))
+        finally:
+            emulator.uninstall()
+    except UserException as e:
+        message_handler.exception(e)
+        return 1
+    except ImportError as e:
+        message_handler.error(str(e))
+        return 1
+
+    # Report the results.
+    message_handler.message(
+            "Resources: {0} files, {1} bytes stored, {2} bytes "
+            "uncompressed".format(len(resources.file_names()),
+                    resources.stored_size, resources.uncompressed_size))
+
+    for key, value in emulator.stats().items():
+        message_handler.message("{0}: {1}".format(key, value))
+
+    total = sum(record.exclusive for record in emulator.imports)
+    message_handler.message(
+            "{0} modules executed in {1:.3f} ms".format(len(emulator.imports),
+                    total * 1000))
+
+    slowest = sorted(emulator.imports, key=lambda record: record.exclusive,
+            reverse=True)
+
+    for record in slowest[:args.top]:
+        message_handler.message(
+                "{0:10.3f} ms {1:10.3f} ms {2:10} bytes  {3}".format(
+                        record.exclusive * 1000, record.inclusive * 1000,
+                        record.nr_bytes, record.name))
+
+    return 0
@@ -27,8 +27,9 @@
 import argparse
 import os
 
-from . import (Architecture, MessageHandler, PYQTDEPLOY_RELEASE, Sysroot,
-        SysrootSpecification, UserException)
+from . import (Architecture, MessageHandler, Project, PYQTDEPLOY_RELEASE,
+        Sysroot, SysrootSpecification, UserException)
+from .sysroot import run_concurrently, split_jobs
 
 
 def main():
@@ -51,7 +52,8 @@ def main():
             action='store_true')
     parser.add_argument('--jobs',
             help="the number of make jobs to be run in parallel on Linux and "
-                    "macOS [default: 1]",
+                    "macOS (and of cmake jobs on all hosts), shared between "
+                    "any targets being built concurrently [default: 1]",
             metavar="NUMBER", type=int, default=1)
     parser.add_argument('--no-clean',
             help="do not remove the temporary build directory",
@@ -59,6 +61,10 @@ def main():
     parser.add_argument('--options',
             help="show the options available for the components",
             action='store_true')
+    parser.add_argument('--project',
+            help="a project whose requirements the components are tailored "
+                    "to",
+            metavar="FILE", dest='projects', action='append')
     parser.add_argument('--python',
             help="the python executable when using an existing Python "
                     "installation",
@@ -66,6 +72,10 @@ def main():
     parser.add_argument('--qmake',
             help="the qmake executable when using an existing Qt installation",
             metavar="EXECUTABLE")
+    parser.add_argument('--reprobe',
+            help="ignore the results of probing the host saved by earlier "
+                    "invocations",
+            action='store_true')
     parser.add_argument('--source-dir',
             help="a directory containing source archives",
             metavar="DIR", dest='source_dirs', action='append')
@@ -73,7 +83,9 @@ def main():
             help="the directory containing the target-specific system image "
                     "root directories",
             metavar="DIR")
-    parser.add_argument('--target', help="the target architecture"),
+    parser.add_argument('--target',
+            help="the target architecture (may be specified more than once)",
+            dest='targets', action='append')
     parser.add_argument('--quiet', help="disable progress messages",
             action='store_true')
     parser.add_argument('--verify', help="verify the specification",
@@ -96,25 +108,115 @@ def main():
         else:
             sysroots_dir = os.path.dirname(specification_file)
 
+        # The specification (and its plugins) is only loaded once however many
+        # targets there are.
         specification = SysrootSpecification(specification_file, required=True)
         host = Architecture.architecture()
-        target = Architecture.architecture(args.target)
-        sysroot = Sysroot(specification, host, target, sysroots_dir,
-                message_handler=message_handler, python=args.python,
-                qmake=args.qmake, build_dir=args.build_dir)
 
-        # This is a bit of a hack as platforms are singletons.
-        host.platform.jobs = args.jobs
+        if args.targets:
+            targets = []
+
+            for target_name in args.targets:
+                target = Architecture.architecture(target_name)
+                if target not in targets:
+                    targets.append(target)
+        else:
+            targets = [Architecture.architecture()]
+
+        multiple_targets = (len(targets) > 1)
+
+        sysroots = []
+        message_handlers = []
+
+        for target in targets:
+            build_dir = args.build_dir
+
+            if multiple_targets:
+                # Each target needs its own build directory and its messages
+                # need to be distinguished.
+                if build_dir:
+                    build_dir = os.path.join(build_dir, target.name)
+
+                target_message_handler = _TargetMessageHandler(target.name,
+                        args.quiet, args.verbose)
+            else:
+                target_message_handler = message_handler
+
+            message_handlers.append(target_message_handler)
+
+            sysroots.append(
+                    Sysroot(specification, host, target, sysroots_dir,
+                            message_handler=target_message_handler,
+                            python=args.python, qmake=args.qmake,
+                            build_dir=build_dir, reprobe=args.reprobe))
 
         if args.options:
-            sysroot.show_options(args.component)
+            for sysroot in sysroots:
+                sysroot.show_options(args.component)
         elif args.verify:
-            sysroot.verify()
+            for sysroot in sysroots:
+                sysroot.verify()
         else:
-            sysroot.install_components(args.component, args.source_dirs,
-                    args.no_clean, args.force)
+            # Each target is built in its own process with the make jobs
+            # shared between them.
+            nr_workers, jobs = split_jobs(args.jobs, len(sysroots))
+
+            # This is a bit of a hack as platforms are singletons.
+            host.platform.jobs = jobs
+
+            # Load any projects the components are tailored to.
+            if args.projects:
+                projects = [Project.load(os.path.abspath(p))
+                        for p in args.projects]
+            else:
+                projects = None
+
+            # Each target's errors are reported by its own message handler.
+            # A target that fails doesn't stop the others from being built.
+            tasks = []
+
+            for sysroot, target_message_handler in zip(sysroots,
+                    message_handlers):
+                tasks.append(
+                        ("building the sysroot for '{0}'".format(
+                                sysroot.target.name),
+                        _install_components_task(sysroot, args, projects),
+                        target_message_handler))
+
+            run_concurrently(tasks, nr_workers, message_handler)
     except UserException as e:
         message_handler.exception(e)
         return 1
 
     return 0
+
+
+def _install_components_task(sysroot, args, projects):
+    """ Return a callable that will install the components of a sysroot. """
+
+    return lambda: sysroot.install_components(args.component,
+            args.source_dirs, args.no_clean, args.force, projects=projects)
+
+
+class _TargetMessageHandler(MessageHandler):
+    """ A message handler that prefixes messages with the name of a target.
+    """
+
+    def __init__(self, target_name, quiet, verbose):
+        """ Initialise the object. """
+
+        super().__init__(quiet, verbose)
+
+        self._prefix = '[{0}] '.format(target_name)
+
+    def error(self, message):
+        """ Reimplemented to add the prefix.  Note that exception() also uses
+        this.
+        """
+
+        super().error(self._prefix + message)
+
+    def message(self, message):
+        """ Reimplemented to add the prefix. """
+
+        super().message(self._prefix + message)
@@ -0,0 +1,222 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+from .user_exception import UserException
+
+
+# The Qt modules used by every application.  QTextCodec and QRegExp are
+# provided by the Qt5 compatibility module.
+APPLICATION_QT_MODULES = ('core', 'core5compat')
+
+
+# The map of the qmake name of a Qt v6 module (i.e. as it appears in the QT
+# variable of a .pro file) to the name of the corresponding component of
+# CMake's Qt6 package and the name of the Qt submodule (i.e. the repository)
+# that provides it.
+_QT_MODULES = {
+    '3danimation':          ('3DAnimation', 'qt3d'),
+    '3dcore':               ('3DCore', 'qt3d'),
+    '3dextras':             ('3DExtras', 'qt3d'),
+    '3dinput':              ('3DInput', 'qt3d'),
+    '3dlogic':              ('3DLogic', 'qt3d'),
+    '3drender':             ('3DRender', 'qt3d'),
+    'axcontainer':          ('AxContainer', 'qtactiveqt'),
+    'bluetooth':            ('Bluetooth', 'qtconnectivity'),
+    'charts':               ('Charts', 'qtcharts'),
+    'concurrent':           ('Concurrent', 'qtbase'),
+    'core':                 ('Core', 'qtbase'),
+    'core5compat':          ('Core5Compat', 'qt5compat'),
+    'datavisualization':    ('DataVisualization', 'qtdatavis3d'),
+    'dbus':                 ('DBus', 'qtbase'),
+    'designer':             ('Designer', 'qttools'),
+    'gui':                  ('Gui', 'qtbase'),
+    'help':                 ('Help', 'qttools'),
+    'location':             ('Location', 'qtlocation'),
+    'multimedia':           ('Multimedia', 'qtmultimedia'),
+    'multimediawidgets':    ('MultimediaWidgets', 'qtmultimedia'),
+    'network':              ('Network', 'qtbase'),
+    'networkauth':          ('NetworkAuth', 'qtnetworkauth'),
+    'nfc':                  ('Nfc', 'qtconnectivity'),
+    'opengl':               ('OpenGL', 'qtbase'),
+    'openglwidgets':        ('OpenGLWidgets', 'qtbase'),
+    'pdf':                  ('Pdf', 'qtwebengine'),
+    'pdfwidgets':           ('PdfWidgets', 'qtwebengine'),
+    'positioning':          ('Positioning', 'qtpositioning'),
+    'printsupport':         ('PrintSupport', 'qtbase'),
+    'qml':                  ('Qml', 'qtdeclarative'),
+    'quick':                ('Quick', 'qtdeclarative'),
+    'quick3d':              ('Quick3D', 'qtquick3d'),
+    'quickwidgets':         ('QuickWidgets', 'qtdeclarative'),
+    'remoteobjects':        ('RemoteObjects', 'qtremoteobjects'),
+    'sensors':              ('Sensors', 'qtsensors'),
+    'serialbus':            ('SerialBus', 'qtserialbus'),
+    'serialport':           ('SerialPort', 'qtserialport'),
+    'spatialaudio':         ('SpatialAudio', 'qtmultimedia'),
+    'sql':                  ('Sql', 'qtbase'),
+    'statemachine':         ('StateMachine', 'qtscxml'),
+    'svg':                  ('Svg', 'qtsvg'),
+    'svgwidgets':           ('SvgWidgets', 'qtsvg'),
+    'testlib':              ('Test', 'qtbase'),
+    'texttospeech':         ('TextToSpeech', 'qtspeech'),
+    'uitools':              ('UiTools', 'qttools'),
+    'webchannel':           ('WebChannel', 'qtwebchannel'),
+    'webengine':            ('WebEngineQuick', 'qtwebengine'),
+    'webenginecore':        ('WebEngineCore', 'qtwebengine'),
+    'webenginequick':       ('WebEngineQuick', 'qtwebengine'),
+    'webenginewidgets':     ('WebEngineWidgets', 'qtwebengine'),
+    'websockets':           ('WebSockets', 'qtwebsockets'),
+    'widgets':              ('Widgets', 'qtbase'),
+    'xml':                  ('Xml', 'qtbase'),
+}
+
+
+# The map of each Qt v6 submodule to the other submodules it requires and the
+# approximate relative cost of building it (where qtbase is 100).  The costs
+# are only used to estimate the time saved by not building a submodule.
+_QT_SUBMODULES = {
+    'qt3d':             (('qtbase', ), 45),
+    'qt5compat':        (('qtbase', ), 8),
+    'qtactiveqt':       (('qtbase', ), 5),
+    'qtbase':           ((), 100),
+    'qtcharts':         (('qtbase', ), 15),
+    'qtconnectivity':   (('qtbase', ), 10),
+    'qtdatavis3d':      (('qtbase', ), 10),
+    'qtdeclarative':    (('qtbase', 'qtshadertools', 'qtsvg'), 90),
+    'qtimageformats':   (('qtbase', ), 4),
+    'qtlocation':       (('qtdeclarative', 'qtpositioning'), 25),
+    'qtmultimedia':     (('qtbase', 'qtshadertools'), 25),
+    'qtnetworkauth':    (('qtbase', ), 2),
+    'qtpositioning':    (('qtbase', ), 6),
+    'qtquick3d':        (('qtdeclarative', 'qtshadertools'), 45),
+    'qtremoteobjects':  (('qtbase', ), 10),
+    'qtscxml':          (('qtbase', ), 8),
+    'qtsensors':        (('qtbase', ), 5),
+    'qtserialbus':      (('qtbase', 'qtserialport'), 5),
+    'qtserialport':     (('qtbase', ), 2),
+    'qtshadertools':    (('qtbase', ), 8),
+    'qtspeech':         (('qtbase', ), 3),
+    'qtsvg':            (('qtbase', ), 5),
+    'qttools':          (('qtbase', ), 40),
+    'qttranslations':   (('qttools', ), 3),
+    'qtwayland':        (('qtbase', ), 15),
+    'qtwebchannel':     (('qtbase', ), 3),
+    'qtwebengine':      (('qtdeclarative', 'qtpositioning', 'qtwebchannel'),
+                                600),
+    'qtwebsockets':     (('qtbase', ), 3),
+    'qtwebview':        (('qtdeclarative', ), 3),
+}
+
+
+# The map of the qmake name of each optional qtbase module that can be
+# disabled by a feature to the submodules that require it.
+_QTBASE_OPTIONAL_MODULES = {
+    'concurrent':   ('qt3d', 'qtmultimedia', 'qttools', 'qtwebengine'),
+    'printsupport': ('qttools', 'qtwebengine'),
+    'sql':          ('qttools', ),
+    'testlib':      (),
+    'xml':          ('qttools', 'qtwebengine'),
+}
+
+
+def get_qt_cmake_module(qmake_name):
+    """ Return the name of the CMake Qt6 package component corresponding to
+    the qmake name of a Qt module.
+    """
+
+    return _get_qt_module(qmake_name)[0]
+
+
+def get_qt_submodules(qmake_names):
+    """ Return the sorted list of the Qt v6 submodules needed to build a
+    number of Qt modules specified by their qmake names.
+    """
+
+    submodules = set()
+
+    for qmake_name in qmake_names:
+        _add_qt_submodule(_get_qt_module(qmake_name)[1], submodules)
+
+    return sorted(submodules)
+
+
+def get_qtbase_disabled_features(qmake_names, submodules):
+    """ Return the sorted list of the qtbase features that can be disabled
+    when only a number of Qt modules specified by their qmake names, and the
+    submodules needed to build them, are required.
+    """
+
+    disabled = []
+
+    for qmake_name, users in _QTBASE_OPTIONAL_MODULES.items():
+        if qmake_name in qmake_names:
+            continue
+
+        if any(user in submodules for user in users):
+            continue
+
+        disabled.append(qmake_name)
+
+    return sorted(disabled)
+
+
+def get_qt_build_saving(submodules):
+    """ Return the estimated percentage of the time taken to build all of Qt
+    v6 that is saved by only building a number of submodules.
+    """
+
+    total = sum(cost for _, cost in _QT_SUBMODULES.values())
+    needed = sum(_QT_SUBMODULES[s][1] for s in submodules
+            if s in _QT_SUBMODULES)
+
+    return 100 * (total - needed) / total
+
+
+def _add_qt_submodule(submodule, submodules):
+    """ Add a Qt submodule, and the submodules it requires, to a set of
+    submodules.
+    """
+
+    if submodule in submodules:
+        return
+
+    submodules.add(submodule)
+
+    for required in _QT_SUBMODULES[submodule][0]:
+        _add_qt_submodule(required, submodules)
+
+
+def _get_qt_module(qmake_name):
+    """ Return the 2-tuple of the CMake component name and submodule name for
+    the qmake name of a Qt module.
+    """
+
+    try:
+        return _QT_MODULES[qmake_name]
+    except KeyError:
+        raise UserException(
+                "the '{0}' Qt module is not supported by Qt v6".format(
+                        qmake_name))
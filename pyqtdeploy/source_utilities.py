@@ -0,0 +1,121 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import re
+
+from .user_exception import UserException
+
+
+# The regular expressions used to scan C and C++ source files.  These are
+# deliberately simple and err on the side of reporting too much.
+_COMMENT_RE = re.compile(r'/\*.*?\*/|//[^\n]*', re.DOTALL)
+_DIRECTIVE_RE = re.compile(r'^\s*#\s*(\w+)\s*(\w*)', re.MULTILINE)
+_DIRECTIVE_ARG_RE = re.compile(r'^\s*#\s*(\w+)\s*[<"]?([^>"\s]*)', re.MULTILINE)
+_STATIC_RE = re.compile(
+        r'^static\b[^;{(=]*?\b([A-Za-z_]\w*)\s*(?:\(|\[|=|;)', re.MULTILINE)
+_TAG_RE = re.compile(r'\b(?:struct|union|enum)\s+([A-Za-z_]\w*)\s*{')
+_TYPEDEF_RE = re.compile(
+        r'^typedef\b[^;{}]*?\b([A-Za-z_]\w*)\s*(?:\)\s*\([^;]*\))?'
+        r'(?:\[[^;]*\])?\s*;',
+        re.MULTILINE)
+_TYPEDEF_BODY_RE = re.compile(r'}\s*([A-Za-z_]\w*)\s*;')
+
+
+def _read_source(file_name):
+    """ Return the contents of a C or C++ source file with any comments
+    removed.
+    """
+
+    try:
+        with open(file_name, encoding='UTF-8', errors='replace') as f:
+            source = f.read()
+    except Exception as e:
+        raise UserException("unable to read source file {0}".format(file_name),
+                str(e))
+
+    return _COMMENT_RE.sub(' ', source)
+
+
+def get_file_scope_names(file_name):
+    """ Return the set of macro names, file scope static names, typedef names
+    and struct, union and enum tags defined in a C or C++ source file.  Two
+    files that define the same name cannot be compiled as part of the same
+    translation unit.
+    """
+
+    source = _read_source(file_name)
+
+    names = set()
+
+    for directive, name in _DIRECTIVE_RE.findall(source):
+        if directive == 'define' and name:
+            names.add(name)
+
+    names.update(_STATIC_RE.findall(source))
+    names.update(_TAG_RE.findall(source))
+    names.update(_TYPEDEF_RE.findall(source))
+    names.update(_TYPEDEF_BODY_RE.findall(source))
+
+    return names
+
+
+def has_preamble_defines(file_name):
+    """ Return True if a C or C++ source file defines or undefines any macros
+    before it includes Python.h (or, if it doesn't include Python.h, before it
+    includes its last header file).  Such a file relies on being the start of
+    a translation unit.
+    """
+
+    source = _read_source(file_name)
+
+    defined = False
+
+    for directive, header in _DIRECTIVE_ARG_RE.findall(source):
+        if directive in ('define', 'undef'):
+            defined = True
+        elif directive == 'include':
+            if header.split('/')[-1] == 'Python.h':
+                return defined
+
+            if defined:
+                return True
+
+    return False
+
+
+def has_undefs(file_name):
+    """ Return True if a C or C++ source file undefines any macros.  Such a
+    file may affect any file that follows it in the same translation unit.
+    """
+
+    source = _read_source(file_name)
+
+    for directive, _ in _DIRECTIVE_RE.findall(source):
+        if directive == 'undef':
+            return True
+
+    return False
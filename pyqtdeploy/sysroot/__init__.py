@@ -32,5 +32,6 @@ from .abstract_qt_component import AbstractQtComponent
 from .abstract_sip_component import AbstractSIPComponent
 from .component import Component
 from .component_option import ComponentOption
+from .concurrency import run_concurrently, split_jobs
 from .specification import SysrootSpecification
 from .sysroot import Sysroot
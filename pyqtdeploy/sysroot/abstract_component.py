@@ -43,6 +43,11 @@ class AbstractComponent(ABC):
     # The following make up the public API to be used by component plugins.
     ###########################################################################
 
+    # This is set if the component is independent of the other components
+    # that also set it so that they can all be installed concurrently after
+    # all other components have been installed.
+    install_concurrently = False
+
     # The list of components that, if specified, should be installed before
     # this one.
     preinstalls = []
@@ -285,6 +290,14 @@ class AbstractComponent(ABC):
 
         return install_path
 
+    def get_shared_host_install_dir(self, name, key):
+        """ Return the name of the directory containing a host installation
+        that is shared by all sysroots.  name is the name of the installation.
+        key is a sequence of strings that identifies its configuration.
+        """
+
+        return self._sysroot.get_shared_host_install_dir(name, key)
+
     def get_version_from_file(self, identifier, filename):
         """ Return the stripped line from a file containing an identifier
         (typically a pre-processor macro defining a version number).
@@ -326,6 +339,12 @@ class AbstractComponent(ABC):
 
         return self._sysroot.host_exe(name)
 
+    @property
+    def host_jobs(self):
+        """ The number of jobs that may be run in parallel on the host. """
+
+        return self._sysroot.host.platform.jobs
+
     @property
     def host_make(self):
         """ The name of the host make executable. """
@@ -342,6 +361,16 @@ class AbstractComponent(ABC):
     def install(self):
         """ Install the component. """
 
+    def install_shared_host(self, name, key, installer):
+        """ Ensure that a host installation shared by all sysroots is
+        installed and return the name of its directory.  installer is a
+        callable that is passed the name of the directory to install into if
+        there isn't already a complete installation.
+        """
+
+        return self._sysroot.install_shared_host(name, key, installer,
+                component=self)
+
     def open_file(self, name):
         """ Open an existing text file and return the file object. """
 
@@ -389,10 +418,13 @@ class AbstractComponent(ABC):
 
         self._sysroot.progress(message, component=self)
 
-    def run(self, *args, capture=False):
-        """ Run a command, optionally capturing stdout. """
+    def run(self, *args, capture=False, cached=False):
+        """ Run a command, optionally capturing stdout.  If cached is set
+        then the command is a probe of the host and any output saved in the
+        probe cache by an earlier invocation is used instead.
+        """
 
-        return self._sysroot.run(*args, capture=capture)
+        return self._sysroot.run(*args, capture=capture, cached=cached)
 
     def sdk_configure(self, platform_name):
         """ Perform any platform-specific SDK configuration. """
@@ -412,6 +444,15 @@ class AbstractComponent(ABC):
 
         return self._sysroot.sysroot_dir
 
+    def tailor_for_parts(self, parts):
+        """ Tailor the configuration of the component so that, where
+        possible, only what is needed by a number of parts is installed.
+        parts is a dict of the parts, keyed by name, required by the projects
+        being deployed.
+        """
+
+        pass
+
     @property
     def target_arch_name(self):
         """ The name of the target architecture. """
@@ -28,11 +28,56 @@ from abc import abstractmethod
 from html.parser import HTMLParser
 import os
 import shutil
+import subprocess
+import sys
 from urllib.error import HTTPError
 from urllib.request import urlopen
 
 from .abstract_component import AbstractComponent
 from .component_option import ComponentOption
+from .concurrency import in_child_process
+
+
+# The glob-style patterns of the files in a wheel that are never deployed.
+_WHEEL_EXCLUSIONS = (
+    '*.pyi',
+    '*/py.typed',
+    '*.dist-info/RECORD',
+    '*.dist-info/RECORD.jws',
+    '*.dist-info/RECORD.p7s',
+    'test/*',
+    'tests/*',
+    '*/test/*',
+    '*/tests/*',
+)
+
+# The suffixes of binary files in a wheel and the target platforms that use
+# them.
+_WHEEL_BINARY_PLATFORMS = {
+    '.dll': ('win', ),
+    '.dylib': ('ios', 'macos'),
+    '.pyd': ('win', ),
+    '.so': ('android', 'ios', 'linux', 'macos'),
+}
+
+# The size of the chunks used when extracting a file from a wheel.
+_WHEEL_CHUNK_SIZE = 256 * 1024
+
+# The script run by a separate interpreter to download a URL to stdout.  An
+# exit code of 2 means the URL was not found.
+_DOWNLOAD_SCRIPT = """import shutil, sys
+from urllib.error import HTTPError
+from urllib.request import urlopen
+try:
+    with urlopen(sys.argv[1]) as response:
+        shutil.copyfileobj(response, sys.stdout.buffer)
+except HTTPError as e:
+    print(e, file=sys.stderr)
+    sys.exit(2)
+except Exception as e:
+    print(e, file=sys.stderr)
+    sys.exit(1)
+"""
 
 
 class Component(AbstractComponent):
@@ -50,11 +95,12 @@ class Component(AbstractComponent):
     # Set if the 'install_from_source' option is supported.
     option_install_from_source = False
 
-    def get_archive(self):
+    def get_archive(self, download=True):
         """ Return the pathname of a local copy of a source archive.  The
         source directories specified by the --source-dir command line option
         are searched first.  If the archive was not found then it is downloaded
-        from the optional URL.
+        from the optional URL.  If download is not set then None is returned
+        rather than downloading the archive.
         """
 
         archive_name = self.get_archive_name()
@@ -73,6 +119,9 @@ class Component(AbstractComponent):
             self.verbose("found '{0}' in download cache".format(archive_name))
             return archive
 
+        if not download:
+            return None
+
         # Try and download the archive into the cache.
         urls = self.get_archive_urls()
         if urls:
@@ -84,13 +133,21 @@ class Component(AbstractComponent):
                 self.progress(
                         "downloading '{0}' from {1}".format(archive_name, url))
 
+                # Download to a temporary file so that a concurrent build
+                # never sees a partial archive.
+                partial = '{0}.{1}.part'.format(archive, os.getpid())
+
                 try:
-                    with urlopen(archive_url) as response, open(archive, 'wb') as f:
-                        shutil.copyfileobj(response, f)
+                    with open(partial, 'wb') as f:
+                        _download(archive_url, f)
+
+                    os.replace(partial, archive)
                 except HTTPError:
+                    self._remove_partial_download(partial)
                     self.verbose("'{0}' was not found".format(archive_url))
                     continue
                 except Exception as e:
+                    self._remove_partial_download(partial)
                     self.verbose(
                             "unable to download '{0}'".format(archive_url))
                     continue
@@ -127,8 +184,7 @@ class Component(AbstractComponent):
         self.verbose("reading '{0}'".format(url))
 
         try:
-            with urlopen(url) as response:
-                page = response.read().decode('utf-8')
+            page = _read_url(url).decode('utf-8')
         except Exception as e:
             self.error("unable to read '{0}'".format(url), detail=str(e))
 
@@ -197,17 +253,129 @@ class Component(AbstractComponent):
 
         return archive_root
 
-    def unpack_wheel(self, wheel_path):
+    def unpack_wheel(self, wheel_path, exclusions=()):
         """ Unpack a wheel in the target Python installation's site-packages
-        directory.
+        directory.  Files that will never be deployed are not extracted.
+        exclusions is an optional sequence of additional glob-style patterns
+        of files and directories (relative to site-packages) to exclude.  The
+        contents of each extracted file are verified against the wheel's
+        RECORD file as it is extracted.
         """
 
+        import base64
+        import csv
+        import fnmatch
+        import hashlib
+        import io
         import zipfile
 
-        self.progress("unpacking '{0}'".format(os.path.basename(wheel_path)))
+        wheel_name = os.path.basename(wheel_path)
+
+        self.progress("unpacking '{0}'".format(wheel_name))
+
+        # Get the patterns of the files to exclude.
+        patterns = list(_WHEEL_EXCLUSIONS)
+
+        for suffix, platforms in _WHEEL_BINARY_PLATFORMS.items():
+            if self.target_platform_name not in platforms:
+                patterns.append('*' + suffix)
 
-        with zipfile.ZipFile(wheel_path) as zf:
-            zf.extractall(self.get_component('Python').target_sitepackages_dir)
+        for exclusion in exclusions:
+            patterns.append(exclusion)
+            patterns.append(exclusion + '/*')
+
+        target_dir = self.get_component('Python').target_sitepackages_dir
+
+        try:
+            with zipfile.ZipFile(wheel_path) as zf:
+                # Read the hashes from the RECORD file.
+                record = {}
+
+                for name in zf.namelist():
+                    if fnmatch.fnmatch(name, '*.dist-info/RECORD'):
+                        with zf.open(name) as f:
+                            for row in csv.reader(
+                                    io.TextIOWrapper(f, encoding='utf-8')):
+                                if len(row) >= 2 and row[1]:
+                                    record[row[0]] = row[1]
+
+                        break
+                else:
+                    self.warning(
+                            "'{0}' does not contain a RECORD file so will not "
+                            "be verified".format(wheel_name))
+
+                nr_excluded = 0
+
+                for info in zf.infolist():
+                    name = info.filename
+
+                    if name.endswith('/'):
+                        continue
+
+                    if any(fnmatch.fnmatch(name, p) for p in patterns):
+                        nr_excluded += 1
+                        continue
+
+                    if os.path.isabs(name) or '..' in name.split('/'):
+                        self.error(
+                                "'{0}' contains the unsafe path '{1}'".format(
+                                        wheel_name, name))
+
+                    hasher = expected_digest = None
+
+                    if record:
+                        try:
+                            algorithm, expected_digest = record[name].split(
+                                    '=', maxsplit=1)
+                        except KeyError:
+                            self.error(
+                                    "'{0}' is not listed in the RECORD file "
+                                    "of '{1}'".format(name, wheel_name))
+                        except ValueError:
+                            self.error(
+                                    "the RECORD file of '{0}' has an invalid "
+                                    "hash for '{1}'".format(wheel_name, name))
+
+                        try:
+                            hasher = hashlib.new(algorithm)
+                        except ValueError:
+                            self.error(
+                                    "the RECORD file of '{0}' uses the "
+                                    "unsupported hash algorithm "
+                                    "'{1}'".format(wheel_name, algorithm))
+
+                    # Extract the file while calculating its hash.
+                    target = os.path.join(target_dir, *name.split('/'))
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+                    with zf.open(info) as src, open(target, 'wb') as dst:
+                        while True:
+                            chunk = src.read(_WHEEL_CHUNK_SIZE)
+                            if not chunk:
+                                break
+
+                            if hasher is not None:
+                                hasher.update(chunk)
+
+                            dst.write(chunk)
+
+                    if hasher is not None:
+                        digest = base64.urlsafe_b64encode(
+                                hasher.digest()).rstrip(b'=').decode('ascii')
+
+                        if digest != expected_digest:
+                            self.error(
+                                    "the hash of '{0}' does not match the "
+                                    "RECORD file of '{1}'".format(name,
+                                            wheel_name))
+        except (OSError, zipfile.BadZipFile) as e:
+            self.error("unable to unpack {0}".format(wheel_name),
+                    detail=str(e))
+
+        self.verbose(
+                "{0} files were excluded from '{1}'".format(nr_excluded,
+                        wheel_name))
 
     ###########################################################################
     # The following are not part of the public API used by component plugins.
@@ -238,6 +406,15 @@ class Component(AbstractComponent):
 
         return options
 
+    @staticmethod
+    def _remove_partial_download(partial):
+        """ Remove any partially downloaded file. """
+
+        try:
+            os.remove(partial)
+        except OSError:
+            pass
+
 
 class PyPIPageParser(HTMLParser):
     """ An HTML parser for extract a source archive name from a PyPI project
@@ -260,3 +437,45 @@ class PyPIPageParser(HTMLParser):
                 if name == 'href' and value.endswith(self._archive):
                     self.archive_url = value[:-len(self._archive)]
                     break
+
+
+def _download(url, f):
+    """ Download a URL to a file object opened in binary mode.  urlopen()
+    cannot be used safely in a child process created by fork() (it crashes on
+    macOS) so such a process uses a new interpreter to do the download.  An
+    HTTPError is raised if the URL was not found.
+    """
+
+    if not in_child_process():
+        with urlopen(url) as response:
+            shutil.copyfileobj(response, f)
+
+        return
+
+    result = subprocess.run([sys.executable, '-c', _DOWNLOAD_SCRIPT, url],
+            stdout=f, stderr=subprocess.PIPE)
+
+    if result.returncode != 0:
+        message = result.stderr.decode('utf-8', errors='replace').strip()
+
+        if result.returncode == 2:
+            raise HTTPError(url, None, message, None, None)
+
+        raise OSError(message)
+
+
+def _read_url(url):
+    """ Return the contents of a URL as bytes. """
+
+    if not in_child_process():
+        with urlopen(url) as response:
+            return response.read()
+
+    result = subprocess.run([sys.executable, '-c', _DOWNLOAD_SCRIPT, url],
+            capture_output=True)
+
+    if result.returncode != 0:
+        raise OSError(
+                result.stderr.decode('utf-8', errors='replace').strip())
+
+    return result.stdout
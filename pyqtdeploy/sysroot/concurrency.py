@@ -0,0 +1,141 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+import os
+import sys
+
+from ..user_exception import UserException
+
+
+# Set if the current process is a child created by run_concurrently().
+_in_child_process = False
+
+
+def in_child_process():
+    """ Return True if the current process is a child process created to run
+    a task.  Some system services (e.g. those used by urlopen() on macOS)
+    cannot be used safely in such a process.
+    """
+
+    return _in_child_process
+
+
+def run_concurrently(tasks, nr_workers, message_handler):
+    """ Run a sequence of tasks, each in a separate child process, with no
+    more than nr_workers running at the same time.  A task is a 2-tuple of a
+    name (used in error messages) and a callable that takes no arguments, or a
+    3-tuple that also includes the message handler used to report the task's
+    errors (message_handler is used otherwise).  A task reports its own errors
+    by raising a UserException.  If the platform does not support fork() then
+    the tasks are run sequentially in the current process.  In either case a
+    failed task does not stop the remaining tasks from being run and a
+    UserException naming the failed tasks is raised after all the tasks have
+    finished.
+    """
+
+    global _in_child_process
+
+    tasks = [(t[0], t[1], t[2] if len(t) > 2 else message_handler)
+            for t in tasks]
+    failed = []
+
+    if not hasattr(os, 'fork') or nr_workers <= 1 or len(tasks) <= 1:
+        for name, task, task_message_handler in tasks:
+            try:
+                task()
+            except UserException as e:
+                task_message_handler.exception(e)
+                failed.append(name)
+
+        _raise_if_failed(failed)
+
+        return
+
+    pending = list(tasks)
+    running = {}
+
+    while pending or running:
+        # Start as many tasks as the number of workers allows.
+        while pending and len(running) < nr_workers:
+            name, task, task_message_handler = pending.pop(0)
+
+            # Make sure buffered output isn't written twice.
+            sys.stdout.flush()
+            sys.stderr.flush()
+
+            pid = os.fork()
+
+            if pid == 0:
+                # This is the child.
+                _in_child_process = True
+
+                exit_code = 0
+
+                try:
+                    task()
+                except UserException as e:
+                    task_message_handler.exception(e)
+                    exit_code = 1
+                except BaseException as e:
+                    task_message_handler.error(
+                            "{0}: unexpected exception: {1}".format(name,
+                                    e))
+                    exit_code = 1
+
+                sys.stdout.flush()
+                sys.stderr.flush()
+
+                os._exit(exit_code)
+
+            running[pid] = name
+
+        # Wait for a task to finish.
+        pid, status = os.waitpid(-1, 0)
+
+        name = running.pop(pid, None)
+        if name is not None and status != 0:
+            failed.append(name)
+
+    _raise_if_failed(failed)
+
+
+def split_jobs(jobs, nr_tasks):
+    """ Split a budget of parallel jobs between a number of concurrent tasks
+    and return a 2-tuple of the number of concurrent workers and the number
+    of jobs each worker may use.
+    """
+
+    nr_workers = max(1, min(jobs, nr_tasks))
+
+    return nr_workers, max(1, jobs // nr_workers)
+
+
+def _raise_if_failed(failed):
+    """ Raise a UserException if any tasks failed. """
+
+    if failed:
+        raise UserException("{0} failed".format(', '.join(failed)))
@@ -29,6 +29,7 @@ import toml
 
 from ... import (AbstractPyQtComponent, ComponentOption, ExtensionModule,
         PythonModule, PythonPackage)
+from ...parts import Part
 
 
 # All the parts that can be provided by the component.
@@ -159,6 +160,9 @@ class PyQtComponent(AbstractPyQtComponent):
     # this one.
     preinstalls = ['Python', 'Qt', 'SIP']
 
+    # The names of the specified modules that are not needed by the projects.
+    _skipped_modules = ()
+
     def get_archive_name(self):
         """ Return the filename of the source archive. """
 
@@ -215,6 +219,22 @@ class PyQtComponent(AbstractPyQtComponent):
         if self._license_file is not None:
             self.copy_file(self._license_file, 'sip')
 
+        # Report the saving if the modules have been tailored to the projects.
+        if self._skipped_modules:
+            nr_sip_files = 0
+
+            for module in self._skipped_modules:
+                module_dir = os.path.join('sip', module)
+
+                if os.path.isdir(module_dir):
+                    nr_sip_files += len(
+                            [f for f in os.listdir(module_dir)
+                                    if f.endswith('.sip')])
+
+            self.progress(
+                    "skipping {0} .sip files that are only used by modules "
+                    "not needed by the projects".format(nr_sip_files))
+
         # Configure the project and bindings.
         project_config = {
             'confirm-license': True,
@@ -294,7 +314,8 @@ class PyQtComponent(AbstractPyQtComponent):
             '--qmake', self.get_component('Qt').host_qmake,
             '--no-distinfo',
             '--concatenate', '2',
-            '--no-docstrings'
+            '--no-docstrings',
+            '--jobs', str(self.host_jobs)
         ]
 
         if self.target_platform_name == 'android':
@@ -346,6 +367,54 @@ class PyQtComponent(AbstractPyQtComponent):
 
         return pyqt_platform
 
+    def tailor_for_parts(self, parts):
+        """ Reimplemented to only install the extension modules needed by the
+        parts and by any add-on components.
+        """
+
+        needed = set()
+
+        for part in parts.values():
+            if part.component_name == self.name:
+                if part.unscoped_name.startswith('PyQt6.'):
+                    needed.add(part.unscoped_name)
+
+        # The add-ons will be installed whether or not the projects use them.
+        needed.update(self._get_addon_modules())
+
+        # QtCore is always needed by the sip module and the add-ons.
+        needed.add('PyQt6.QtCore')
+
+        # Add the modules the needed modules depend on.
+        todo = list(needed)
+
+        while todo:
+            for dep in _ALL_PARTS[todo.pop()].deps:
+                if dep.startswith('PyQt6.') and dep not in needed:
+                    needed.add(dep)
+                    todo.append(dep)
+
+        installed_modules = [m for m in self.installed_modules
+                if 'PyQt6.' + m in needed]
+
+        self._skipped_modules = [m for m in self.installed_modules
+                if m not in installed_modules]
+
+        if self._skipped_modules:
+            self.installed_modules = installed_modules
+
+            # Make sure the provided parts reflect the modules.
+            self._parts = None
+
+            self.verbose(
+                    "the projects need the {0} modules".format(
+                            ', '.join(installed_modules)))
+
+        self.progress(
+                "building {0} of the {1} specified modules".format(
+                        len(installed_modules),
+                        len(installed_modules) + len(self._skipped_modules)))
+
     def verify(self):
         """ Verify the component. """
 
@@ -439,6 +508,28 @@ class PyQtComponent(AbstractPyQtComponent):
                     "PyQt-builder v{} or later is required".format(
                             min_pyqtbuild_version))
 
+    def _get_addon_modules(self):
+        """ Return the set of names of the extension modules needed by any
+        add-on components.
+        """
+
+        modules = set()
+
+        for component in self._sysroot.components:
+            if component is self or self.name not in component.preinstalls:
+                continue
+
+            # Use the normalised parts so that only those applicable to the
+            # target and version are considered.
+            for part in component.parts.values():
+                for dep in part.deps:
+                    component_name, name = Part.get_name_parts(dep)
+
+                    if component_name == self.name and name in _ALL_PARTS:
+                        modules.add(name)
+
+        return modules
+
     @staticmethod
     def _get_section(name, pyproject):
         """ Return a dict containing the named section from a pyproject.toml
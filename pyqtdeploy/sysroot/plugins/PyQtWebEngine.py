@@ -30,6 +30,9 @@ from ... import Component, ExtensionModule
 class PyQtWebEngineComponent(Component):
     """ The PyQtWebEngine component. """
 
+    # The component can be installed concurrently with other PyQt add-ons.
+    install_concurrently = True
+
     # The list of components that, if specified, should be installed before
     # this one.
     preinstalls = ['Python', 'PyQt', 'Qt', 'SIP']
@@ -28,6 +28,7 @@ PY_MAJOR_VERSION = @PY_MAJOR_VERSION@
 PY_MINOR_VERSION = @PY_MINOR_VERSION@
 PY_PATCH_VERSION = @PY_PATCH_VERSION@
 PY_DYNAMIC_LOADING = @PY_DYNAMIC_LOADING@
+PY_PRECOMPILED_HEADER = @PY_PRECOMPILED_HEADER@
 
 !defined(SYSROOT, var) {
     error("SYSROOT must be defined on the qmake command line")
@@ -420,3 +421,19 @@ SOURCES += $$OBJECT_SOURCES
 SOURCES += $$PYTHON_SOURCES
 SOURCES += $$MODULE_SOURCES
 SOURCES += $$MOD_SOURCES
+
+# Use a precompiled Python.h where the compiler supports it.  Sources that
+# define macros before including Python.h are excluded.
+equals(PY_PRECOMPILED_HEADER, "enabled") {
+    gcc|clang|msvc {
+        CONFIG += precompile_header
+        PRECOMPILED_HEADER = pyqtdeploy_pch.h
+        include(pyqtdeploy_no_pch.pri)
+
+        msvc {
+            CONFIG += precompile_header_c
+        }
+    }
+}
+
+@PY_BUILD_PROFILE@
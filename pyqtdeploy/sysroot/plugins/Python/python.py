@@ -30,6 +30,8 @@ import shutil
 import sys
 
 from .... import AbstractPythonComponent, ComponentOption, UserException
+from ....build_profiles import BUILD_PROFILES, get_build_profile_qmake
+from ....source_utilities import has_preamble_defines
 
 from .pyconfig import generate_pyconfig_h
 from .standard_library import standard_library
@@ -88,6 +90,12 @@ class PythonComponent(AbstractPythonComponent):
 
         options = super().get_options()
 
+        options.append(
+                ComponentOption('build_profile', values=BUILD_PROFILES,
+                        help="The build profile used when building the target "
+                                "Python from source. It should be the same as "
+                                "that used to build the application."))
+
         options.append(
                 ComponentOption('dynamic_loading', type=bool,
                         help="Set to enable support for the dynamic loading "
@@ -100,6 +108,13 @@ class PythonComponent(AbstractPythonComponent):
                         help="Install the host Python from a source package "
                                 "rather than an existing installation."))
 
+        options.append(
+                ComponentOption('precompiled_header', type=bool,
+                        default=False,
+                        help="Use a precompiled Python.h when building the "
+                                "target Python from source with a compiler "
+                                "that supports it."))
+
         return options
 
     def get_target_src_path(self, name):
@@ -116,8 +131,11 @@ class PythonComponent(AbstractPythonComponent):
 
         if self._host_python is None:
             if self.install_host_from_source:
-                self._host_python = os.path.join(self.host_dir, 'bin',
-                        self.host_exe(self._py_subdir))
+                self._host_python = os.path.join(
+                        self.get_shared_host_install_dir(
+                                self._host_install_name,
+                                self._host_install_key),
+                        'bin', self.host_exe(self._py_subdir))
             elif self.host_platform_name == 'win':
                 self._host_python = self.get_python_install_path(self.version.major, self.version.minor) + 'python.exe'
             else:
@@ -217,7 +235,8 @@ class PythonComponent(AbstractPythonComponent):
         else:
             # Check that the host installation is the right version.
             host_version_str = self.run(self.host_python, '-c',
-                    'import sys; print(sys.version.split()[0])', capture=True)
+                    'import sys; print(sys.version.split()[0])', capture=True,
+                    cached=True)
 
             host_version = self.parse_version_number(host_version_str)
 
@@ -323,6 +342,11 @@ class PythonComponent(AbstractPythonComponent):
 
             generate_pyconfig_h(pyconfig_h_dst_file, self)
 
+        # Generate the precompiled header and the list of sources that can't
+        # use it.
+        if self.precompiled_header:
+            self._generate_precompiled_header(py_src_dir)
+
         # Copy the python.pro file.
         python_pro_dst_file = os.path.join(py_src_dir, 'python.pro')
 
@@ -338,8 +362,45 @@ class PythonComponent(AbstractPythonComponent):
                         '@PY_MINOR_VERSION@': str(self.version.minor),
                         '@PY_PATCH_VERSION@': str(self.version.patch),
                         '@PY_DYNAMIC_LOADING@': 'enabled' if self.dynamic_loading else 'disabled',
+                        '@PY_PRECOMPILED_HEADER@': 'enabled' if self.precompiled_header else 'disabled',
+                        '@PY_BUILD_PROFILE@': get_build_profile_qmake(self.build_profile),
                         '@ANDROID_ABIS@': android_abis})
 
+    def _generate_precompiled_header(self, py_src_dir):
+        """ Generate the precompiled header and the qmake include file that
+        lists the sources that must not use it.
+        """
+
+        pch_h_dst_file = os.path.join(py_src_dir, 'pyqtdeploy_pch.h')
+
+        self.verbose("generating {0}".format(pch_h_dst_file))
+
+        with self.create_file(pch_h_dst_file) as f:
+            f.write('#include "Python.h"\n')
+
+        no_pch_dst_file = os.path.join(py_src_dir, 'pyqtdeploy_no_pch.pri')
+
+        self.verbose("generating {0}".format(no_pch_dst_file))
+
+        no_pch_sources = []
+
+        for subdir in ('Modules', 'Objects', 'Parser', 'PC', 'Python'):
+            for dirpath, _, filenames in os.walk(
+                    os.path.join(py_src_dir, subdir)):
+                for fname in filenames:
+                    if fname.endswith('.c'):
+                        src_path = os.path.join(dirpath, fname)
+
+                        if has_preamble_defines(src_path):
+                            no_pch_sources.append(
+                                    os.path.relpath(src_path,
+                                            py_src_dir).replace(os.sep, '/'))
+
+        with self.create_file(no_pch_dst_file) as f:
+            # Sort them for reproduceable output.
+            for src in sorted(no_pch_sources):
+                f.write('NO_PCH_SOURCES += {0}\n'.format(src))
+
     def _create_sysconfigdata(self):
         """ Create the _sysconfigdata module. """
 
@@ -368,15 +429,26 @@ build_time_vars = {
         scd.close()
 
     def _install_host_from_source(self):
-        """ Install the host Python from source. """
+        """ Install the host Python from source.  The installation is shared
+        by all sysroots so it is only built once for a particular version.
+        """
 
         self.building_for_target = False
 
+        self.install_shared_host(self._host_install_name,
+                self._host_install_key, self._build_host_python)
+
+        self.building_for_target = True
+
+    def _build_host_python(self, install_dir):
+        """ Build the host Python from source and install it in a directory.
+        """
+
         # Unpack the source.
         self.unpack_archive(self.get_archive())
 
-        self.run('./configure', '--prefix', self.host_dir,
-                '--with-ensurepip=no')
+        self.run('./configure', '--prefix', install_dir,
+                *self._HOST_CONFIGURE_OPTIONS)
 
         # For reasons not fully understood, the presence of this environment
         # variable breaks the build (probably only on macOS).
@@ -390,7 +462,22 @@ build_time_vars = {
         if launcher is not None:
             os.environ['__PYVENV_LAUNCHER__'] = launcher
 
-        self.building_for_target = True
+    # The options passed to configure when building the host Python.
+    _HOST_CONFIGURE_OPTIONS = ('--with-ensurepip=no', )
+
+    @property
+    def _host_install_key(self):
+        """ The key that identifies the configuration of the shared host
+        Python installation.
+        """
+
+        return ['Python', str(self.version)] + list(self._HOST_CONFIGURE_OPTIONS)
+
+    @property
+    def _host_install_name(self):
+        """ The name of the shared host Python installation. """
+
+        return 'python-{0}'.format(self.version)
 
     def _install_target_from_source(self):
         """ Install the target Python from source. """
@@ -419,6 +506,20 @@ build_time_vars = {
         self.run(self.host_make)
         self.run(self.host_make, 'install')
 
+        # Report the size of the library so that the effect of any build
+        # profile can be seen.
+        if self.target_platform_name == 'win':
+            lib_name = self.target_py_lib + '.lib'
+        else:
+            lib_name = 'lib' + self.target_py_lib + '.a'
+
+        lib_path = os.path.join(self.target_lib_dir, lib_name)
+
+        if os.path.isfile(lib_path):
+            self.progress(
+                    "{0} is {1} bytes".format(lib_path,
+                            os.path.getsize(lib_path)))
+
         # Create a platform-specific dummy _sysconfigdata module.  This allows
         # the sysconfig module to work.  If necessary we can populate it with
         # genuinely useful information if people ask for it.
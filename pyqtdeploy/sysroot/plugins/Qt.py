@@ -27,7 +27,9 @@
 import os
 import sys
 
-from ... import AbstractQtComponent, ComponentOption
+from ... import AbstractQtComponent, ComponentOption, ExtensionModule
+from ...qt_modules import (APPLICATION_QT_MODULES, get_qt_build_saving,
+        get_qt_submodules, get_qtbase_disabled_features)
 
 
 class QtComponent(AbstractQtComponent):
@@ -67,6 +69,11 @@ class QtComponent(AbstractQtComponent):
 
         options = super().get_options()
 
+        options.append(
+                ComponentOption('cmake_options', type=list,
+                        help="The additional options to be passed to 'cmake' "
+                                "when building Qt v6 from source."))
+
         options.append(
                 ComponentOption('configure_options', type=list,
                         help="The additional options to be passed to "
@@ -82,6 +89,12 @@ class QtComponent(AbstractQtComponent):
                         help="The Qt edition being used when building from "
                                 "source."))
 
+        options.append(
+                ComponentOption('host_qt_dir',
+                        help="The directory containing the host installation "
+                                "of Qt v6 used when cross-compiling Qt v6 from "
+                                "source."))
+
         options.append(
                 ComponentOption('ssl',
                         values=['openssl-linked', 'openssl-runtime',
@@ -98,6 +111,12 @@ class QtComponent(AbstractQtComponent):
                         help="Set if the MSVC runtime should be statically "
                                 "linked."))
 
+        options.append(
+                ComponentOption('submodules', type=list,
+                        help="The Qt submodules to build when building Qt v6 "
+                                "from source.  All submodules are built if "
+                                "this is not specified."))
+
         return options
 
     @property
@@ -163,6 +182,58 @@ class QtComponent(AbstractQtComponent):
                 del os.environ['MACOSX_DEPLOYMENT_TARGET']
                 delattr(self, '_macos_dep_target_set')
 
+    def tailor_for_parts(self, parts):
+        """ Reimplemented to only build the Qt submodules, and the optional
+        qtbase modules, needed by the parts.
+        """
+
+        if not self.install_from_source:
+            return
+
+        if self.version < 6:
+            self.warning(
+                    "only Qt v6 can be tailored to the needs of the projects")
+            return
+
+        qmake_names = set(APPLICATION_QT_MODULES)
+
+        for part in parts.values():
+            if isinstance(part, ExtensionModule) and part.qmake_qt is not None:
+                qmake_names.update(part.qmake_qt)
+
+        submodules = get_qt_submodules(qmake_names)
+
+        # Respect any submodules that have been explicitly specified.
+        if self.submodules:
+            submodules = sorted(set(submodules).union(self.submodules))
+
+        self.submodules = submodules
+
+        disabled_features = get_qtbase_disabled_features(qmake_names,
+                submodules)
+
+        if self.disabled_features:
+            self.disabled_features.extend(
+                    [f for f in disabled_features
+                            if f not in self.disabled_features])
+        else:
+            self.disabled_features = disabled_features
+
+        self.verbose(
+                "the projects need the {0} Qt modules".format(
+                        ', '.join(sorted(qmake_names))))
+
+        if disabled_features:
+            self.verbose(
+                    "disabling the {0} qtbase features".format(
+                            ', '.join(disabled_features)))
+
+        self.progress(
+                "building the {0} submodules will save an estimated {1:.0f}% "
+                "of the time taken to build all of Qt".format(
+                        ', '.join(submodules),
+                        get_qt_build_saving(submodules)))
+
     def verify(self):
         """ Verify the component. """
 
@@ -184,9 +255,21 @@ class QtComponent(AbstractQtComponent):
             self._openssl = None
 
         if self.install_from_source:
-            # We don't support cross-compiling Qt.
+            # We only support cross-compiling Qt v6 and then only with an
+            # existing host installation.
             if self.host_platform_name != self.target_platform_name:
-                self.error("cross compiling Qt is not supported")
+                if self.version < 6:
+                    self.error("cross compiling Qt v5 is not supported")
+
+                if not self.host_qt_dir:
+                    self.error(
+                            "the 'host_qt_dir' option must be specified when "
+                            "cross compiling Qt")
+
+                if not os.path.isdir(self.host_qt_dir):
+                    self.error(
+                            "the host Qt installation '{0}' does not "
+                            "exist".format(self.host_qt_dir))
 
             if not self.edition:
                 self.error(
@@ -230,7 +313,12 @@ class QtComponent(AbstractQtComponent):
             if self.android_api < 21:
                 self.error("Android API level 21 or greater is required")
 
-            if self.version >= (5, 13, 2) or (5, 12, 6) <= self.version <= (5, 13, 0):
+            if self.version >= 6:
+                if self.android_ndk_version < 22:
+                    self.error(
+                            "v{0} requires NDK r22 or later".format(
+                                    self.version))
+            elif self.version >= (5, 13, 2) or (5, 12, 6) <= self.version <= (5, 13, 0):
                 if self.android_ndk_version not in (20, 21):
                     self.error(
                             "v{0} requires NDK r20 or r21".format(
@@ -258,6 +346,102 @@ class QtComponent(AbstractQtComponent):
 
         self.unpack_archive(self.get_archive())
 
+        if self.version >= 6:
+            self._install_from_source_cmake()
+        else:
+            self._install_from_source_configure()
+
+    def _install_from_source_cmake(self):
+        """ Install Qt v6 from source using CMake and, if available, Ninja. """
+
+        target_qt_dir = os.path.join(self.sysroot_dir, 'Qt')
+
+        # Qt v6 should be built out-of-source.
+        source_dir = os.getcwd()
+        build_dir = os.path.abspath(os.path.join('..', 'qt-build'))
+        self.create_dir(build_dir, empty=True)
+
+        args = ['cmake', '-S', source_dir, '-B', build_dir]
+
+        if self.find_exe('ninja', required=False) is not None:
+            args.extend(['-G', 'Ninja'])
+
+        args.extend(['-DCMAKE_INSTALL_PREFIX=' + target_qt_dir,
+                '-DCMAKE_BUILD_TYPE=Release', '-DBUILD_SHARED_LIBS=OFF',
+                '-DQT_BUILD_EXAMPLES=OFF', '-DQT_BUILD_TESTS=OFF',
+                '-DCMAKE_PREFIX_PATH=' + self.sysroot_dir])
+
+        if self.edition == 'commercial':
+            args.append('-DQT_BUILD_COMMERCIAL=ON')
+
+        if sys.platform == 'win32' and self.static_msvc_runtime:
+            args.append('-DFEATURE_static_runtime=ON')
+
+        # Cross-compiling requires the host tools from an existing host
+        # installation.
+        if self.host_platform_name != self.target_platform_name:
+            args.append('-DQT_HOST_PATH=' + self.host_qt_dir)
+
+            if self.target_platform_name == 'android':
+                args.extend([
+                        '-DCMAKE_TOOLCHAIN_FILE=' + os.path.join(
+                                self.android_ndk_root, 'build', 'cmake',
+                                'android.toolchain.cmake'),
+                        '-DANDROID_ABI=' + self.android_abi,
+                        '-DANDROID_PLATFORM=android-{0}'.format(
+                                self.android_api),
+                        '-DANDROID_SDK_ROOT=' + os.environ['ANDROID_SDK_ROOT']])
+            elif self.target_platform_name == 'ios':
+                args.extend(['-DCMAKE_SYSTEM_NAME=iOS',
+                        '-DCMAKE_OSX_ARCHITECTURES=arm64'])
+
+        if self.ssl:
+            if self.ssl == 'securetransport':
+                args.append('-DINPUT_openssl=no')
+                args.append('-DFEATURE_securetransport=ON')
+
+            elif self.ssl == 'openssl-linked':
+                args.append('-DINPUT_openssl=linked')
+                args.append('-DOPENSSL_USE_STATIC_LIBS=ON')
+
+            elif self.ssl == 'openssl-runtime':
+                args.append('-DINPUT_openssl=runtime')
+
+        else:
+            args.append('-DINPUT_openssl=no')
+
+        if self.disabled_features:
+            for feature in self.disabled_features:
+                args.append('-DFEATURE_{0}=OFF'.format(feature))
+
+        # Only build the submodules that are needed.
+        if self.submodules:
+            args.append(
+                    '-DQT_BUILD_SUBMODULES=' + ';'.join(self.submodules))
+
+        skip = list(self.skip) if self.skip else []
+
+        if sys.platform == 'win32':
+            # These cause compilation failures (although maybe only with static
+            # builds).
+            skip.append('qtimageformats')
+
+        for module in skip:
+            args.append('-DBUILD_{0}=OFF'.format(module))
+
+        if self.cmake_options:
+            args.extend(self.cmake_options)
+
+        self.run(*args)
+
+        # Honour the sysroot's budget of parallel jobs.
+        self.run('cmake', '--build', build_dir, '--parallel',
+                str(self.host_jobs))
+        self.run('cmake', '--install', build_dir)
+
+    def _install_from_source_configure(self):
+        """ Install Qt v5 from source using configure and make. """
+
         if self.host_platform_name == 'win':
             configure = 'configure.bat'
 
@@ -350,7 +534,8 @@ class QtComponent(AbstractQtComponent):
         version.
         """
 
-        for line in self.run(self.host_qmake, '-query', capture=True).split():
+        for line in self.run(self.host_qmake, '-query', capture=True,
+                cached=True).split():
             parts = line.split(':')
             if len(parts) == 2 and parts[0] == 'QT_VERSION':
                 host_version = self.parse_version_number(parts[1])
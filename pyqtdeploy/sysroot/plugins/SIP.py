@@ -152,7 +152,8 @@ class SIPComponent(Component):
         """ Verify the component. """
 
         installed_version = self.parse_version_number(
-                self.run('sip-module', '--version', capture=True))
+                self.run('sip-module', '--version', capture=True,
+                        cached=True))
 
         if self.version is None:
             self.version = installed_version
@@ -24,12 +24,19 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 
-from ... import Component, ComponentOption, PythonPackage
+import os
+
+from ... import Component, ComponentOption, PythonPackage, UserException
+from ..wheel_requirements import (evaluate_marker, normalise_distribution_name,
+        WheelRequirements)
 
 
 class wheelPlugin(Component):
     """ The wheel plugin.  This is designed to create multiple components. """
 
+    # Wheels are independent of each other and can be unpacked concurrently.
+    install_concurrently = True
+
     # The list of components that, if specified, should be installed before
     # this one.
     preinstalls = ['Python']
@@ -37,15 +44,24 @@ class wheelPlugin(Component):
     # The dict of parts provided by the component.
     @property
     def provides(self):
+        deps = list(self.dependencies)
+
+        for dep in self._get_requirements()[0]:
+            if dep not in deps:
+                deps.append(dep)
+
         return {
             self.name:
-                PythonPackage(version=self.version, deps=self.dependencies,
+                PythonPackage(version=self.version, deps=deps,
                         exclusions=self.exclusions)
         }
 
     # The version will be extracted from the name of the wheel.
     version_is_optional = True
 
+    # The requirements read from the wheel's METADATA.
+    _requirements = None
+
     def get_archive_name(self):
         """ Return the filename of the wheel. """
 
@@ -88,11 +104,22 @@ class wheelPlugin(Component):
     def install(self):
         """ Install for the target. """
 
-        self.unpack_wheel(self.get_archive())
+        # The exclusions are relative to the package.
+        package_dir = self.name.replace('.', '/')
+
+        self.unpack_wheel(self.get_archive(),
+                exclusions=[package_dir + '/' + e for e in self.exclusions])
 
     def verify(self):
         """ Verify the component. """
 
+        # Warn about any requirements that will not be met.
+        for distribution in self._get_requirements()[1]:
+            self.warning(
+                    "the '{0}' requirement is not provided by a wheel "
+                    "component so any dependency must be specified using the "
+                    "'dependencies' option".format(distribution))
+
         wheel_version = self.parse_version_number(self.wheel.split('-')[1])
 
         if self.version is None:
@@ -101,3 +128,124 @@ class wheelPlugin(Component):
             self.error(
                     "v{0} is specified but the wheel is v{1}".format(
                             self.version, installed_version))
+
+    def _get_requirements(self):
+        """ Return a 2-tuple of the list of the names of the parts
+        corresponding to the requirements of the wheel that are provided by
+        other wheel components and the list of the names of the distributions
+        that are not.
+        """
+
+        if self._requirements is not None:
+            return self._requirements
+
+        deps = []
+        missing = []
+
+        # Only look for a local copy of the wheel as we may not be installing
+        # it.
+        cache = WheelRequirements.instance(
+                os.path.join(self.sysroot_dir, 'WheelRequirements.json'))
+
+        try:
+            result = cache.get_requirements(self.wheel,
+                    self.get_archive(download=False))
+        except UserException as e:
+            self.error(e.text, detail=e.detail)
+
+        if result is None:
+            self.verbose(
+                    "the requirements of '{0}' are not known".format(
+                            self.wheel))
+        else:
+            self._resolve_requirements(result[1], deps, missing)
+
+        # Only remember the result once it is complete.
+        self._requirements = (deps, missing)
+
+        return self._requirements
+
+    def _resolve_requirements(self, requirements, deps, missing):
+        """ Update the lists of the names of the parts and of the names of the
+        distributions that are not provided from a list of requirements.
+        """
+
+        # Map the distributions to the wheel components that provide them.
+        distributions = self._get_distributions()
+        environment = self._get_marker_environment()
+
+        for distribution, marker in requirements:
+            try:
+                if not evaluate_marker(marker, environment):
+                    continue
+            except ValueError as e:
+                self.error(
+                        "'{0}' has an invalid environment marker "
+                        "'{1}'".format(self.wheel, marker), detail=str(e))
+
+            component = distributions.get(distribution)
+
+            if component is None:
+                if distribution not in missing:
+                    missing.append(distribution)
+            elif component is not self:
+                dep = component.name + ':' + component.name
+
+                if dep not in deps:
+                    deps.append(dep)
+
+    def _get_distributions(self):
+        """ Return a dict of wheel components keyed by the normalised name of
+        the distribution they provide.
+        """
+
+        distributions = {}
+
+        for component in self._sysroot.components:
+            if isinstance(component, wheelPlugin):
+                distributions[normalise_distribution_name(
+                        component.project)] = component
+
+        return distributions
+
+    def _get_marker_environment(self):
+        """ Return the dict of values of the environment marker variables for
+        the target.
+        """
+
+        python_version = self.get_component('Python').version
+        platform_name = self.target_platform_name
+
+        # Python v3.13 introduced proper values for the mobile platforms.
+        if platform_name == 'android':
+            if python_version >= (3, 13):
+                sys_platform, platform_system = 'android', 'Android'
+            else:
+                sys_platform, platform_system = 'linux', 'Linux'
+        elif platform_name == 'ios':
+            if python_version >= (3, 13):
+                sys_platform, platform_system = 'ios', 'iOS'
+            else:
+                sys_platform, platform_system = 'darwin', 'Darwin'
+        elif platform_name == 'linux':
+            sys_platform, platform_system = 'linux', 'Linux'
+        elif platform_name == 'macos':
+            sys_platform, platform_system = 'darwin', 'Darwin'
+        else:
+            sys_platform, platform_system = 'win32', 'Windows'
+
+        full_version = '{0}.{1}.{2}'.format(python_version.major,
+                python_version.minor, python_version.patch)
+
+        return {
+            'extra': '',
+            'implementation_name': 'cpython',
+            'implementation_version': full_version,
+            'os_name': 'nt' if platform_name == 'win' else 'posix',
+            'platform_python_implementation': 'CPython',
+            'platform_system': platform_system,
+            'python_full_version': full_version,
+            'python_version': '{0}.{1}'.format(python_version.major,
+                    python_version.minor),
+            'sys_platform': sys_platform,
+        }
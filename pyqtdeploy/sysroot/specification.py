@@ -25,6 +25,7 @@
 
 
 from  collections import OrderedDict
+import copy
 import importlib
 import importlib.util
 import os
@@ -132,6 +133,10 @@ class SysrootSpecification:
         components = []
 
         for name, value in self._spec.items():
+            # The configuration is consumed as it is parsed so work on a copy
+            # as the specification may be used for several targets.
+            value = copy.deepcopy(value)
+
             # Ignore the component if it is disabled for this target.
             disabled_targets = value.get('disabled_targets')
             if disabled_targets is not None:
@@ -24,29 +24,41 @@
 # POSSIBILITY OF SUCH DAMAGE.
 
 
+from contextlib import contextmanager
+import hashlib
 import os
 import shutil
 import sys
+import time
 
 from ..file_utilities import (create_file as fu_create_file,
         open_file as fu_open_file)
+from ..message_handler import MessageHandler
+from ..parts import Part, PythonModule, PythonPackage
 from ..platforms import Platform
+from ..probe_cache import ProbeCache
 from ..user_exception import UserException
 from ..version_number import VersionNumber
 
+from .concurrency import in_child_process, run_concurrently, split_jobs
+
 
 class Sysroot:
     """ Encapsulate a target-specific system root directory. """
 
     def __init__(self, specification, host, target, sysroots_dir,
-            message_handler=None, python=None, qmake=None, build_dir=None):
-        """ Initialise the object. """
+            message_handler=None, python=None, qmake=None, build_dir=None,
+            reprobe=False):
+        """ Initialise the object.  If reprobe is set then the results of
+        probing the host saved by earlier invocations are ignored.
+        """
 
         self._specification = specification
         self.host = host
         self.target = target
         self._message_handler = message_handler
 
+        self.sysroots_dir = sysroots_dir
         self.sysroot_dir = os.path.join(sysroots_dir,
                 'sysroot-' + self.target.name)
 
@@ -56,6 +68,22 @@ class Sysroot:
             self._build_dir = os.path.join(self.sysroot_dir, 'build')
 
         self._building_for_target = True
+        self._checkpoint_manifest = True
+
+        # Shared host installations completed before this time are re-built if
+        # a complete re-install is being forced.  Note that sysroots are
+        # created before any are built concurrently.
+        self._force_before = None
+        self._created = time.time()
+
+        # The directories to search for local copies of source archives.
+        self.source_dirs = [
+                os.path.dirname(self._specification.specification_file)]
+
+        # Each sysroot has its own cache of the results of probing the host.
+        self._probe_cache = ProbeCache(
+                os.path.join(self.sysroot_dir, 'ProbeCache.json'),
+                reprobe=reprobe)
 
         self.components = specification.create_components_for_target(target,
                 self)
@@ -216,6 +244,37 @@ class Sysroot:
 
         return None
 
+    def get_project_parts(self, project):
+        """ Return a dict of the parts, keyed by name, provided by the sysroot
+        that are required by a project.  The dict includes the dependencies of
+        the parts and the core Python modules.
+        """
+
+        # Get all the parts provided by the sysroot.
+        available_parts = {}
+        for component in self.components:
+            available_parts.update(component.parts)
+
+        # Get the required parts.
+        parts = {}
+
+        # Always include the core Python modules and their dependencies.
+        python = self.get_component('Python')
+
+        for part_name, part in python.parts.items():
+            if isinstance(part, (PythonModule, PythonPackage)) and part.core:
+                self._add_project_part(part_name, parts, available_parts)
+
+        for part_name in project.parts:
+            self._add_project_part(part_name, parts, available_parts)
+
+        # Lazy loading is implemented by importlib.util.
+        if project.lazy_modules:
+            self._add_project_part('Python:importlib.util', parts,
+                    available_parts)
+
+        return parts
+
     @property
     def host_dir(self):
         """ The directory containing the host installations. """
@@ -227,16 +286,94 @@ class Sysroot:
 
         return self.host.platform.exe(name)
 
+    def get_shared_host_install_dir(self, name, key):
+        """ Return the name of the directory containing a host installation
+        that is shared by all sysroots.  name is the name of the installation
+        (typically including a version number).  key is a sequence of strings
+        that identifies the configuration of the installation.
+        """
+
+        key_str = '\n'.join([self.host.name] + list(key))
+        digest = hashlib.sha256(key_str.encode('utf-8')).hexdigest()[:16]
+
+        return os.path.join(self.shared_host_dir,
+                '{0}-{1}'.format(name, digest))
+
+    def install_shared_host(self, name, key, installer, component=None):
+        """ Ensure that a host installation shared by all sysroots is
+        installed and return the name of its directory.  name and key are as
+        for get_shared_host_install_dir().  installer is a callable that is
+        passed the name of the directory to install into.  It is only called if
+        there isn't already a complete installation or if a complete
+        re-install is being forced and the installation wasn't completed by
+        this invocation of pyqtdeploy-sysroot.  A link to the installation is
+        created in the sysroot's host directory.
+        """
+
+        install_dir = self.get_shared_host_install_dir(name, key)
+        marker = os.path.join(install_dir, '.pyqtdeploy-installed')
+
+        os.makedirs(self.shared_host_dir, exist_ok=True)
+
+        # Other sysroots may be being built concurrently.
+        with self._lock_file(install_dir + '.lock'):
+            if os.path.isfile(marker) and not self._is_forced(marker):
+                self.verbose(
+                        "using the shared host installation in {0}".format(
+                                install_dir),
+                        component=component)
+            else:
+                # Remove anything left by a failed installation.
+                self.delete_dir(install_dir, component=component)
+
+                installer(install_dir)
+
+                with self.create_file(marker, component=component) as mf:
+                    mf.write('\n'.join(key) + '\n')
+
+        # Make the installation visible from the sysroot.
+        link = os.path.join(self.host_dir, name)
+
+        if hasattr(os, 'symlink'):
+            os.makedirs(self.host_dir, exist_ok=True)
+
+            if os.path.islink(link):
+                os.remove(link)
+
+            if not os.path.exists(link):
+                os.symlink(install_dir, link)
+
+        return install_dir
+
     def install_components(self, component_names, source_dirs, no_clean,
-            force):
+            force, projects=None):
         """ Install a sequence of components.  If no names are given then
-        use the Manifest file to determine what needs to be installed.  Raise a
-        UserException if there is an error.
+        use the Manifest file to determine what needs to be installed.  If a
+        sequence of projects is given then the components are tailored to
+        provide only what those projects need.  Raise a UserException if there
+        is an error.
         """
 
+        # Normalise the list of source directories to search.  This is done
+        # first as components may look for files when being verified.
+        if source_dirs:
+            self.source_dirs = [os.path.abspath(s) for s in source_dirs]
+
         # Verify the configuration.
         self.verify()
 
+        if force:
+            self._force_before = self._created
+
+        # Tailor the components to the projects.
+        if projects:
+            parts = {}
+            for project in projects:
+                parts.update(self.get_project_parts(project))
+
+            for component in self.components:
+                component.tailor_for_parts(parts)
+
         # Get the name of the components to install.
         if component_names:
             components = self._components_from_names(component_names)
@@ -270,13 +407,6 @@ class Sysroot:
             except Exception as e:
                 raise UserException("invalid 'Manifest' file", detail=str(e))
 
-        # Normalise the list of source directories to search.
-        if source_dirs:
-            self.source_dirs = [os.path.abspath(s) for s in source_dirs]
-        else:
-            self.source_dirs = [
-                    os.path.dirname(self._specification.specification_file)]
-
         self.target.configure()
 
         self.create_dir(self.sysroot_dir, empty=force)
@@ -290,12 +420,18 @@ class Sysroot:
         self.create_dir(self._build_dir, empty=True)
         cwd = os.getcwd()
 
-        # Install the components.
+        # Install the components.  Those that can be installed concurrently
+        # are done last.
         self.building_for_target = True
 
         for component in components:
-            component.ensure_installed(self._build_dir, all_components,
-                    manifest)
+            if not component.install_concurrently:
+                component.ensure_installed(self._build_dir, all_components,
+                        manifest)
+
+        self._install_concurrently(
+                [c for c in components if c.install_concurrently],
+                all_components, manifest)
 
         # Remove the build directory if requested.
         os.chdir(cwd)
@@ -308,6 +444,14 @@ class Sysroot:
             except UserException as e:
                 self.warning(e.text)
 
+    @property
+    def shared_host_dir(self):
+        """ The directory containing the host installations shared by all
+        sysroots.
+        """
+
+        return os.path.join(self.sysroots_dir, 'host-tools')
+
     def open_file(self, name, component=None):
         """ Open an existing text file and return the file object. """
 
@@ -323,12 +467,15 @@ class Sysroot:
         self._message_handler.progress_message(
                 self._format_message(message, component))
 
-    def run(self, *args, capture=False):
-        """ Run a command, optionally capturing stdout. """
+    def run(self, *args, capture=False, cached=False):
+        """ Run a command, optionally capturing stdout and using any output
+        saved in the probe cache.
+        """
 
         assert self._message_handler is not None
         return Platform.run(*args, message_handler=self._message_handler,
-                capture=capture)
+                capture=capture,
+                probe_cache=self._probe_cache if cached else None)
 
     def show_options(self, component_names):
         """ Show the options for a sequence of components.  If no names are
@@ -376,7 +523,8 @@ class Sysroot:
 
         self.progress(
                 "verifying target architecture '{0}'".format(self.target.name))
-        self.target.verify_as_target(self._message_handler)
+        self.target.verify_as_target(self._message_handler,
+                self._probe_cache)
 
         # Verify the components.
         for component in self.components:
@@ -405,10 +553,147 @@ class Sysroot:
     def write_manifest(self, manifest):
         """ Write the manifest file. """
 
+        if not self._checkpoint_manifest:
+            return
+
         with self.create_file(self._manifest_file) as mf:
             for name in sorted(manifest.keys()):
                 mf.write('{} {}\n'.format(name, manifest[name]))
 
+    def _add_project_part(self, part_name, parts, available_parts):
+        """ Make sure a part is in the dict of all parts. """
+
+        # See if it has already been done.
+        if part_name in parts:
+            return
+
+        # Make sure any parent parts exist.
+        if '.' in part_name:
+            # Find the scoped name of the parent part.
+            unscoped_name = Part.get_unscoped_name(part_name)
+            unscoped_parent_name = '.'.join(unscoped_name.split('.')[:-1])
+
+            for component in self.components:
+                parent_name = Part.get_name(component.name,
+                        unscoped_parent_name)
+
+                if parent_name in component.parts:
+                    break
+            else:
+                # Ignore parts whose parent is not provided.
+                return
+
+            self._add_project_part(parent_name, parts, available_parts)
+
+        # Ignore parts that aren't provided by the sysroot (we assume the
+        # application will handle that).
+        part = available_parts.get(part_name)
+        if part is None:
+            return
+
+        # For Android check the API level.
+        if self.target.platform.name == 'android' and part.min_android_api is not None and part.min_android_api > self.target.platform.android_api:
+            return
+
+        parts[part_name] = part
+
+        # Now handle the dependencies.
+        for dep in part.deps:
+            self._add_project_part(dep, parts, available_parts)
+
+        for dep in part.hidden_deps:
+            self._add_project_part(dep, parts, available_parts)
+
+    def _install_concurrently(self, components, all_components, manifest):
+        """ Install a sequence of independent components concurrently, each
+        with its own build directory and log file.
+        """
+
+        # Ignore those that have already been installed (possibly as a
+        # preinstall of another component).
+        components = [c for c in components if c.name not in manifest]
+
+        # A component that must be installed after another one being installed
+        # concurrently is installed afterwards.
+        names = [c.name for c in components]
+        deferred = [c for c in components
+                if any(p in names for p in c.preinstalls)]
+        components = [c for c in components if c not in deferred]
+
+        if components:
+            # Share the jobs between the components.  This is a bit of a hack
+            # as platforms are singletons.
+            platform = self.host.platform
+            jobs = platform.jobs
+            nr_workers, platform.jobs = split_jobs(jobs, len(components))
+
+            tasks = []
+
+            for component in components:
+                build_dir = os.path.join(self._build_dir, component.name)
+                self.create_dir(build_dir, empty=True)
+
+                tasks.append((component.name,
+                        self._install_concurrently_task(component, build_dir,
+                                all_components, manifest)))
+
+            try:
+                run_concurrently(tasks, nr_workers, self._message_handler)
+            finally:
+                platform.jobs = jobs
+
+                # Update the manifest with those that were successfully
+                # installed by child processes.
+                for component in components:
+                    if os.path.isfile(self._installed_marker(component)):
+                        manifest[component.name] = component.version
+
+                self.write_manifest(manifest)
+
+        for component in deferred:
+            component.ensure_installed(self._build_dir, all_components,
+                    manifest)
+
+    def _install_concurrently_task(self, component, build_dir, all_components,
+            manifest):
+        """ Return a callable that will install a component with its own log
+        file.
+        """
+
+        def task():
+            log_name = os.path.join(build_dir, 'install.log')
+            message_handler = self._message_handler
+
+            self.progress(
+                    "logging the installation to '{0}'".format(
+                            log_name),
+                    component=component)
+
+            with open(log_name, 'w') as log:
+                # The manifest is checkpointed by the parent process.
+                self._message_handler = _LogMessageHandler(message_handler,
+                        log)
+                self._checkpoint_manifest = False
+
+                try:
+                    component.ensure_installed(build_dir, all_components,
+                            manifest)
+                finally:
+                    self._message_handler = message_handler
+                    self._checkpoint_manifest = True
+
+            with open(self._installed_marker(component), 'w'):
+                pass
+
+        return task
+
+    def _installed_marker(self, component):
+        """ Return the name of the file that marks a component as having been
+        installed concurrently.
+        """
+
+        return os.path.join(self._build_dir, component.name, 'Installed')
+
     def _components_from_names(self, component_names):
         """ Return a sequence of components from a sequence of names. """
 
@@ -424,6 +709,36 @@ class Sysroot:
 
         return components
 
+    def _is_forced(self, marker):
+        """ Return True if a shared host installation must be re-built because
+        a complete re-install is being forced.
+        """
+
+        if self._force_before is None:
+            return False
+
+        return os.path.getmtime(marker) < self._force_before
+
+    @staticmethod
+    @contextmanager
+    def _lock_file(name):
+        """ A context manager that holds an exclusive lock on a file. """
+
+        try:
+            import fcntl
+        except ImportError:
+            # Concurrent builds are not supported without fcntl.
+            yield
+            return
+
+        with open(name, 'w') as lf:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(lf, fcntl.LOCK_UN)
+
     @staticmethod
     def _format_message(message, component):
         """ Return a formatted message. """
@@ -440,3 +755,58 @@ class Sysroot:
         """ The full pathname of the Manifest file. """
 
         return os.path.join(self.sysroot_dir, 'Manifest')
+
+
+class _LogMessageHandler(MessageHandler):
+    """ A message handler that writes verbose messages (including the output
+    of any commands that are run) to a log file and passes all other messages
+    to another message handler.  Verbose messages are also passed on if they
+    are enabled and the installation is not being run concurrently with
+    others.
+    """
+
+    def __init__(self, message_handler, log):
+        """ Initialise the object. """
+
+        super().__init__(message_handler.quiet, message_handler.verbose)
+
+        self._message_handler = message_handler
+        self._log = log
+
+    def exception(self, e):
+        """ Reimplemented to pass the exception on. """
+
+        self._message_handler.exception(e)
+
+    def message(self, message):
+        """ Reimplemented to pass the message on. """
+
+        self._message_handler.message(message)
+
+    def progress_message(self, message):
+        """ Reimplemented to also write the message to the log. """
+
+        self._write(message)
+        self._message_handler.progress_message(message)
+
+    def verbose_message(self, message):
+        """ Reimplemented to write the message to the log and to pass it on
+        unless the output of concurrent installations would be interleaved.
+        """
+
+        self._write(message)
+
+        if self._message_handler.verbose and not in_child_process():
+            self._message_handler.verbose_message(message)
+
+    def warning(self, message):
+        """ Reimplemented to also write the message to the log. """
+
+        self._write("WARNING: " + message)
+        self._message_handler.warning(message)
+
+    def _write(self, message):
+        """ Write a message to the log. """
+
+        self._log.write(message + '\n')
+        self._log.flush()
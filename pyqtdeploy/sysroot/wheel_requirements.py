@@ -0,0 +1,441 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+# 
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+# 
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+# 
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+
+from email.parser import HeaderParser
+import hashlib
+import json
+import os
+import re
+import zipfile
+
+from ..user_exception import UserException
+
+
+class WheelRequirements:
+    """ The WheelRequirements class is a persistent cache of the requirements
+    read from the METADATA of wheels.  The requirements of a wheel are keyed
+    by the SHA256 hash of the wheel so that they are only read once.  The
+    target-specific environment markers of each requirement are saved so that
+    the cache can be shared by all targets.
+    """
+
+    # The version of the format of the cache file.
+    _FORMAT = 1
+
+    # The caches that have been loaded, keyed by the name of the cache file.
+    _caches = {}
+
+    def __init__(self, file_name):
+        """ Initialise the object.  file_name is the name of the file the
+        cache is stored in.
+        """
+
+        self._file_name = file_name
+        self._wheels = {}
+        self._hashes = {}
+
+        try:
+            with open(file_name) as f:
+                cache = json.load(f)
+
+            if cache.get('format') == self._FORMAT:
+                self._wheels = cache.get('wheels', {})
+                self._hashes = cache.get('hashes', {})
+        except (OSError, ValueError, AttributeError):
+            # A missing or corrupt cache is ignored.
+            pass
+
+    @classmethod
+    def instance(cls, file_name):
+        """ Return the cache stored in a file. """
+
+        cache = cls._caches.get(file_name)
+
+        if cache is None:
+            cache = cls._caches[file_name] = cls(file_name)
+
+        return cache
+
+    def get_requirements(self, wheel_name, wheel_path):
+        """ Return a 2-tuple of the normalised distribution name and a list of
+        2-tuples of the normalised distribution name and the environment
+        marker (which may be an empty string) of each requirement of a wheel.
+        wheel_path is the pathname of a local copy of the wheel and may be
+        None in which case any result cached for a wheel with the same name is
+        used.  None is returned if the requirements are not known.  A
+        UserException is raised if there was an error reading the wheel.
+        """
+
+        if wheel_path is None:
+            sha256 = self._hashes.get(wheel_name)
+        else:
+            sha256 = self._get_sha256(wheel_path)
+
+        if sha256 is None:
+            return None
+
+        result = self._wheels.get(sha256)
+
+        if result is None:
+            if wheel_path is None:
+                return None
+
+            result = self._wheels[sha256] = read_requirements(wheel_path)
+            self._hashes[wheel_name] = sha256
+            self._save()
+        elif self._hashes.get(wheel_name) != sha256:
+            self._hashes[wheel_name] = sha256
+            self._save()
+
+        distribution, requirements = result
+
+        return distribution, [tuple(r) for r in requirements]
+
+    def _get_sha256(self, wheel_path):
+        """ Return the SHA256 hash of a wheel. """
+
+        hasher = hashlib.sha256()
+
+        with open(wheel_path, 'rb') as f:
+            while True:
+                chunk = f.read(256 * 1024)
+                if not chunk:
+                    break
+
+                hasher.update(chunk)
+
+        return hasher.hexdigest()
+
+    def _save(self):
+        """ Write the cache file. """
+
+        # Don't create the directory containing the cache, i.e. the sysroot,
+        # as a side effect.
+        if not os.path.isdir(os.path.dirname(self._file_name)):
+            return
+
+        # Write the file atomically as other processes may be reading it.
+        temp_name = '{0}.{1}.tmp'.format(self._file_name, os.getpid())
+
+        try:
+            with open(temp_name, 'w') as f:
+                json.dump(
+                        {
+                            'format': self._FORMAT,
+                            'wheels': self._wheels,
+                            'hashes': self._hashes
+                        },
+                        f, indent=1)
+
+            os.replace(temp_name, self._file_name)
+        except OSError:
+            # The cache is an optimisation so failing to save it is ignored.
+            try:
+                os.remove(temp_name)
+            except OSError:
+                pass
+
+
+def evaluate_marker(marker, environment):
+    """ Return True if an environment marker (as defined by PEP 508) is
+    satisfied by an environment, i.e. a dict of marker variable values.  An
+    empty marker is always satisfied.  A ValueError is raised if the marker is
+    invalid.
+    """
+
+    if not marker:
+        return True
+
+    tokens = _tokenise_marker(marker)
+    result = _evaluate_or(tokens, environment)
+
+    if tokens:
+        raise ValueError("unexpected '{0}'".format(tokens[0][1]))
+
+    return result
+
+
+def normalise_distribution_name(name):
+    """ Return the normalised form (as defined by PEP 503) of a distribution
+    name.
+    """
+
+    return re.sub(r'[-_.]+', '-', name).lower()
+
+
+def read_requirements(wheel_path):
+    """ Return a 2-tuple of the normalised distribution name and a list of
+    2-tuples of the normalised distribution name and the environment marker of
+    each requirement read from the METADATA of a wheel.
+    """
+
+    wheel_name = os.path.basename(wheel_path)
+
+    try:
+        with zipfile.ZipFile(wheel_path) as zf:
+            for name in zf.namelist():
+                dist_info, _, file_name = name.partition('/')
+
+                if dist_info.endswith('.dist-info') and file_name == 'METADATA':
+                    metadata = zf.read(name).decode('utf-8')
+                    break
+            else:
+                raise UserException(
+                        "'{0}' does not contain a METADATA file".format(
+                                wheel_name))
+    except (OSError, zipfile.BadZipFile, UnicodeDecodeError) as e:
+        raise UserException("unable to read '{0}'".format(wheel_name),
+                str(e))
+
+    headers = HeaderParser().parsestr(metadata)
+
+    distribution = headers.get('Name')
+    if distribution is None:
+        raise UserException(
+                "the METADATA file of '{0}' does not specify a name".format(
+                        wheel_name))
+
+    requirements = []
+
+    for requirement in headers.get_all('Requires-Dist', []):
+        name_marker = requirement.split(';', maxsplit=1)
+
+        name_match = _DISTRIBUTION_NAME.match(name_marker[0].strip())
+        if name_match is None:
+            raise UserException(
+                    "the METADATA file of '{0}' has an invalid requirement "
+                    "'{1}'".format(wheel_name, requirement))
+
+        marker = name_marker[1].strip() if len(name_marker) == 2 else ''
+
+        requirements.append(
+                (normalise_distribution_name(name_match.group()), marker))
+
+    return normalise_distribution_name(distribution), requirements
+
+
+# The regular expression that matches the start of a distribution name.
+_DISTRIBUTION_NAME = re.compile(r'[A-Za-z0-9]([A-Za-z0-9._-]*[A-Za-z0-9])?')
+
+# The regular expression that matches a marker token.
+_MARKER_TOKEN = re.compile(
+        r'''\s*(?:(?P<paren>[()])|'(?P<sq>[^']*)'|"(?P<dq>[^"]*)"|'''
+        r'''(?P<op>===|==|!=|<=|>=|~=|<|>|not\s+in\b|in\b)|'''
+        r'''(?P<name>[A-Za-z_][A-Za-z0-9_.]*))''')
+
+# The marker variables whose values are compared as versions.
+_VERSION_VARIABLES = ('implementation_version', 'platform_release',
+        'python_full_version', 'python_version')
+
+
+def _tokenise_marker(marker):
+    """ Return the list of 2-tuples of the type and value of each token of a
+    marker.
+    """
+
+    tokens = []
+    pos = 0
+    marker = marker.rstrip()
+
+    while pos < len(marker):
+        match = _MARKER_TOKEN.match(marker, pos)
+        if match is None:
+            raise ValueError("invalid marker '{0}'".format(marker))
+
+        kind = match.lastgroup
+        value = match.group(kind)
+
+        if kind in ('sq', 'dq'):
+            kind = 'string'
+        elif kind == 'op':
+            value = ' '.join(value.split())
+        elif kind == 'name' and value in ('and', 'or'):
+            kind = value
+
+        tokens.append((kind, value))
+        pos = match.end()
+
+    return tokens
+
+
+def _evaluate_or(tokens, environment):
+    """ Evaluate an 'or' expression. """
+
+    result = _evaluate_and(tokens, environment)
+
+    while tokens and tokens[0][0] == 'or':
+        tokens.pop(0)
+
+        # Note that both sides are always evaluated so that all the tokens are
+        # consumed.
+        result = _evaluate_and(tokens, environment) or result
+
+    return result
+
+
+def _evaluate_and(tokens, environment):
+    """ Evaluate an 'and' expression. """
+
+    result = _evaluate_atom(tokens, environment)
+
+    while tokens and tokens[0][0] == 'and':
+        tokens.pop(0)
+        result = _evaluate_atom(tokens, environment) and result
+
+    return result
+
+
+def _evaluate_atom(tokens, environment):
+    """ Evaluate a parenthesised expression or a comparison. """
+
+    if not tokens:
+        raise ValueError("unexpected end of marker")
+
+    if tokens[0] == ('paren', '('):
+        tokens.pop(0)
+        result = _evaluate_or(tokens, environment)
+
+        if not tokens or tokens.pop(0) != ('paren', ')'):
+            raise ValueError("missing ')'")
+
+        return result
+
+    lhs_name, lhs = _evaluate_value(tokens, environment)
+
+    if not tokens or tokens[0][0] != 'op':
+        raise ValueError("missing operator")
+
+    op = tokens.pop(0)[1]
+
+    rhs_name, rhs = _evaluate_value(tokens, environment)
+
+    # Compare as versions if a version variable is involved.
+    if op not in ('in', 'not in', '==='):
+        if lhs_name in _VERSION_VARIABLES or rhs_name in _VERSION_VARIABLES:
+            return _compare_versions(lhs, op, rhs)
+
+    if lhs_name == 'extra' or rhs_name == 'extra':
+        lhs = normalise_distribution_name(lhs)
+        rhs = normalise_distribution_name(rhs)
+
+    if op == 'in':
+        return lhs in rhs
+
+    if op == 'not in':
+        return lhs not in rhs
+
+    if op in ('==', '==='):
+        return lhs == rhs
+
+    if op == '!=':
+        return lhs != rhs
+
+    # Ordered comparisons of strings that aren't versions are undefined so
+    # treat them as not satisfied.
+    return False
+
+
+def _evaluate_value(tokens, environment):
+    """ Return a 2-tuple of the variable name (or None if it is a literal)
+    and the value of a marker value.
+    """
+
+    if not tokens:
+        raise ValueError("unexpected end of marker")
+
+    kind, value = tokens.pop(0)
+
+    if kind == 'string':
+        return None, value
+
+    if kind == 'name':
+        # Unknown variables (and those we don't know the target-specific value
+        # of) are treated as empty strings.
+        return value, environment.get(value, '')
+
+    raise ValueError("unexpected '{0}'".format(value))
+
+
+def _compare_versions(lhs, op, rhs):
+    """ Compare two version strings. """
+
+    # Handle prefix matching.
+    if op in ('==', '!=') and rhs.endswith('.*'):
+        prefix = _version_tuple(rhs[:-2])
+        matches = (_version_tuple(lhs)[:len(prefix)] == prefix)
+
+        return matches if op == '==' else not matches
+
+    lhs = _version_tuple(lhs)
+    rhs_tuple = _version_tuple(rhs)
+
+    if op == '~=':
+        prefix = rhs_tuple[:-1]
+
+        return lhs >= rhs_tuple and lhs[:len(prefix)] == prefix
+
+    # Pad the versions so that, for example, 3.8 == 3.8.0.
+    length = max(len(lhs), len(rhs_tuple))
+    lhs = lhs + (0, ) * (length - len(lhs))
+    rhs_tuple = rhs_tuple + (0, ) * (length - len(rhs_tuple))
+
+    if op == '==':
+        return lhs == rhs_tuple
+
+    if op == '!=':
+        return lhs != rhs_tuple
+
+    if op == '<':
+        return lhs < rhs_tuple
+
+    if op == '<=':
+        return lhs <= rhs_tuple
+
+    if op == '>':
+        return lhs > rhs_tuple
+
+    return lhs >= rhs_tuple
+
+
+def _version_tuple(version):
+    """ Return a tuple of the leading numeric components of a version string.
+    """
+
+    components = []
+
+    for component in version.split('.'):
+        match = re.match(r'\d+', component)
+        if match is None:
+            break
+
+        components.append(int(match.group()))
+
+        # Stop at something like '0rc1'.
+        if match.end() != len(component):
+            break
+
+    return tuple(components)
@@ -60,6 +60,7 @@ setup(
         entry_points={
             'console_scripts': [
                 'pyqtdeploy-build = pyqtdeploy.pyqtdeploybuild_main:main',
+                'pyqtdeploy-emulate = pyqtdeploy.pyqtdeployemulate_main:main',
                 'pyqtdeploy-sysroot = pyqtdeploy.pyqtdeploysysroot_main:main'],
             'gui_scripts': [
                 'pyqtdeploy = pyqtdeploy.pyqtdeploy_main:main']
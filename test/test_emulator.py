@@ -0,0 +1,246 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import marshal
+import os
+import struct
+import sys
+import tempfile
+import unittest
+import zlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyqtdeploy.emulator import Emulator, Resources
+from pyqtdeploy.module_index import (create_module_index, read_module_index,
+        write_module_index)
+from pyqtdeploy.user_exception import UserException
+
+
+# The name of the package imported from the resources.  It must not be the
+# name of any installed package.
+_PACKAGE = 'pdy_emulator_test'
+
+
+class ModuleIndexTests(unittest.TestCase):
+    """ Test the creation, writing and reading of the module index. """
+
+    def test_create(self):
+        """ Test the module types in a created index. """
+
+        index = create_module_index(['a/__init__.pyo', 'a/b.pyo', 'c/d.pyo',
+                'e.pyo', 'e/__init__.pyo'], adjacent_extension_modules=['f'])
+
+        self.assertEqual(index, {
+            'a': ('ModuleIsPackage', False),
+            'a.b': ('ModuleIsModule', False),
+            'c': ('ModuleIsNamespace', False),
+            'c.d': ('ModuleIsModule', False),
+            'e': ('ModuleIsModule', False),
+            'f': ('ModuleIsAdjacentExtensionModule', False),
+        })
+
+    def test_lazy(self):
+        """ Test that only the modules and packages covered by a lazy module
+        are loaded lazily.
+        """
+
+        index = create_module_index(['a/__init__.pyo', 'a/b.pyo', 'ab.pyo',
+                'c/d.pyo'], lazy_modules=['a', 'c'])
+
+        self.assertTrue(index['a'][1])
+        self.assertTrue(index['a.b'][1])
+        self.assertFalse(index['ab'][1])
+        self.assertFalse(index['c'][1])
+        self.assertTrue(index['c.d'][1])
+
+    def test_lazy_loader_modules(self):
+        """ Test that the modules needed to implement lazy loading cannot be
+        loaded lazily.
+        """
+
+        for lazy_module in ('importlib', 'importlib.util', 'functools',
+                'threading'):
+            with self.assertRaises(UserException):
+                create_module_index([], lazy_modules=[lazy_module])
+
+    def test_round_trip(self):
+        """ Test that an index that is written is read back unchanged. """
+
+        index = create_module_index(['café.pyo', 'a/__init__.pyo',
+                'a/über.pyo', 'b/c.pyo'], lazy_modules=['a'])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file = os.path.join(temp_dir, 'pdytools_index.h')
+            write_module_index(index_file, index)
+
+            with open(index_file) as f:
+                self.assertTrue(f.read().isascii())
+
+            self.assertEqual(read_module_index(index_file), index)
+
+
+class ResourcesTests(unittest.TestCase):
+    """ Test the emulation of the Qt resource system. """
+
+    def test_compressed(self):
+        """ Test that compressed data is read uncompressed. """
+
+        data = b'compressed data' * 10
+
+        resources = Resources()
+        resources.add_file('a/b.dat',
+                struct.pack('>I', len(data)) + zlib.compress(data),
+                compressed=True)
+
+        self.assertTrue(resources.is_dir('a'))
+        self.assertTrue(resources.is_file('a/b.dat'))
+        self.assertTrue(resources.is_compressed('a/b.dat'))
+        self.assertEqual(resources.read('a/b.dat'), data)
+        self.assertEqual(resources.contents('a'), ['b.dat'])
+
+
+class EmulatorTests(unittest.TestCase):
+    """ Test importing modules from the resources. """
+
+    def setUp(self):
+        """ Create the resources. """
+
+        self.resources = Resources()
+
+        self._add_module(_PACKAGE + '/__init__.pyo', 'VALUE = 1\n')
+        self._add_module(_PACKAGE + '/module.pyo',
+                'from . import VALUE\nVALUE += 1\n')
+        self._add_module(_PACKAGE + '/namespace/module.pyo', 'VALUE = 3\n')
+
+    def tearDown(self):
+        """ Remove anything imported from the resources. """
+
+        for name in list(sys.modules):
+            if name == _PACKAGE or name.startswith(_PACKAGE + '.'):
+                del sys.modules[name]
+
+    def test_import(self):
+        """ Test importing modules, packages and namespaces. """
+
+        emulator = Emulator(self.resources)
+        emulator.install()
+
+        try:
+            emulator.import_module(_PACKAGE + '.module')
+            emulator.import_module(_PACKAGE + '.namespace.module')
+        finally:
+            emulator.uninstall()
+
+        self.assertEqual(sys.modules[_PACKAGE + '.module'].VALUE, 2)
+        self.assertEqual(sys.modules[_PACKAGE + '.namespace.module'].VALUE,
+                3)
+
+        self.assertEqual([r.name for r in emulator.imports],
+                [_PACKAGE, _PACKAGE + '.module',
+                        _PACKAGE + '.namespace.module'])
+
+        stats = emulator.stats()
+        self.assertEqual(stats['code_objects'], 3)
+        self.assertEqual(stats['probes'], 0)
+
+    def test_lazy(self):
+        """ Test that a lazily loaded module is only executed when it is used.
+        """
+
+        emulator = Emulator(self.resources, lazy_modules=[_PACKAGE])
+        emulator.install()
+
+        try:
+            emulator.import_module(_PACKAGE)
+
+            self.assertEqual(emulator.stats()['code_objects'], 0)
+            self.assertEqual(sys.modules[_PACKAGE].VALUE, 1)
+            self.assertEqual(emulator.stats()['code_objects'], 1)
+        finally:
+            emulator.uninstall()
+
+        # Note that other import hooks (e.g. pytest's) may cause the module to
+        # be found more than once.
+        self.assertGreater(emulator.stats()['deferred'], 0)
+
+    def test_index_file(self):
+        """ Test using an index read from a file. """
+
+        index = create_module_index(self.resources.file_names())
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file = os.path.join(temp_dir, 'pdytools_index.h')
+            write_module_index(index_file, index)
+
+            emulator = Emulator(self.resources, index_file=index_file)
+
+        emulator.install()
+
+        try:
+            emulator.import_module(_PACKAGE + '.module')
+        finally:
+            emulator.uninstall()
+
+        self.assertEqual(emulator.stats()['index_size'], len(index))
+        self.assertEqual(sys.modules[_PACKAGE + '.module'].VALUE, 2)
+
+    def test_without_index(self):
+        """ Test probing the resources rather than using the index. """
+
+        emulator = Emulator(self.resources, use_index=False)
+        emulator.install()
+
+        try:
+            emulator.import_module(_PACKAGE + '.module')
+        finally:
+            emulator.uninstall()
+
+        self.assertEqual(emulator.stats()['index_hits'], 0)
+        self.assertGreater(emulator.stats()['probes'], 0)
+
+    def test_uninstall(self):
+        """ Test that uninstalling restores the import system. """
+
+        path = sys.path[:]
+        path_hooks = sys.path_hooks[:]
+
+        emulator = Emulator(self.resources)
+        emulator.install()
+        emulator.uninstall()
+
+        self.assertEqual(sys.path, path)
+        self.assertEqual(sys.path_hooks, path_hooks)
+
+    def _add_module(self, name, source):
+        """ Add the code object of a module to the resources. """
+
+        self.resources.add_file(name,
+                marshal.dumps(compile(source, name, 'exec')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,199 @@
+# Copyright (c) 2022, Riverbank Computing Limited
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without
+# modification, are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+#    this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+#    this list of conditions and the following disclaimer in the documentation
+#    and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+# AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+# IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE
+# ARE DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE
+# LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR
+# CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF
+# SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN
+# CONTRACT, STRICT LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE)
+# ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
+# POSSIBILITY OF SUCH DAMAGE.
+
+
+import os
+import re
+import shlex
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyqtdeploy.builder.build_configuration import BuildConfiguration
+from pyqtdeploy.builder.cmake_generator import write_cmake_project
+from pyqtdeploy.builder.qmake_generator import write_qmake_project
+from pyqtdeploy.platforms import Architecture
+
+
+# The name of the application.
+_NAME = 'parity'
+
+# The qmake variables that contain source files.
+_QMAKE_SOURCES = ('SOURCES', 'HEADERS', 'CYTHONSOURCES')
+
+# A CMake command applied to a target.
+_CMAKE_COMMAND_RE = re.compile(r'^(\w+)\((.*?)\)$', re.MULTILINE | re.DOTALL)
+
+
+class GeneratorParityTests(unittest.TestCase):
+    """ Check that the qmake and cmake generators produce equivalent project
+    files from the same build configuration.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        """ Create the project files. """
+
+        config = BuildConfiguration(_NAME,
+                Architecture.architecture('linux-64'), '3.11.4')
+
+        config.qt = {'network', 'widgets'}
+        config.resource_names = ['resources0.qrc', 'resources1.qrc']
+        config.defines = ['PYQTDEPLOY_FROZEN_MAIN']
+        config.used_defines = {'HAVE_CONFIG_H', 'NDEBUG=1'}
+        config.used_includepath = {'/sysroot/include',
+                '/sysroot/include/python3.11'}
+        config.sources = ['pyqtdeploy_main.cpp', 'pyqtdeploy_start.cpp',
+                'pdytools_module.cpp']
+        config.used_sources = {'/sysroot/src/a/_speedups.pyx',
+                '/sysroot/src/b/_speedups.pyx', '/sysroot/src/zlib/adler32.c',
+                '/sysroot/src/zlib/zutil.h'}
+        config.headers = ['frozen_bootstrap.h', 'frozen_main.h']
+        config.used_libs = {'-L/sysroot/lib', '-lpython3.11', '-lz'}
+
+        with tempfile.TemporaryDirectory() as build_dir:
+            qmake_dir = os.path.join(build_dir, 'qmake')
+            os.mkdir(qmake_dir)
+
+            cmake_dir = os.path.join(build_dir, 'cmake')
+            os.mkdir(cmake_dir)
+
+            with open(write_qmake_project(config, qmake_dir)) as f:
+                cls.qmake = _parse_qmake(f.read())
+
+            with open(write_cmake_project(config, cmake_dir)) as f:
+                cls.cmake = _parse_cmake(f.read())
+
+    def test_sources(self):
+        """ Test the source files. """
+
+        qmake_sources = set()
+
+        for var in _QMAKE_SOURCES:
+            qmake_sources.update(self.qmake.get(var, ()))
+
+        cmake_sources = set(self.cmake['sources'])
+        cmake_sources.difference_update(self.cmake['resources'])
+
+        # Replace the generated C files with the Cython files they are
+        # generated from.
+        for output, src in self.cmake['cython'].items():
+            cmake_sources.remove(output)
+            cmake_sources.add(src)
+
+        self.assertEqual(qmake_sources, cmake_sources)
+
+    def test_cython_outputs(self):
+        """ Test that Cython files with the same name generate different C
+        files.
+        """
+
+        self.assertEqual(len(self.cmake['cython']), 2)
+
+    def test_defines(self):
+        """ Test the defines. """
+
+        self.assertEqual(set(self.qmake['DEFINES']),
+                set(self.cmake['target_compile_definitions']))
+
+    def test_include_paths(self):
+        """ Test the include paths. """
+
+        self.assertEqual(set(self.qmake['INCLUDEPATH']),
+                set(self.cmake['target_include_directories']))
+
+    def test_libs(self):
+        """ Test the libraries. """
+
+        cmake_libs = set(['-L' + d
+                for d in self.cmake['target_link_directories']])
+
+        for lib in self.cmake['target_link_libraries']:
+            # The Qt libraries are specified by the QT variable in qmake.
+            if not lib.startswith('Qt6::'):
+                cmake_libs.add(lib)
+
+        self.assertEqual(set(self.qmake['LIBS']), cmake_libs)
+
+    def test_resources(self):
+        """ Test the resource files. """
+
+        self.assertEqual(set(self.qmake['RESOURCES']),
+                set(self.cmake['resources']))
+
+
+def _parse_qmake(text):
+    """ Return a dict of the values of each variable assigned outside of any
+    scope in a .pro file.
+    """
+
+    values = {}
+    depth = 0
+
+    for line in text.replace('\\\n', ' ').split('\n'):
+        # Ignore anything in a scope.
+        if depth == 0 and not line.startswith(' '):
+            for op in ('+=', '='):
+                var, sep, value = line.partition(' ' + op + ' ')
+                if sep:
+                    if op == '=':
+                        values[var] = []
+
+                    values.setdefault(var, []).extend(value.split())
+                    break
+
+        depth += line.count('{') - line.count('}')
+
+    return values
+
+
+def _parse_cmake(text):
+    """ Return a dict of the values applied to the application target by each
+    command in a CMakeLists.txt file.
+    """
+
+    values = {'cython': {}}
+
+    for command, args in _CMAKE_COMMAND_RE.findall(text):
+        args = shlex.split(args)
+
+        if command == 'qt_add_executable':
+            values['sources'] = [a for a in args[1:]
+                    if a not in ('WIN32', 'MACOSX_BUNDLE')]
+        elif command == 'add_custom_command' and args[0] == 'OUTPUT':
+            values['cython'][args[1]] = args[args.index('DEPENDS') + 1]
+        elif args[:2] == [_NAME, 'PRIVATE']:
+            values.setdefault(command, []).extend(args[2:])
+
+    values['resources'] = [s for s in values['sources']
+            if s.endswith('.qrc')]
+
+    return values
+
+
+if __name__ == '__main__':
+    unittest.main()
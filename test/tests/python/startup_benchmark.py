@@ -0,0 +1,47 @@
+# Import a representative set of standard library modules and report the time
+# taken and the work done by the importer.
+
+import time
+
+start = time.perf_counter()
+
+import argparse
+import asyncio
+import base64
+import configparser
+import csv
+import dataclasses
+import datetime
+import decimal
+import email.message
+import email.parser
+import enum
+import fractions
+import gettext
+import glob
+import http.client
+import json
+import logging
+import pathlib
+import pprint
+import shutil
+import statistics
+import tarfile
+import tempfile
+import textwrap
+import typing
+import urllib.request
+import uuid
+import xml.etree.ElementTree
+import zipfile
+
+elapsed = time.perf_counter() - start
+
+import pdytools
+import sys
+
+print("Imported {0} modules in {1:.1f} ms".format(len(sys.modules),
+        elapsed * 1000))
+
+for name, value in sorted(pdytools.stats().items()):
+    print("{0}: {1}".format(name, value))